@@ -3,13 +3,17 @@
 Collection of tools for analysis of Craig-Bampton models.
 """
 
+import hashlib
 import math
+import weakref
 from collections import abc
+from concurrent.futures import ThreadPoolExecutor
 import numbers
 from types import SimpleNamespace
 from warnings import warn
 import numpy as np
 import scipy.linalg as linalg
+import scipy.sparse as sp
 import scipy.sparse.linalg as sp_la
 from pyyeti import locate, ytools, writer, ode
 from pyyeti.nastran import n2p
@@ -22,7 +26,7 @@ except TypeError:
     pass
 
 
-def cbtf(m, b, k, a, freq, bset, save=None):
+def cbtf(m, b, k, a, freq, bset, save=None, rows=None, chunk_size=None, nthreads=1):
     r"""
     Compute frequency domain responses given i/f accel for a CB model.
 
@@ -49,7 +53,20 @@ def cbtf(m, b, k, a, freq, bset, save=None):
     save : None or dict
         When using multiple `a` inputs, set `save` to an empty dict;
         this routine will put items in `save` to avoid unnecessary
-        calculations.
+        calculations. If `save` is None, the setup is still cached
+        internally, keyed on the identities of `m`, `b` and `k` (and
+        checked against their contents); see notes below.
+    rows : 1d array_like or None; optional
+        Index (or True/False) vector of the B+Q-set rows to return in
+        the outputs `a`, `d` and `v`. If None, all rows are returned.
+        `frc` always has all b-set rows.
+    chunk_size : integer or None; optional
+        Number of frequencies to solve at a time. If None, it is set
+        so that the work arrays of all chunks together take about 256
+        MB. The results do not depend on `chunk_size`.
+    nthreads : integer; optional
+        Number of threads to use for solving the chunks. Only useful
+        when there is more than one chunk.
 
     Returns
     -------
@@ -60,10 +77,11 @@ def cbtf(m, b, k, a, freq, bset, save=None):
         `a`.
     a : complex 2d ndarray
         B+Q-set accelerations (B-set part should match input `a`).
+        Only the `rows` rows if `rows` is input.
     d : complex 2d ndarray
-        B+Q-set displacements.
+        B+Q-set displacements; `rows` rows only as for `a`.
     v : complex 2d ndarray
-        B+Q-set velocities.
+        B+Q-set velocities; `rows` rows only as for `a`.
     freq : 1d ndarray
         The frequency vector (same as `freq`).
     f : 1d ndarray
@@ -121,6 +139,15 @@ def cbtf(m, b, k, a, freq, bset, save=None):
     :func:`pyyeti.ode.SolveUnc.fsolve`. After solution,
     :math:`F_b(\Omega)` is computed from the top equation above.
 
+    Each frequency is independent of the others, so the frequencies
+    are solved `chunk_size` at a time to limit the memory needed for
+    the B+Q-set work arrays; only the requested `rows` of each chunk
+    are kept. The :class:`pyyeti.ode.SolveUnc` instance for the
+    Q-set is cached for reuse by later calls with the same `m`, `b`
+    and `k` arrays (unless `save` is a dict, in which case it is
+    stored there). The cache entry is rebuilt if any of the arrays
+    are modified.
+
     Examples
     --------
     Use :func:`cbtf` on a very simple 1-D spring mass CB component::
@@ -200,24 +227,26 @@ def cbtf(m, b, k, a, freq, bset, save=None):
     a = np.atleast_1d(a)
     bset = np.atleast_1d(bset)
     if a.ndim == 1 or (a.ndim == 2 and a.shape[1] == 1):
-        a = np.dot(a.reshape(-1, 1), np.ones((1, lenf)))
+        a = np.broadcast_to(a.reshape(-1, 1), (a.shape[0], lenf))
     r, c = a.shape
     if c != lenf:
         raise ValueError("`a` is not compatibly sized with `freq`.")
     if r != len(bset):
         raise ValueError("number of rows in `a` not compatible with `bset`.")
-    frc = np.zeros((r, lenf), dtype=complex)
     bset = np.atleast_1d(bset).ravel()
     lt = m.shape[0]
     qset = locate.flippv(bset, lt)
+    if rows is None:
+        rows = slice(None)
+        nrows = lt
+    else:
+        rows = np.atleast_1d(rows).ravel()
+        if rows.dtype != bool:
+            rows = rows.astype(np.intp)
+        nrows = np.arange(lt)[rows].size
 
-    pvnz = Omega != 0.0
     if qset.size == 0:
-        accel = a.copy()
-        displ = np.zeros(a.shape, dtype=complex)
-        displ[:, pvnz] = -accel[:, pvnz] / Omega[pvnz] ** 2
-        veloc = 1j * (Omega * displ)
-        frc = m @ accel + b @ veloc + k @ displ
+        tf = None
     else:
         tf = None
         if isinstance(save, abc.MutableMapping):
@@ -226,29 +255,124 @@ def cbtf(m, b, k, a, freq, bset, save=None):
             except KeyError:
                 pass
         if tf is None:
-            qq = np.ix_(qset, qset)
-            tf = ode.SolveUnc(m[qq], b[qq], k[qq], rb=[])
+            tf = _cbtf_solver(m, b, k, qset)
             if isinstance(save, abc.MutableMapping):
                 save["tf"] = tf
-
         bb = np.ix_(bset, bset)
         qb = np.ix_(qset, bset)
-        v = np.zeros(a.shape, dtype=complex)
-        v[:, pvnz] = 1j * a[:, pvnz] / Omega[pvnz]
-        f = b[qb] @ v - m[qb] @ a
-        sol = tf.fsolve(f, freq)
-
-        displ = np.zeros((lt, lenf), dtype=complex)
-        accel = displ.copy()
-        displ[np.ix_(bset, pvnz)] = -a[:, pvnz] / Omega[pvnz] ** 2
-        displ[qset] = sol.d
-        veloc = 1j * (Omega * displ)
-        accel[bset] = a
-        accel[qset] = sol.a
-        frc = m[bset] @ accel + b[bset] @ veloc + k[bb] @ displ[bset]
+        mbset, bbset, kbb = m[bset], b[bset], k[bb]
+        mqb, bqb = m[qb], b[qb]
+
+    frc = np.zeros((r, lenf), dtype=complex)
+    accel = np.zeros((nrows, lenf), dtype=complex)
+    displ = accel.copy()
+    veloc = accel.copy()
+
+    def _solve_chunk(j):
+        # solve frequencies j (a slice); all work arrays are lt x chunk
+        Om = Omega[j]
+        aj = a[:, j]
+        pvnz = Om != 0.0
+        if tf is None:
+            acc = np.array(aj, dtype=complex)
+            dsp = np.zeros(acc.shape, dtype=complex)
+            dsp[:, pvnz] = -acc[:, pvnz] / Om[pvnz] ** 2
+            vel = 1j * (Om * dsp)
+            frc[:, j] = m @ acc + b @ vel + k @ dsp
+        else:
+            v = np.zeros(aj.shape, dtype=complex)
+            v[:, pvnz] = 1j * aj[:, pvnz] / Om[pvnz]
+            f = bqb @ v - mqb @ aj
+            sol = tf.fsolve(f, freq[j])
+            dsp = np.zeros((lt, len(Om)), dtype=complex)
+            acc = dsp.copy()
+            dsp[np.ix_(bset, pvnz)] = -aj[:, pvnz] / Om[pvnz] ** 2
+            dsp[qset] = sol.d
+            vel = 1j * (Om * dsp)
+            acc[bset] = aj
+            acc[qset] = sol.a
+            frc[:, j] = mbset @ acc + bbset @ vel + kbb @ dsp[bset]
+        accel[:, j] = acc[rows]
+        displ[:, j] = dsp[rows]
+        veloc[:, j] = vel[rows]
+
+    if chunk_size is None:
+        # about 8 complex lt x chunk arrays are alive per chunk:
+        chunk_size = _CBTF_MEMORY // (8 * 16 * lt * max(nthreads, 1))
+    chunk_size = max(int(chunk_size), 1)
+    chunks = [slice(j, j + chunk_size) for j in range(0, lenf, chunk_size)]
+    if nthreads > 1 and len(chunks) > 1:
+        # the chunks are independent and numpy releases the GIL for
+        # the products and solves, so threads can share `tf`:
+        with ThreadPoolExecutor(max_workers=nthreads) as pool:
+            list(pool.map(_solve_chunk, chunks))
+    else:
+        for j in chunks:
+            _solve_chunk(j)
     return SimpleNamespace(frc=frc, a=accel, d=displ, v=veloc, freq=freq, f=freq)
 
 
+# Approximate memory budget in bytes for the work arrays of one
+# :func:`cbtf` call when `chunk_size` is None:
+_CBTF_MEMORY = 2 ** 28
+
+_CBTF_SOLVERS = {}
+
+
+def _fingerprint(x):
+    """
+    Content fingerprint of an array-like
+
+    Returns a hashable tuple of the shape, dtype, memory order and
+    blake2b digest of the data. The data buffer is hashed in place if
+    `x` is C or Fortran contiguous; otherwise a contiguous copy is
+    hashed. `x` = None gives None.
+    """
+    if x is None:
+        return None
+    x = np.asarray(x)
+    shape = x.shape
+    if x.flags.c_contiguous:
+        order = "C"
+    elif x.flags.f_contiguous:
+        order, x = "F", x.T
+    else:
+        order, x = "C", np.ascontiguousarray(x)
+    digest = hashlib.blake2b(x.data).hexdigest()
+    return shape, x.dtype.str, order, digest
+
+
+def _cbtf_solver(m, b, k, qset):
+    """
+    Get the q-set :class:`pyyeti.ode.SolveUnc` instance for
+    :func:`cbtf`
+
+    The solver is cached by the identities of `m`, `b` and `k` and is
+    rebuilt if the contents of any of them or `qset` have changed.
+    The cache entry is dropped when any of the three is garbage
+    collected. Inputs that are not ndarrays are not cached.
+    """
+    qq = np.ix_(qset, qset)
+    if not all(isinstance(x, np.ndarray) for x in (m, b, k)):
+        return ode.SolveUnc(m[qq], b[qq], k[qq], rb=[])
+    key = id(m), id(b), id(k)
+    fp = [_fingerprint(x) for x in (m, b, k, qset)]
+    try:
+        refs, fp0, tf = _CBTF_SOLVERS[key]
+    except KeyError:
+        pass
+    else:
+        if all(ref() is x for ref, x in zip(refs, (m, b, k))) and fp == fp0:
+            return tf
+    tf = ode.SolveUnc(m[qq], b[qq], k[qq], rb=[])
+    refs = [
+        weakref.ref(x, lambda r, key=key: _CBTF_SOLVERS.pop(key, None))
+        for x in (m, b, k)
+    ]
+    _CBTF_SOLVERS[key] = refs, fp, tf
+    return tf
+
+
 def cbreorder(M, b, drm=False, last=False):
     """
     Reorder either a Craig-Bampton mass or stiffness matrix, or a
@@ -641,6 +765,11 @@ def cbconvert(M, b, conv="m2e", drm=False):
         c = math.sqrt(massconv) * lengthconv
         C[q] = 1 / c
         D[q] = c
+    if sp.issparse(M):
+        M = M @ sp.diags(C)
+        if not drm:
+            M = sp.diags(D) @ M
+        return M
     M = ytools.multmd(M, C)
     if not drm:
         M = ytools.multmd(D, M)
@@ -1439,8 +1568,44 @@ def mk_net_drms(
     return s
 
 
+def _dense(a):
+    """
+    Returns `a` as a dense array if it is a scipy sparse matrix
+    """
+    return a.toarray() if sp.issparse(a) else a
+
+
+def _nonnull_rows(a):
+    """
+    Returns boolean vector that is True for each row of `a` that has
+    a non-zero value; `a` can be sparse
+    """
+    if sp.issparse(a):
+        return abs(a).max(axis=1).toarray().ravel() != 0.0
+    return np.any(a, axis=1)
+
+
+def _row_blocks(n, ncols, blocksize=2 ** 20):
+    """
+    Returns slices that split `n` rows into blocks of about
+    `blocksize` elements each (for `ncols` columns)
+    """
+    step = max(1, blocksize // max(ncols, 1))
+    return [slice(i, i + step) for i in range(0, n, step)]
+
+
+def _offdiag_absmax(a):
+    """
+    Returns maximum absolute off-diagonal value of square `a`; `a`
+    can be sparse
+    """
+    if sp.issparse(a):
+        return abs(a - sp.diags(a.diagonal())).max()
+    return abs(a - np.diag(np.diag(a))).max()
+
+
 @ytools.write_text_file
-def _rbmultchk(fout, drm, name, rb, labels, drm2, prtnullrows, bset):
+def _rbmultchk(fout, drm, name, rb, labels, drm2, prtnullrows, bset, low_memory):
     """
     Routine used by :func:`rbmultchk`. See documentation for
     :func:`rbmultchk`.
@@ -1449,6 +1614,8 @@ def _rbmultchk(fout, drm, name, rb, labels, drm2, prtnullrows, bset):
     fout.write(f"Results for {name} * RB\n")
     fout.write("----------------------------------------------\n")
 
+    if sp.issparse(drm):
+        drm = drm.tocsr()
     n = np.size(drm, 0)
     rbr = np.size(rb, 0)
     cdrm = np.size(drm, 1)
@@ -1458,20 +1625,27 @@ def _rbmultchk(fout, drm, name, rb, labels, drm2, prtnullrows, bset):
         # trim down the drm:
         if isinstance(bset, str):
             if bset == "first":
-                drm1 = drm[:, :rbr]
+                cols = slice(None, rbr)
             elif bset == "last":
-                drm1 = drm[:, -rbr:]
+                cols = slice(-rbr, None)
             else:
                 raise ValueError(
                     'invalid `bset` string: must be either "first" '
                     f'or "last" but is "{bset}"'
                 )
         else:
-            drm1 = drm[:, bset]
+            cols = bset
     else:
-        drm1 = drm
-
-    drmrb = drm1 @ rb
+        cols = slice(None)
+
+    if low_memory and not sp.issparse(drm):
+        # multiply a block of rows at a time to avoid copying all of
+        # the b-set columns of `drm`:
+        drmrb = np.empty((n, np.size(rb, 1)), np.result_type(drm, rb))
+        for rows in _row_blocks(n, cdrm):
+            drmrb[rows] = drm[rows][:, cols] @ rb
+    else:
+        drmrb = drm[:, cols] @ rb
 
     # get rb scale:
     if 0:
@@ -1511,7 +1685,7 @@ def _rbmultchk(fout, drm, name, rb, labels, drm2, prtnullrows, bset):
         )
 
     r = np.arange(1, n + 1)
-    nonnr = np.any(drm, axis=1)  # non null rows
+    nonnr = _nonnull_rows(drm)  # non null rows
     nr = ~nonnr  # null rows
     snonnr = np.sum(nonnr)
     snr = np.sum(nr)
@@ -1626,7 +1800,7 @@ def _rbmultchk(fout, drm, name, rb, labels, drm2, prtnullrows, bset):
             fout.write("Skipping check. Fix input and rerun.\n")
         else:
             fout.write("\n")
-            nr2 = np.nonzero(~np.any(drm2, axis=1))[0]
+            nr2 = np.nonzero(~_nonnull_rows(drm2))[0]
             err = 0
             if nr2.size != nr.size:
                 fout.write(
@@ -1648,7 +1822,15 @@ def _rbmultchk(fout, drm, name, rb, labels, drm2, prtnullrows, bset):
 
 
 def rbmultchk(
-    f, drm, name, rb, labels=None, drm2=None, prtnullrows=False, bset="first"
+    f,
+    drm,
+    name,
+    rb,
+    labels=None,
+    drm2=None,
+    prtnullrows=False,
+    bset="first",
+    low_memory=False,
 ):
     """
     Rigid-body multiply check on a data recovery matrix.
@@ -1660,7 +1842,7 @@ def rbmultchk(
         by :func:`open` or :class:`io.StringIO`. Input as integer 1 to
         write to stdout. Can also be the name of a directory or None;
         in these cases, a GUI is opened for file selection.
-    drm : 2d ndarray
+    drm : 2d ndarray or scipy sparse matrix
         Data recovery matrix (DRM).
     name : string
         Name of the DRM; used for titling.
@@ -1670,7 +1852,7 @@ def rbmultchk(
     labels : None or list; optional
         If list, it is a list of strings for DRM labeling. Up to first
         15 characters will be used.
-    drm2 : None or 2d ndarray; optional
+    drm2 : None or 2d ndarray or scipy sparse matrix; optional
         Optional second DRM; only used in the null rows check to see
         if `drm` and `drm2` share a common set of null rows. Useful
         for DRMs that are meant to be used together, as in DTMA*a +
@@ -1688,6 +1870,11 @@ def rbmultchk(
         `drm`. In that case, it is assumed that `rb` only has the
         b-set DOF and that `drm` must be partitioned down to have only
         the b-set columns.
+    low_memory : bool; optional
+        If True and `drm` is dense, ``drm @ rb`` is computed a block of
+        rows at a time so that the b-set partition of `drm` is never
+        copied in full. Sparse `drm` (and `drm2`) are always kept
+        sparse.
 
     Returns
     -------
@@ -1795,7 +1982,7 @@ def rbmultchk(
     if c != 6:
         raise ValueError("`rb` does not have 6 columns")
 
-    return _rbmultchk(f, drm, name, rb, labels, drm2, prtnullrows, bset)
+    return _rbmultchk(f, drm, name, rb, labels, drm2, prtnullrows, bset, low_memory)
 
 
 @ytools.write_text_file
@@ -1892,7 +2079,7 @@ def rbdispchk(
         by :func:`open` or :class:`io.StringIO`. Input as integer 1 to
         write to stdout. Can also be the name of a directory or None;
         in these cases, a GUI is opened for file selection.
-    rbdisp : 2d ndarray
+    rbdisp : 2d ndarray or scipy sparse matrix
         Rigid-body displacements; size is 3*N x 6 where N is the
         number of nodes. Rows correspond to X, Y, Z triples for each
         node (in any coordinate system).
@@ -1997,7 +2184,7 @@ def rbdispchk(
 
     if (r // 3) * 3 != r:
         raise ValueError("number of rows in `rbdisp` must be a multiple of 3.")
-    return _rbdispchk(f, rbdisp, grids, ttl, verbose, tol)
+    return _rbdispchk(f, _dense(rbdisp), grids, ttl, verbose, tol)
 
 
 @ytools.write_text_file
@@ -2019,6 +2206,8 @@ def _cbcoordchk(fout, K, bset, refpoint, grids, ttl, verbose, rb_normalizer):
     # make refpoint be relative to b-set:
     refpoint = refpoint - np.min(bset)
 
+    if sp.issparse(K):
+        K = K.tocsr()
     kbb = K[np.ix_(bset, bset)]
     o = locate.flippv(refpoint, lb)
     rbmodes = np.zeros((lb, 6))
@@ -2026,17 +2215,24 @@ def _cbcoordchk(fout, K, bset, refpoint, grids, ttl, verbose, rb_normalizer):
     refpoint_chk = "pass"
 
     if o.size > 0:
-        kor = kbb[np.ix_(o, refpoint)]
+        kor = _dense(kbb[np.ix_(o, refpoint)])
         koo = kbb[np.ix_(o, o)]
         # rbmodes[o] = -linalg.solve(koo, kor)
         # to handle the cases where some rows/cols are zero:
-        rbmodes[o] = -linalg.lstsq(koo, kor)[0]
+        if sp.issparse(koo):
+            # solve the non-null partition; null rows/cols get zeros
+            # as they would from lstsq:
+            nz = _nonnull_rows(koo) | _nonnull_rows(koo.T)
+            koo = koo[np.ix_(nz, nz)].tocsc()
+            rbmodes[o[nz]] = -sp_la.spsolve(koo, kor[nz]).reshape(-1, 6)
+        else:
+            rbmodes[o] = -linalg.lstsq(koo, kor)[0]
 
         # check for proper refpoint selection (dof that properly
         # restrains all rb motion, but nothing more). this should be
         # zero:
         #   krr - kro @ inv(koo) @ kor
-        krr = kbb[np.ix_(refpoint, refpoint)]
+        krr = _dense(kbb[np.ix_(refpoint, refpoint)])
         rhs = -kor.T @ rbmodes[o]
         if not np.allclose(krr, rhs, atol=abs(krr).max() * 1e-8):
             refpoint_chk = "fail"
@@ -2092,8 +2288,10 @@ def cbcoordchk(
 
     Parameters
     ----------
-    K : 2d numpy array
-        Craig-Bampton stiffness matrix (b+q-set size).
+    K : 2d numpy array or scipy sparse matrix
+        Craig-Bampton stiffness matrix (b+q-set size). If sparse,
+        the reference DOF equations are solved with
+        :func:`scipy.sparse.linalg.spsolve`.
     bset : 1d array
         Partition vector to the b-set DOF; length must be multiple of
         6.
@@ -2206,13 +2404,40 @@ def cbcoordchk(
     return _cbcoordchk(outfile, K, bset, refpoint, grids, ttl, verbose, rb_normalizer)
 
 
-def _solve_eig(fout, k, m, mtype, ktype, types):
+def _solve_eig_sparse(fout, k, m, mtype, ktype, types, nmodes):
+    """
+    Utility for cbcheck to solve for the lowest `nmodes` free-free
+    modes of sparse `k` and `m`.
+    """
+    nmodes = min(nmodes, m.shape[0] - 1)
+    # shift by same amount as used in the subspace iteration in
+    # :func:`_solve_eig`:
+    sigma = -10.0
+    if mtype & types["posdef"] and ktype & types["symmetric"]:
+        fout.write(f"Solving hermitian eigen problem for lowest {nmodes} modes.\n")
+        w, v = sp_la.eigsh(k.tocsc(), nmodes, m.tocsc(), sigma=sigma)
+        w = np.abs(w)
+    else:
+        fout.write(f"Solving generalized eigen problem for lowest {nmodes} modes.\n")
+        w, v = sp_la.eigs(k.tocsc(), nmodes, m.tocsc(), sigma=sigma)
+        w = np.abs(w)
+        v = np.real(v)
+        normfacs = np.abs((v * (m @ v)).sum(axis=0))
+        v = np.sqrt(1 / normfacs) * v
+    j = np.argsort(w)
+    return w[j], v[:, j]
+
+
+def _solve_eig(fout, k, m, mtype, ktype, types, nmodes=None):
     """
     Utility for cbcheck to solve free-free eigen problem.
+
+    If `nmodes` is not None, `k` and `m` are sparse and only the
+    lowest `nmodes` modes are computed.
     """
     # chop out zero rows/cols ... assume symmetry:
     n = m.shape[0]
-    nz = m.any(axis=0) | k.any(axis=0)
+    nz = _nonnull_rows(m.T) | _nonnull_rows(k.T)
     z = ~nz
     if z.any():
         # there are zero cols
@@ -2227,7 +2452,9 @@ def _solve_eig(fout, k, m, mtype, ktype, types):
         mtype, types = ytools.mattype(m)
         ktype = ytools.mattype(k)[0]
 
-    if mtype & types["posdef"] and ktype & types["symmetric"]:
+    if nmodes is not None:
+        w, v = _solve_eig_sparse(fout, k, m, mtype, ktype, types, nmodes)
+    elif mtype & types["posdef"] and ktype & types["symmetric"]:
         fout.write("Solving hermitian eigen problem.\n")
         w, v = linalg.eigh(k, m)
         w = np.abs(w)
@@ -2279,6 +2506,8 @@ def cbcheck(
     em_filt=0,
     rb_norm=None,
     reorder=True,
+    low_memory=None,
+    nmodes=30,
 ):
     """
     Run model checks on Craig-Bampton mass and stiffness matrices.
@@ -2290,12 +2519,12 @@ def cbcheck(
         by :func:`open` or :class:`io.StringIO`. Input as integer 1 to
         write to stdout. Can also be the name of a directory or None;
         in these cases, a GUI is opened for file selection.
-    Mcb : 2d ndarray
+    Mcb : 2d ndarray or scipy sparse matrix
         Craig-Bampton mass. In order to solve the free-free eigenvalue
         problem, this routine first finds any null columns in `Mcb`
         and `Kcb` and partitions out those columns and rows
         (symmetrically) of `Mcb` and `Kcb`.
-    Kcb : 2d ndarray
+    Kcb : 2d ndarray or scipy sparse matrix
         Craig-Bampton stiffness.
     bseto : 1d ndarray
         Index partition vector specifying location and order of b-set
@@ -2367,17 +2596,31 @@ def cbcheck(
         in :func:`cbcoordchk` for the "rb_normalizer" input.
     reorder : bool; optional
         If True, reordering is allowed.
+    low_memory : bool or None; optional
+        If None, `low_memory` is set to True if either `Mcb` or `Kcb`
+        is a scipy sparse matrix. If True, `Mcb` and `Kcb` are
+        converted to sparse (if needed) and all checks are done
+        without forming dense copies of the mass and stiffness. In
+        this case, only the lowest `nmodes` free-free modes are
+        computed (via :func:`scipy.sparse.linalg.eigsh`) instead of
+        all of them.
+    nmodes : integer; optional
+        Number of free-free modes to compute when `low_memory` is
+        True; must be at least 6 (for the eigenvalue-based rigid-body
+        modes). Ignored if `low_memory` is False.
 
     Returns
     -------
     A SimpleNamespace with the members:
 
-    m : 2d ndarray
+    m : 2d ndarray or scipy sparse matrix
         Reordered and converted version of Mcb. Will equal Mcb if
-        there is no reordering or unit conversion.
-    k : 2d ndarray
+        there is no reordering or unit conversion. Is sparse if
+        `low_memory` is True.
+    k : 2d ndarray or scipy sparse matrix
         Reordered and converted version of Kcb. Will equal Kcb if
-        there is no reordering or unit conversion.
+        there is no reordering or unit conversion. Is sparse if
+        `low_memory` is True.
     bset : 1d ndarray
         Vector giving location of reordered b-set. This will equal
         numpy.arange(len(bset)) if `reorder` is True. Will equal
@@ -2470,6 +2713,11 @@ def cbcheck(
     :func:`pyyeti.nastran.n2p.addgrid`, :func:`cbconvert`,
     :func:`cbreorder`, :func:`pyyeti.nastran.op2.OP2.rdn2cop2`
     """
+    if low_memory is None:
+        low_memory = sp.issparse(Mcb) or sp.issparse(Kcb)
+    if low_memory:
+        Mcb = sp.csr_matrix(Mcb)
+        Kcb = sp.csr_matrix(Kcb)
     n = np.size(Mcb, 0)
 
     # check matrix properties:
@@ -2554,14 +2802,14 @@ def cbcheck(
         return flag
 
     f.write("\nMass values check:\n")
-    mxmqqerr = np.max(np.abs(np.diag(mqq) - 1.0))
+    mxmqqerr = np.max(np.abs(mqq.diagonal() - 1.0))
     error_flag += _prt_chk_str(
         f,
         ("\tMaximum value of diag(MQQ)-1.0    = {:11g}  (should be zero)"),
         mxmqqerr,
         mattol,
     )
-    mxmqqerr = abs(mqq - np.diag(np.diag(mqq))).max()
+    mxmqqerr = _offdiag_absmax(mqq)
     error_flag += _prt_chk_str(
         f,
         ("\tMaximum off-diagonal value of MQQ = {:11g}  (should be zero)"),
@@ -2569,9 +2817,9 @@ def cbcheck(
         mattol,
     )
 
-    mnkqq = np.min(np.diag(kqq))
-    mxkqqerr = np.max(np.abs(kqq - np.diag(np.diag(kqq))))
-    mxkbb = np.max(np.abs(kbb))
+    mnkqq = np.min(kqq.diagonal())
+    mxkqqerr = _offdiag_absmax(kqq)
+    mxkbb = abs(kbb).max()
     mxkbq = abs(k[bset][:, qset]).max()
     f.write("\nStiffness values checks:\n")
     _prt_chk_str(
@@ -2618,7 +2866,7 @@ def cbcheck(
         f.write("Echoing KBB for visual inspection since max(KBB) != 0:\n")
         f.write("KBB =\n")
         form = "\t" + ("{:7.4f}  ") * 5 + "{:7.4f}\n"
-        writer.vecwrite(f, form, kbb)
+        writer.vecwrite(f, form, _dense(kbb))
         f.write(f"\n\tNote: for comparison KQQ[0, 0] = {kqq[0, 0]:.2f}.\n\n")
 
     # Three types of rigid-body modes will be calculated:
@@ -2667,7 +2915,7 @@ def cbcheck(
     rbs = c_chk.rbmodes
 
     # calculate free-free modes:
-    w, v = _solve_eig(f, k, m, mtype, ktype, types)
+    w, v = _solve_eig(f, k, m, mtype, ktype, types, nmodes if low_memory else None)
 
     # assuming 6 rigid-body modes
     rbe = linalg.solve(v[bref, :6].T, v[:, :6].T).T
@@ -2849,7 +3097,7 @@ def cbcheck(
         # effective mass in percent of total mass:
         effmass = (m[QB] @ rbg) ** 2 * (100 / np.diag(mg))
         num = np.arange(nq) + 1
-        frq = np.sqrt(np.abs(np.diag(kqq))) / (2 * math.pi)
+        frq = np.sqrt(np.abs(kqq.diagonal())) / (2 * math.pi)
         summ = np.sum(effmass, axis=0)
         f.write("\n\nFIXED-BASE MODES w/ Percent Modal Effective Mass:\n\n")
         f.write("Using geometry-based rb modes for effective mass calcs.\n")
@@ -7,7 +7,12 @@ import copy
 import numpy as np
 import xlsxwriter
 from pyyeti import ytools, writer
-from ._utilities import nan_absmax, _get_rpt_headers, _get_numform
+from ._utilities import (
+    nan_absmax,
+    _get_rpt_headers,
+    _get_numform,
+    ExtremaNamespace,
+)
 
 
 __all__ = ["rpttab1"]
@@ -47,10 +52,18 @@ def _add_zero_case(mat, cases):
 def _get_absmax(res):
     amx, pv = nan_absmax(res.mx, res.mn)
     aext, pv = nan_absmax(res.ext[:, 0], res.ext[:, 1])
-    if res.maxcase is not None:
+    if isinstance(res, ExtremaNamespace):
+        if res.maxcase_index is not None:
+            index = res.maxcase_index.copy()
+            index[pv] = res.mincase_index[pv]
+            amxcase = np.array(res.case_names, dtype=object)[index].tolist()
+        else:
+            amxcase = None
+    elif res.maxcase is not None:
         amxcase = res.maxcase[:]
+        mincase = res.mincase
         for j in pv.nonzero()[0]:
-            amxcase[j] = res.mincase[j]
+            amxcase[j] = mincase[j]
     else:
         amxcase = None
     return amx, amxcase, aext
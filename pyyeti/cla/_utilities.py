@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
+import ast
 import itertools
 import copy
 from collections import OrderedDict
 from types import SimpleNamespace
 from keyword import iskeyword
+import os
 import datetime
 import importlib
+import importlib.util
 import numpy as np
 from pyyeti import locate
 
@@ -13,6 +16,7 @@ from pyyeti import locate
 __all__ = [
     "_is_valid_identifier",
     "get_drfunc",
+    "_parse_linear_drfunc",
     "_merge_uf_reds",
     "_get_rpt_headers",
     "_get_numform",
@@ -25,6 +29,7 @@ __all__ = [
     "nan_argmin",
     "nan_absmax",
     "extrema",
+    "ExtremaNamespace",
     #     'reorder',
     "_calc_covariance_sine_cosine",
     "PSD_consistent_rss",
@@ -64,14 +69,17 @@ def get_drfunc(filename, funcname, get_psd=False):
     psd_drfunc : function or None; optional
         The PSD-specific data recovery function or None if no such
         function was defined; only returned if `get_psd` is True.
+
+    Notes
+    -----
+    The module imported from `filename` is cached, keyed by the
+    absolute path and the modification time and size of the file;
+    it is only imported again (rerunning any module-level code) if
+    the file changes. Functions built from expression strings are
+    cached by the string.
     """
     if _is_valid_identifier(funcname):
-        # force a proper exception if file doesn't exist:
-        with open(filename, "r") as _:
-            pass
-        spec = importlib.util.spec_from_file_location("has_drfuncs", filename)
-        drmod = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(drmod)
+        drmod = _load_drfunc_module(filename)
         func = getattr(drmod, funcname)
         if get_psd:
             psdfunc = getattr(drmod, funcname + "_psd", None)
@@ -79,12 +87,120 @@ def get_drfunc(filename, funcname, get_psd=False):
         return func
 
     # build function and return it:
-    strfunc = "def _func(sol, nas, Vars, se):\n    return " + funcname.strip()
-    g = globals()
-    exec(strfunc, g)
+    try:
+        func = _DRFUNC_EXPRS[funcname]
+    except KeyError:
+        strfunc = "def _func(sol, nas, Vars, se):\n    return " + funcname.strip()
+        g = globals()
+        exec(strfunc, g)
+        func = _DRFUNC_EXPRS[funcname] = g["_func"]
     if get_psd:
-        return g["_func"], None
-    return g["_func"]
+        return func, None
+    return func
+
+
+# Caches for :func:`get_drfunc`: modules by (path, mtime, size) of
+# the file and functions by expression string
+_DRFUNC_MODULES = {}
+_DRFUNC_EXPRS = {}
+
+
+def _load_drfunc_module(filename):
+    """
+    Import the data recovery function file `filename`
+
+    The module is cached and only imported again if the file is
+    modified (as determined by its modification time and size).
+    """
+    path = os.path.abspath(filename)
+    st = os.stat(path)
+    key = path, st.st_mtime_ns, st.st_size
+    try:
+        return _DRFUNC_MODULES[key]
+    except KeyError:
+        pass
+    # force a proper exception if file can't be read:
+    with open(path, "r") as _:
+        pass
+    spec = importlib.util.spec_from_file_location("has_drfuncs", path)
+    drmod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(drmod)
+    for old in [k for k in _DRFUNC_MODULES if k[0] == path]:
+        del _DRFUNC_MODULES[old]
+    _DRFUNC_MODULES[key] = drmod
+    return drmod
+
+
+def _parse_linear_drfunc(funcname):
+    """
+    Parse a linear data recovery expression
+
+    Parameters
+    ----------
+    funcname : string
+        Data recovery function name or expression (the `drfunc`
+        setting in :func:`DR_Def.add`)
+
+    Returns
+    -------
+    terms : list or None
+        If `funcname` is a sum of one or more terms of the form
+        ``Vars[se]["name"] @ sol.x`` (where "x" is "a", "v", or "d"),
+        `terms` is a list of ``(name, x)`` tuples in order. Otherwise,
+        `terms` is None.
+
+    Examples
+    --------
+    >>> from pyyeti.cla._utilities import _parse_linear_drfunc
+    >>> _parse_linear_drfunc(
+    ...     "Vars[se]['ltma'] @ sol.a + Vars[se]['ltmd'] @ sol.d")
+    [('ltma', 'a'), ('ltmd', 'd')]
+    >>> print(_parse_linear_drfunc("Vars[se]['atm'] @ sol.a * 2"))
+    None
+    """
+    if not isinstance(funcname, str) or _is_valid_identifier(funcname):
+        return None
+    try:
+        node = ast.parse(funcname.strip(), mode="eval").body
+    except SyntaxError:
+        return None
+
+    def _key(node):
+        key = node.slice
+        if type(key).__name__ == "Index":  # Python < 3.9
+            key = key.value
+        return key
+
+    def _term(node):
+        if not (isinstance(node, ast.BinOp) and isinstance(node.op, ast.MatMult)):
+            return None
+        drm, sol = node.left, node.right
+        if not (
+            isinstance(sol, ast.Attribute)
+            and sol.attr in ("a", "v", "d")
+            and isinstance(sol.value, ast.Name)
+            and sol.value.id == "sol"
+            and isinstance(drm, ast.Subscript)
+            and isinstance(drm.value, ast.Subscript)
+            and isinstance(drm.value.value, ast.Name)
+            and drm.value.value.id == "Vars"
+            and isinstance(_key(drm.value), ast.Name)
+            and _key(drm.value).id == "se"
+        ):
+            return None
+        name = _key(drm)
+        if not (isinstance(name, ast.Constant) and isinstance(name.value, str)):
+            return None
+        return name.value, sol.attr
+
+    terms = []
+    while isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        terms.append(_term(node.right))
+        node = node.left
+    terms.append(_term(node))
+    if None in terms:
+        return None
+    return terms[::-1]
 
 
 def _merge_uf_reds(old, new, method="replace"):
@@ -395,6 +511,163 @@ def nan_absmax(v1, v2):
     return amx, pv
 
 
+def _case_index_dtype(n):
+    # smallest index dtype for a case-name table of length `n`
+    for dtype in (np.uint8, np.uint16):
+        if n <= np.iinfo(dtype).max + 1:
+            return dtype
+    return np.uint32
+
+
+class ExtremaNamespace(SimpleNamespace):
+    """
+    SimpleNamespace for a results category that stores the case
+    labels of the extrema as indices
+
+    Instead of keeping the `.maxcase` and `.mincase` labels as lists
+    of strings (one per row), this class keeps a table of the unique
+    labels and an integer array of indices into it for each::
+
+        .case_names    = list of unique case labels
+        .maxcase_index = integer ndarray (one per row) or None
+        .mincase_index = integer ndarray (one per row) or None
+
+    The `.maxcase` and `.mincase` attributes are properties that
+    build the usual lists of strings from these (or return None);
+    they can be set with a list of strings, None, or a ``(names,
+    index)`` tuple as described in :func:`extrema`.
+
+    .. note::
+        Since the lists are built on each access, modifying them in
+        place is silently lost: ``res.maxcase[i] = "new"`` (which
+        worked when the labels were stored as lists) no longer
+        changes the labels. Instead, get the list, modify it and
+        assign it back::
+
+            maxcase = res.maxcase
+            maxcase[i] = "new"
+            res.maxcase = maxcase
+
+        For the same reason, read the list into a local variable
+        before looping over rows instead of indexing the property in
+        the loop.
+
+    This is the type of the categories made by
+    :func:`DR_Results.init`, :func:`DR_Results.init_extreme_cat`,
+    etc. Otherwise, it works just like
+    :class:`types.SimpleNamespace`. Categories in results saved
+    before this class was introduced are converted when loaded.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(case_names=[], maxcase_index=None, mincase_index=None)
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def __setstate__(self, state):
+        # route "maxcase" and "mincase" through the properties
+        self.__init__(**state)
+
+    def _get_cases(self, which):
+        index = getattr(self, which + "_index")
+        if index is None:
+            return None
+        return np.array(self.case_names, dtype=object)[index].tolist()
+
+    def _set_cases(self, which, cases):
+        if cases is None:
+            setattr(self, which + "_index", None)
+        else:
+            _set_case_labels(self, which, *_case_labels(cases, len(cases)))
+
+    maxcase = property(
+        lambda self: self._get_cases("maxcase"),
+        lambda self, cases: self._set_cases("maxcase", cases),
+        doc="List of the labels of the maximum cases (or None)",
+    )
+
+    mincase = property(
+        lambda self: self._get_cases("mincase"),
+        lambda self, cases: self._set_cases("mincase", cases),
+        doc="List of the labels of the minimum cases (or None)",
+    )
+
+
+def _case_labels(cases, r):
+    """
+    Convert case labels to a ``(names, index)`` tuple
+
+    `cases` is a string (used for all `r` rows), a list of strings
+    (one per row), or a ``(names, index)`` tuple already.
+    """
+    if isinstance(cases, str):
+        return [cases], np.zeros(r, np.intp)
+    if (
+        isinstance(cases, tuple)
+        and len(cases) == 2
+        and isinstance(cases[1], np.ndarray)
+    ):
+        return cases
+    lookup = {}
+    index = np.fromiter(
+        (lookup.setdefault(case, len(lookup)) for case in cases), np.intp, len(cases)
+    )
+    return list(lookup), index
+
+
+def _get_case_labels(res, which):
+    """
+    Get the `which` ("maxcase" or "mincase") labels of `res` as a
+    ``(names, index)`` tuple, or None if there are none
+    """
+    if isinstance(res, ExtremaNamespace):
+        index = getattr(res, which + "_index")
+        return None if index is None else (res.case_names, index)
+    cases = getattr(res, which, None)
+    return None if cases is None else _case_labels(cases, len(cases))
+
+
+def _add_case_names(res, names):
+    """
+    Add `names` to the case-name table of `res` (an
+    :class:`ExtremaNamespace`) and return the table index of each
+    name as an integer array
+    """
+    table = res.case_names
+    if len(names) == 1:
+        try:
+            mapping = [table.index(names[0])]
+        except ValueError:
+            mapping = [len(table)]
+            table.append(names[0])
+    else:
+        lookup = {name: i for i, name in enumerate(table)}
+        mapping = []
+        for name in names:
+            i = lookup.get(name)
+            if i is None:
+                i = lookup[name] = len(table)
+                table.append(name)
+            mapping.append(i)
+    dtype = _case_index_dtype(len(table))
+    for attr in ("maxcase_index", "mincase_index"):
+        index = getattr(res, attr)
+        if index is not None and index.dtype.itemsize < np.dtype(dtype).itemsize:
+            setattr(res, attr, index.astype(dtype))
+    return np.array(mapping, dtype)
+
+
+def _set_case_labels(res, which, names, index):
+    """
+    Set the `which` ("maxcase" or "mincase") labels of `res` from the
+    ``(names, index)`` pair
+    """
+    if isinstance(res, ExtremaNamespace):
+        setattr(res, which + "_index", _add_case_names(res, names)[index])
+    else:
+        setattr(res, which, np.array(names, dtype=object)[index].tolist())
+
+
 def extrema(curext, mm, maxcase, mincase=None, casenum=None):
     """
     Update extrema values in 'curext'
@@ -409,6 +682,10 @@ def extrema(curext, mm, maxcase, mincase=None, casenum=None):
             .maxcase = list of strings identifying maximum case
             .mincase = list of strings identifying minimum case
 
+        If `curext` is an :class:`ExtremaNamespace` (as the
+        categories of :class:`DR_Results` are), the case labels are
+        updated through its index arrays instead of the lists.
+
         Also has these members if casenum is an integer::
 
             .mx      = [case1_max, case2_max, ...]
@@ -424,12 +701,16 @@ def extrema(curext, mm, maxcase, mincase=None, casenum=None):
             .ext     = 1 or 2 columns: [max, min]
             .ext_x   = None or 1 or 2 columns: [x_of_max, x_of_min]
 
-    maxcase : string or list of strings
+    maxcase : string or list of strings or tuple
         String or list of strings identifying the load case(s) for the
         maximum values. This is analogous to `curext.maxcase` but
         pertaining to `mm` (handy if `mm` is from another extrema data
-        set).
-    mincase : string or list of strings or None; optional
+        set). Can also be a ``(names, index)`` tuple where `names` is
+        a list of unique strings and `index` is an integer ndarray
+        giving, for each row, the index of the label in `names` (like
+        the `.case_names` and `.maxcase_index` members of an
+        :class:`ExtremaNamespace`).
+    mincase : string or list of strings or tuple or None; optional
         Analogous to `maxcase` for the minimum values or None. If
         None, it is a copy of the `maxcase` values.
     casenum : integer or None; optional
@@ -462,16 +743,24 @@ def extrema(curext, mm, maxcase, mincase=None, casenum=None):
         elif curext.ext_x is not None:  # pragma: no cover
             curext.ext_x[j, col_lhs] = np.nan
 
+    def _put_case(curext, which, case, j):
+        names, index = case
+        if isinstance(curext, ExtremaNamespace):
+            mapping = _add_case_names(curext, names)
+            curindex = getattr(curext, which + "_index")
+            if len(names) == 1:
+                curindex[j] = mapping[0]
+            else:
+                curindex[j] = mapping[index[j]]
+        else:
+            curcase = getattr(curext, which)
+            for i in j.tolist():
+                curcase[i] = names[index[i]]
+
     r, c = mm.ext.shape
     if c not in [1, 2]:
         raise ValueError(f"mm.ext has {c} cols, but must have 1 or 2.")
 
-    # expand current case information to full size if necessary
-    if isinstance(maxcase, str):
-        maxcase = r * [maxcase]
-    else:
-        maxcase = maxcase[:]
-
     if c == 1:
         if casenum is not None:  # record current results
             curext.mx[:, casenum] = mm.ext[:, 0]
@@ -483,38 +772,33 @@ def extrema(curext, mm, maxcase, mincase=None, casenum=None):
                 curext.mx_x[:, casenum] = np.nan
                 curext.mn_x[:, casenum] = np.nan
 
+        maxcase = _case_labels(maxcase, r)
         if curext.ext is None:
             curext.ext = mm.ext @ [[1, 1]]
             if mm.ext_x is not None:
                 curext.ext_x = mm.ext_x @ [[1, 1]]
             else:
                 curext.ext_x = None
-            curext.maxcase = maxcase
-            curext.mincase = maxcase[:]
+            _set_case_labels(curext, "maxcase", *maxcase)
+            _set_case_labels(curext, "mincase", *maxcase)
             return
 
         # keep sign but compare based on absolute
-        j = nan_argmax(abs(curext.ext), abs(mm.ext)).nonzero()[0]
+        j = nan_argmax(abs(curext.ext), abs(mm.ext)).any(axis=1).nonzero()[0]
         if j.size > 0:
-            for i in j:
-                curext.maxcase[i] = maxcase[i]
+            _put_case(curext, "maxcase", maxcase, j)
             curext.ext[j, 0] = mm.ext[j, 0]
             _put_time(curext, mm, j, 0, 0)
 
-        j = nan_argmin(abs(curext.ext), abs(mm.ext)).nonzero()[0]
+        j = nan_argmin(abs(curext.ext), abs(mm.ext)).any(axis=1).nonzero()[0]
         if j.size > 0:
-            for i in j:
-                curext.mincase[i] = maxcase[i]
+            _put_case(curext, "mincase", maxcase, j)
             curext.ext[j, 1] = mm.ext[j, 0]
             _put_time(curext, mm, j, 1, 0)
         return
 
     if mincase is None:
-        mincase = maxcase[:]
-    elif isinstance(mincase, str):
-        mincase = r * [mincase]
-    else:
-        mincase = mincase[:]
+        mincase = maxcase
 
     if casenum is not None:  # record current results
         curext.mx[:, casenum] = mm.ext[:, 0]
@@ -526,24 +810,24 @@ def extrema(curext, mm, maxcase, mincase=None, casenum=None):
             curext.mx_x[:, casenum] = np.nan
             curext.mn_x[:, casenum] = np.nan
 
+    maxcase = _case_labels(maxcase, r)
+    mincase = _case_labels(mincase, r)
     if curext.ext is None:
         curext.ext = mm.ext.copy()
         curext.ext_x = copy.copy(mm.ext_x)
-        curext.maxcase = maxcase
-        curext.mincase = mincase
+        _set_case_labels(curext, "maxcase", *maxcase)
+        _set_case_labels(curext, "mincase", *mincase)
         return
 
     j = nan_argmax(curext.ext[:, 0], mm.ext[:, 0]).nonzero()[0]
     if j.size > 0:
-        for i in j:
-            curext.maxcase[i] = maxcase[i]
+        _put_case(curext, "maxcase", maxcase, j)
         curext.ext[j, 0] = mm.ext[j, 0]
         _put_time(curext, mm, j, 0, 0)
 
     j = nan_argmin(curext.ext[:, 1], mm.ext[:, 1]).nonzero()[0]
     if j.size > 0:
-        for i in j:
-            curext.mincase[i] = mincase[i]
+        _put_case(curext, "mincase", mincase, j)
         curext.ext[j, 1] = mm.ext[j, 1]
         _put_time(curext, mm, j, 1, 1)
 
@@ -4,14 +4,13 @@ DR_Event: Setup data recovery for a specific event or set of modes
 """
 import copy
 from types import SimpleNamespace
-import warnings
 from collections import OrderedDict
 import numpy as np
 import scipy.linalg as la
 from pyyeti.ytools import reorder_dict
 from pyyeti.nastran import n2p
 from .dr_results import DR_Results
-from ._utilities import _merge_uf_reds
+from ._utilities import _merge_uf_reds, _parse_linear_drfunc, get_drfunc
 
 
 # FIXME: We need the str/repr formatting used in Numpy < 1.14.
@@ -21,6 +20,158 @@ except TypeError:
     pass
 
 
+class _ModalSolution:
+    """
+    Unscaled modal solution shared by the :class:`_UFSolution`
+    instances from :func:`DR_Event.apply_uf`
+
+    Holds the input solution and model and computes the unscaled
+    mode-acceleration displacement terms on first use.
+    """
+
+    def __init__(self, sol, m, b, k, nrb, rfmodes):
+        self.sol = sol
+        self.m = m
+        self.b = b
+        self.k = k
+        self.nrb = nrb
+        self.rfmodes = rfmodes
+        self.n = k.shape[0]
+        self._d_parts = None
+
+    def scale(self, uf_reds, name):
+        """Mode scale factors in `uf_reds` for `name` ("a", "v", "d_static"...)"""
+        ruf, euf, duf, suf = uf_reds
+        nrb = self.nrb
+        fac = np.empty(self.n)
+        if name in ("a", "v"):
+            fac[:nrb] = ruf * suf
+            fac[nrb:] = euf * duf
+            if self.rfmodes is not None:
+                fac[self.rfmodes] = 0.0
+        else:
+            fac[:nrb] = 0.0
+            fac[nrb:] = euf * (suf if name == "d_static" else duf)
+        return fac
+
+    def d_parts(self):
+        """
+        Returns the unscaled elastic parts of `d_static` and
+        `d_dynamic`: ``inv(k_el)*F_el`` and
+        ``-inv(k_el)*(m_el*a_el + b_el*v_el)``
+        """
+        if self._d_parts is not None:
+            return self._d_parts
+        sol, m, b, k, nrb = self.sol, self.m, self.b, self.k, self.nrb
+
+        # genforce = m*a + b*v + k*d
+        if m is None:
+            genforce = sol.a[nrb:].copy()
+        elif m.ndim == 1:
+            genforce = m[nrb:, None] * sol.a[nrb:]
+        else:
+            genforce = m[nrb:] @ sol.a
+        if b.ndim == 1:
+            genforce += b[nrb:, None] * sol.v[nrb:]
+        else:
+            genforce += b[nrb:] @ sol.v
+        if k.ndim == 1:
+            genforce += k[nrb:, None] * sol.d[nrb:]
+        else:
+            genforce += k[nrb:] @ sol.d
+
+        # mass and damping terms, with rf modes zeroed out:
+        a = sol.a[nrb:]
+        v = sol.v[nrb:]
+        if self.rfmodes is not None:
+            a = a.copy()
+            v = v.copy()
+            a[self.rfmodes - nrb] = 0.0
+            v[self.rfmodes - nrb] = 0.0
+        if m is None:
+            avterm = a.copy()
+        elif m.ndim == 1:
+            avterm = m[nrb:, None] * a
+        else:
+            avterm = m[nrb:, nrb:] @ a
+        if b.ndim == 1:
+            avterm += b[nrb:, None] * v
+        else:
+            avterm += b[nrb:, nrb:] @ v
+
+        # in case there is mass coupling between rfmodes and other
+        # modes
+        if self.rfmodes is not None:
+            avterm[self.rfmodes - nrb] = 0.0
+
+        if k.ndim == 1:
+            invk = (1 / k[nrb:])[:, None]
+            static = invk * genforce
+            dynamic = -invk * avterm
+        else:
+            lup = la.lu_factor(k[nrb:, nrb:])
+            static = la.lu_solve(lup, genforce)
+            dynamic = la.lu_solve(lup, -avterm)
+        self._d_parts = static, dynamic
+        return self._d_parts
+
+
+class _UFSolution:
+    """
+    Modal solution with one set of uncertainty factors applied
+
+    Returned by :func:`DR_Event.apply_uf`. The scaled members `a`,
+    `v`, `d`, `d_static`, `d_dynamic` and `pg` are computed on first
+    access; all other attributes come from the input solution.
+    """
+
+    __slots__ = ("_base", "_uf_reds", "__dict__")
+
+    def __init__(self, base, uf_reds):
+        self._base = base
+        self._uf_reds = uf_reds
+        for name, value in vars(base.sol).items():
+            if name not in ("a", "v", "d", "pg"):
+                setattr(self, name, value)
+
+    def __getattr__(self, name):
+        # only called if `name` is not already set
+        if name.startswith("_"):
+            raise AttributeError(name)
+        base = self._base
+        if name in ("a", "v"):
+            value = base.scale(self._uf_reds, name)[:, None] * getattr(base.sol, name)
+        elif name == "pg":
+            value = base.sol.pg * self._uf_reds[3]
+        elif name in ("d_static", "d_dynamic"):
+            nrb = base.nrb
+            value = np.zeros(base.sol.a.shape, base.sol.a.dtype)
+            if nrb < base.n:
+                part = base.d_parts()[name == "d_dynamic"]
+                value[nrb:] = base.scale(self._uf_reds, name)[nrb:, None] * part
+        elif name == "d":
+            value = self.d_static + self.d_dynamic
+        else:
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {name!r}"
+            )
+        setattr(self, name, value)
+        return value
+
+    def fold(self, drm, name):
+        """
+        Compute ``drm @ self.name``
+
+        If `name` is "a" or "v" and that member has not been formed,
+        the uncertainty factors are applied to the columns of `drm`
+        instead of to the rows of the solution.
+        """
+        if name in vars(self) or name not in ("a", "v"):
+            return drm @ getattr(self, name)
+        base = self._base
+        return (drm * base.scale(self._uf_reds, name)) @ getattr(base.sol, name)
+
+
 class DR_Event:
     """
     Setup data recovery for a specific event or set of modes.
@@ -44,6 +195,10 @@ class DR_Event:
         ``DR_Def['_vars']`` dict and the current system modes. See the
         notes section below for an example showing what is in this
         dict.
+    Fused : SimpleNamespace or None
+        None unless :func:`fuse_drms` has been called; then it holds
+        the stacked data recovery matrices for fused data recovery.
+        See :func:`fuse_drms`.
 
     Notes
     -----
@@ -109,13 +264,14 @@ class DR_Event:
     def __init__(self):
         """
         Initializes the attributes `Info`, `UF_reds`, and `Vars` to
-        empty values.
+        empty values and `Fused` to None.
 
         The attributes are filled by calls to :func:`add`.
         """
         self.Info = OrderedDict()
         self.UF_reds = []
         self.Vars = {}
+        self.Fused = None
 
     def add(self, nas, drdefs, uf_reds=None, method="replace"):
         """
@@ -291,6 +447,86 @@ class DR_Event:
                     raise ValueError(f'"{name}" is already in Vars[{se}]')
                 self.Vars[se][name] = mat
 
+        if self.Fused is not None:
+            self.fuse_drms()
+
+    def fuse_drms(self):
+        """
+        Stack data recovery matrices for fused data recovery
+
+        Many categories have simple linear data recovery expressions
+        like ``drfunc = "Vars[se]['ATM'] @ sol.a"`` or
+        ``drfunc = "Vars[se]['LTMa'] @ sol.a + Vars[se]['LTMd'] @
+        sol.d"``. This routine finds those categories and stacks
+        their matrices into one tall matrix for each combination of
+        uncertainty factors (`uf_reds`), superelement and response
+        type (``sol.a``, ``sol.v`` or ``sol.d``). Then, for each case,
+        the data recovery routines
+        (:func:`DR_Results.time_data_recovery` and
+        :func:`DR_Results.frf_data_recovery`) do one large matrix
+        multiply per stacked matrix and give each category its slice
+        of the rows instead of doing a separate, skinny multiply for
+        each category.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        Sets the `Fused` attribute to a SimpleNamespace with:
+
+            ==========  =============================================
+            ``drms``    Dict of stacked matrices; the keys are
+                        ``(uf_reds, se, "a"|"v"|"d", ncols, dtype)``
+            ``rows``    Dict with the same keys; each value is a dict
+                        mapping the names of the matrices in the
+                        stack to their row slices
+            ``cats``    Dict by category name of the list of
+                        ``(key, name)`` terms to add up to get the
+                        response
+            ==========  =============================================
+
+        Data recovery for categories that are not in ``cats`` (data
+        recovery functions defined in a file or any other expression)
+        is done as usual by calling the function. Results match the
+        unfused data recovery except for round-off differences.
+
+        Call this routine after all calls to :func:`add`; if
+        :func:`add` is called afterward, the stacks are rebuilt.
+
+        The stacked matrices are in addition to the ones in `Vars`,
+        and the products for all the stacks are held in memory while
+        a case is being recovered.
+        """
+        members = {}
+        cats = {}
+        for name, dr in self.Info.items():
+            terms = _parse_linear_drfunc(dr.drfunc)
+            if terms is None:
+                continue
+            keys = []
+            for drm, comp in terms:
+                mat = self.Vars.get(dr.se, {}).get(drm)
+                if type(mat) is not np.ndarray or mat.ndim != 2:
+                    break
+                key = (dr.uf_reds, dr.se, comp, mat.shape[1], mat.dtype.str)
+                members.setdefault(key, {})[drm] = mat
+                keys.append((key, drm))
+            else:
+                cats[name] = keys
+
+        drms = {}
+        rows = {}
+        for key, dct in members.items():
+            drms[key] = np.vstack(list(dct.values()))
+            rows[key] = {}
+            i = 0
+            for drm, mat in dct.items():
+                rows[key][drm] = slice(i, i + mat.shape[0])
+                i += mat.shape[0]
+        self.Fused = SimpleNamespace(drms=drms, rows=rows, cats=cats)
+
     def set_dr_order(self, cats, where):
         """
         Set a new data recovery order
@@ -407,9 +643,22 @@ class DR_Event:
         Uses the `Info` attribute (see :class:`DR_Event`) and calls
         :func:`DR_Results.init` to build the initial results data
         structure for all data recovery categories.
+
+        The data recovery functions of all categories are also
+        resolved here (via :func:`get_drfunc`, which caches them) so
+        each file of data recovery functions is imported once instead
+        of during the data recovery for the first case. Functions
+        that cannot be resolved yet are skipped; the error will
+        surface during data recovery.
         """
         results = DR_Results()
         results.init(self.Info, mission, event)
+        for name, dr in self.Info.items():
+            if name != "_vars":
+                try:
+                    get_drfunc(dr.drfile, dr.drfunc)
+                except (OSError, ImportError, SyntaxError, AttributeError, TypeError):
+                    pass
         return results
 
     def apply_uf(self, sol, m, b, k, nrb, rfmodes):
@@ -441,13 +690,13 @@ class DR_Event:
         Returns
         -------
         solout : dict
-            Dictionary of solution namespaces with scaled versions
-            of `.a`, `.v`, `.d` and `.pg`. The keys are all the
-            "uf_reds" values. Additionally, the displacement member is
-            separated into static and dynamic parts: `.d_static`,
-            `.d_dynamic`. On output, ``.d = .d_static + .d_dynamic``.
-            For example, if one of the "uf_reds" tuples is:
-            ``(1, 1, 1.25, 1)``, then these variables will exist::
+            Dictionary of solutions with scaled versions of `.a`,
+            `.v`, `.d` and `.pg`. The keys are all the "uf_reds"
+            values. Additionally, the displacement member is separated
+            into static and dynamic parts: `.d_static`, `.d_dynamic`.
+            On output, ``.d = .d_static + .d_dynamic``. For example,
+            if one of the "uf_reds" tuples is: ``(1, 1, 1.25, 1)``,
+            then these variables will exist::
 
                 solout[(1, 1, 1.25, 1)].a
                 solout[(1, 1, 1.25, 1)].v
@@ -456,6 +705,9 @@ class DR_Event:
                 solout[(1, 1, 1.25, 1)].d_dynamic
                 solout[(1, 1, 1.25, 1)].pg (optional)
 
+            The other members of `sol` (like `.t` and `.h`) are
+            available too; they are shared with `sol`, not copied.
+
         Notes
         -----
         Uncertainty factors are applied as follows (rb=rigid-body,
@@ -484,120 +736,22 @@ class DR_Event:
         where::
 
               F = m*a + b*v + k*d
-        """
-        n = k.shape[0]
-        use_velo = True
-
-        # genforce = m*a + b*v + k*d
-        def _comp_genforce(sol, d):
-            if m is None:
-                genforce = sol.a.copy()
-            elif m.ndim == 1:
-                genforce = m[:, None] * sol.a
-            else:
-                genforce = m @ sol.a
-
-            if b.ndim == 1:
-                genforce += b[:, None] * sol.v
-            else:
-                genforce += b @ sol.v
-
-            if k.ndim == 1:
-                genforce += k[:, None] * d
-            else:
-                genforce += k @ d
-            return genforce
-
-        solout = {}
-        # This routine will do its work in two loops:
-        # - a copy loop
-        # - an apply ufs loop
-        # The copy loop is separate to be efficient, since copying
-        # from 'F' order to 'C' order is slower than 'C' to 'C'
-        last = None
-        for item in self.UF_reds:
-            if last:
-                solout[item] = copy.deepcopy(last)
-            else:
-                # we want C contiguous a, v, d variables for faster uf
-                # application
-                # - variable 'd' is skipped because it is created
-                #   below
-                solout[item] = SimpleNamespace()
-                for name, value in vars(sol).items():
-                    if name == "d":
-                        continue
-                    try:
-                        valcopy = value.copy()
-                    except AttributeError:
-                        valcopy = copy.deepcopy(value)
-                    setattr(solout[item], name, valcopy)
-                last = solout[item]
-                genforce = _comp_genforce(last, sol.d)
-
-        for item in self.UF_reds:
-            ruf, euf, duf, suf = item
-            SOL = solout[item]
-            SOL.d_static = np.empty_like(SOL.a)
-            SOL.d_dynamic = np.empty_like(SOL.a)
-
-            # apply ufs:
-            if nrb > 0:
-                SOL.a[:nrb] *= ruf * suf
-                SOL.v[:nrb] *= ruf * suf
-                SOL.d_static[:nrb] = 0.0
-                SOL.d_dynamic[:nrb] = 0.0
-
-            if rfmodes is not None:
-                SOL.a[rfmodes] = 0.0
-                SOL.v[rfmodes] = 0.0
-
-            try:
-                SOL.pg *= suf
-            except AttributeError:
-                pass
 
-            if nrb < n:
-                SOL.a[nrb:] *= euf * duf
-                SOL.v[nrb:] *= euf * duf
-
-                if m is None:
-                    avterm = SOL.a[nrb:].copy()
-                elif m.ndim == 1:
-                    avterm = m[nrb:, None] * SOL.a[nrb:]
-                else:
-                    avterm = m[nrb:, nrb:] @ SOL.a[nrb:]
-
-                if not use_velo:  # pragma: no cover
-                    msg = (
-                        "not including velocity term in mode-"
-                        "acceleration formulation for "
-                        "displacements."
-                    )
-                    warnings.warn(msg, RuntimeWarning)
-                else:
-                    if b.ndim == 1:
-                        avterm += b[nrb:, None] * SOL.v[nrb:]
-                    else:
-                        avterm += b[nrb:, nrb:] @ SOL.v[nrb:]
-
-                # in case there is mass coupling between rfmodes and
-                # other modes
-                if rfmodes is not None:
-                    avterm[rfmodes - nrb] = 0.0
-
-                gf = (euf * suf) * genforce[nrb:]
-                if k.ndim == 1:
-                    invk = (1 / k[nrb:])[:, None]
-                    SOL.d_static[nrb:] = invk * gf
-                    SOL.d_dynamic[nrb:, :] = -invk * avterm
-                else:
-                    lup = la.lu_factor(k[nrb:, nrb:])
-                    SOL.d_static[nrb:] = la.lu_solve(lup, gf)
-                    SOL.d_dynamic[nrb:, :] = la.lu_solve(lup, -avterm)
-
-                SOL.d = SOL.d_static + SOL.d_dynamic
-        return solout
+        The scaled members are computed lazily: nothing is copied or
+        scaled until a member is first accessed, and then only that
+        member is computed for that "uf_reds" tuple (it is saved for
+        later access). The mode-acceleration displacement terms
+        ``inv(k_el)*F_el`` and ``inv(k_el)*(a_el+b_el*v_el)`` are
+        only computed if a displacement member is accessed and are
+        computed just once for all "uf_reds" tuples; the tuples only
+        scale them. Data recovery with fused matrices (see
+        :func:`fuse_drms`) uses the ``fold(drm, name)`` method of
+        each solution to compute ``drm @ sol.a`` and ``drm @ sol.v``
+        by scaling the columns of `drm` instead of the rows of the
+        solution, so `a` and `v` need not be formed at all.
+        """
+        base = _ModalSolution(sol, m, b, k, nrb, rfmodes)
+        return {item: _UFSolution(base, item) for item in self.UF_reds}
 
     def frf_apply_uf(self, sol, nrb):
         """
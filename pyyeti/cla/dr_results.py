@@ -4,15 +4,27 @@ DR_Results: manipulating data recovery results
 """
 import os
 import copy
-from collections import OrderedDict
+import pickle
+import hashlib
+import multiprocessing as mp
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from types import SimpleNamespace
 import warnings
 import copyreg
 import numpy as np
 import matplotlib.pyplot as plt
 import xlsxwriter
-from pyyeti import locate, srs
-from ._utilities import maxmin, extrema, get_drfunc
+from pyyeti import locate, srs, ytools
+from ._utilities import (
+    maxmin,
+    extrema,
+    get_drfunc,
+    ExtremaNamespace,
+    _case_labels,
+    _get_case_labels,
+    _set_case_labels,
+)
 from ._rptext1 import rptext1
 from ._rptpct1 import rptpct1
 from ._rpttab1 import rpttab1
@@ -291,7 +303,7 @@ class DR_Results(OrderedDict):
         for name in Info:
             if name == "_vars" or (cats and name not in cats):
                 continue
-            self[name] = SimpleNamespace(
+            self[name] = ExtremaNamespace(
                 ext=None,
                 maxcase=None,
                 mincase=None,
@@ -300,7 +312,7 @@ class DR_Results(OrderedDict):
                 drminfo=copy.copy(Info[name]),
             )
 
-    def merge(self, results_iter, rename_dict=None):
+    def merge(self, results_iter, rename_dict=None, strip_hists=False):
         """
         Merge CLA results together into a larger :class:`DR_Results`
         hierarchy.
@@ -310,11 +322,18 @@ class DR_Results(OrderedDict):
         results_iter : iterable
             Iterable of :class:`DR_Results` items to merge. (Can be
             list, tuple, generator expression, or other Python
-            iterable.)
+            iterable.) Items can also be file names; these are loaded
+            with :func:`pyyeti.ytools.load` one at a time.
         rename_dict : dict; optional
             Used to rename entries in final `self` results structure.
             The key is old name and the value is the new name. See
             example below.
+        strip_hists : bool; optional
+            If True, :func:`strip_hists` is called for each item as
+            it is merged. Only the extrema are kept, so at most one
+            item's response histories are in memory at a time. This
+            is useful for enveloping many large events with
+            :func:`form_extreme`.
 
         Returns
         -------
@@ -360,6 +379,15 @@ class DR_Results(OrderedDict):
            results.form_extreme()
            results['extreme'].rpttab()
            cla.save('results.pgz', results)
+
+        The same, but without keeping more than one event's
+        histories in memory::
+
+           results = cla.DR_Results()
+           results.merge(['../liftoff/results.pgz',
+                          '../meco/results.pgz'],
+                         {'LO': 'Liftoff'}, strip_hists=True)
+           results.form_extreme()
         """
 
         def _get_event_name(results):
@@ -378,6 +406,10 @@ class DR_Results(OrderedDict):
 
         events = []
         for results in results_iter:
+            if isinstance(results, (str, os.PathLike)):
+                results = ytools.load(results)
+            if strip_hists:
+                results.strip_hists()
             event = _get_event_name(results)
             if rename_dict is not None:
                 try:
@@ -739,17 +771,11 @@ class DR_Results(OrderedDict):
 
         # process maxcase, mincase:
         r = self[cat].ext.shape[0]
-        if isinstance(maxcase, str):
-            self[cat].maxcase = r * [maxcase]
-        else:
-            self[cat].maxcase = maxcase[:]
-
-        if mincase is None:
-            self[cat].mincase = self[cat].maxcase[:]
-        elif isinstance(mincase, str):
-            self[cat].mincase = r * [mincase]
-        else:
-            self[cat].mincase = mincase[:]
+        maxcase = _case_labels(maxcase, r)
+        _set_case_labels(self[cat], "maxcase", *maxcase)
+        if mincase is not None:
+            maxcase = _case_labels(mincase, r)
+        _set_case_labels(self[cat], "mincase", *maxcase)
 
     def _store_maxmin(self, res, mm, j, case):
         try:
@@ -778,10 +804,8 @@ class DR_Results(OrderedDict):
         m = mm.ext.shape[0]
         self._check_labels_len(name, res, m)
         res.domain = domain
-        res.mx = np.zeros((m, n))
-        res.mn = np.zeros((m, n))
-        res.mx_x = np.zeros((m, n))
-        res.mn_x = np.zeros((m, n))
+        for attr in _STORE_MXMN:
+            setattr(res, attr, self._zeros((name, attr), (m, n), float))
         res.cases = n * [[]]
         return m
 
@@ -794,49 +818,196 @@ class DR_Results(OrderedDict):
         if dr.histpv is not None and dohist:
             m = len(resp[dr.histpv, 0])
             setattr(res, xname, x)
-            setattr(res, respname, np.zeros((n, m, len(x)), resp.dtype))
+            arr = self._zeros((name, respname), (n, m, len(x)), resp.dtype)
+            setattr(res, respname, arr)
         if dr.srspv is not None and dosrs:
             res.srs = SimpleNamespace(frq=dr.srsfrq, units=dr.srsunits, srs={}, ext={})
             m = len(resp[dr.srspv, 0])
             sh = (n, m, (len(res.srs.frq)))
             for q in dr.srsQs:
-                res.srs.srs[q] = np.zeros(sh)
+                res.srs.srs[q] = self._zeros((name, "srs", q), sh, float)
+
+    def _zeros(self, key, shape, dtype):
+        # allocate a results array; in the store if one is open
+        store = getattr(self, "_store", None)
+        if store is None:
+            return np.zeros(shape, dtype)
+        filename = f"{len(store.files)}.npy"
+        store.files[key] = filename
+        return np.lib.format.open_memmap(
+            os.path.join(store.dirname, filename), "w+", dtype, shape
+        )
 
-    def _compute_srs(self, res, dr, resp, respname, x, j, first, sr=None, pf=None):
-        if _is_eqsine(dr.srsopts):
-            res.srs.type = "eqsine"
-            eqsine = True
-        else:
-            res.srs.type = "srs"
-            eqsine = False
-
-        rr = resp[dr.srspv].T
-        for q in dr.srsQs:
-            fact = dr.srsconv
-
-            # compute the srs:
-            if respname == "hist":
-                srs_cur = fact * srs.srs(rr, sr, dr.srsfrq, q, **dr.srsopts).T
-            elif respname == "frf":
-                if eqsine:
-                    fact /= q
-                srs_cur = fact * srs.srs_frf(rr, x, dr.srsfrq, q).T
-            elif respname == "psd":
-                fact *= pf
-                if eqsine:
-                    fact /= q
-                srs_cur = fact * srs.vrs((x, rr), x, q, Fn=dr.srsfrq, linear=True).T
-            else:  # pragma: no cover
+    def open_store(self, dirname, resume=False):
+        """
+        Keep the results for this event on disk, with checkpoints
+
+        Parameters
+        ----------
+        dirname : string
+            Name of the directory for the store; it is created if
+            needed.
+        resume : bool; optional
+            If True and `dirname` has a checkpoint from an earlier
+            (possibly interrupted) run, the results are restored from
+            it so the run can be resumed. If False and `dirname` has
+            a checkpoint, a :class:`ValueError` is raised (so old
+            results are not mixed in by accident).
+
+        Returns
+        -------
+        next_case : integer
+            Index of the first case that still needs to be run: 0
+            for a new store, or one more than the last case of the
+            checkpoint.
+
+        Raises
+        ------
+        ValueError
+            If `dirname` has a checkpoint and `resume` is False, or
+            if the categories of the checkpoint do not match those of
+            `self`.
+
+        Notes
+        -----
+        Call this routine right after :func:`DR_Event.prepare_results`
+        (before data recovery for the first case). After that, the
+        arrays that grow with the number of cases and would be
+        allocated in memory (the response histories `.hist`, `.frf`
+        or `.psd`, the SRSs in `.srs.srs`, and `.mx`, `.mn`, `.mx_x`,
+        `.mn_x` and `.rms`) are instead memory-mapped ".npy" files in
+        `dirname`. Each data recovery call
+        (:func:`time_data_recovery`, :func:`frf_data_recovery`,
+        :func:`psd_data_recovery` or :func:`run_time_cases`) writes
+        its case into them. It then writes a checkpoint of everything
+        else (the extrema, case lists, etc), along with the total
+        number of cases and the case names so far. The checkpoint is
+        written to a temporary file first and then renamed, so it
+        always describes a completed case.
+
+        To resume an interrupted run, call :func:`open_store` with
+        the same directory and ``resume=True`` and skip the cases
+        before `next_case` (:func:`run_time_cases` does this
+        automatically)::
+
+            results = DR.prepare_results(mission, event)
+            j0 = results.open_store("event_results", resume=True)
+            for j, force in enumerate(forces):
+                if j < j0:
+                    continue
+                ...
+                results.time_data_recovery(sol, nas, case, DR, n, j)
+
+        When resuming, the total number of cases passed to the data
+        recovery routines must match the checkpoint; otherwise, a
+        :class:`ValueError` is raised. :func:`run_time_cases` also
+        checks that the names of the cases before `next_case` match
+        the checkpoint.
+
+        Use :func:`load_store` to open the results of a store later
+        without reading the arrays into memory.
+        """
+        os.makedirs(dirname, exist_ok=True)
+        store = SimpleNamespace(dirname=dirname, files={}, last=-1, n=None, cases=[])
+        if os.path.exists(os.path.join(dirname, _STORE_CHECKPOINT)):
+            if not resume:
                 raise ValueError(
-                    "`respname` must be one of: " '"hist", "frf", or "psd"'
+                    f"store {dirname!r} already has a checkpoint; use "
+                    "`resume=True` to resume it or remove it first"
                 )
+            self._store = store
+            try:
+                _load_store(self, dirname, "r+", names=list(self))
+            except ValueError:
+                del self._store
+                raise
+        self._store = store
+        return store.last + 1
+
+    @staticmethod
+    def load_store(dirname, mode="r"):
+        """
+        Load results from a store made by :func:`open_store`
+
+        Parameters
+        ----------
+        dirname : string
+            Name of the store directory
+        mode : string; optional
+            Mode for opening the memory-mapped arrays; see
+            :func:`numpy.load`. The default is read-only.
+
+        Returns
+        -------
+        results : :class:`DR_Results` instance
+            The results as of the last checkpoint. The arrays kept
+            in the store (see :func:`open_store`) are memory-mapped
+            from the files in the store, so they are only read as
+            needed.
+        """
+        results = DR_Results()
+        _load_store(results, dirname, mode)
+        return results
+
+    def _check_store(self, n, j):
+        # check case `j` of `n` against the store (if one is open)
+        store = getattr(self, "_store", None)
+        if store is None:
+            return
+        if store.n is None:
+            store.n = n
+        elif n != store.n:
+            raise ValueError(
+                f"number of cases ({n}) does not match that of store "
+                f"{store.dirname!r} ({store.n})"
+            )
+        if j <= store.last:
+            raise ValueError(
+                f"case {j} is already in the checkpoint of store "
+                f"{store.dirname!r}; the next case is {store.last + 1}"
+            )
+
+    def _checkpoint(self, j, case):
+        # checkpoint the results after case `j` if a store is open
+        store = getattr(self, "_store", None)
+        if store is None:
+            return
+        state = OrderedDict()
+        for name, res in self.items():
+            res = state[name] = copy.copy(res)
+            for attr in (*_STORE_MXMN, "rms", "hist", "frf", "psd"):
+                arr = getattr(res, attr, None)
+                if (name, attr) in store.files and arr is not None:
+                    arr.flush()
+                    setattr(res, attr, None)
+            if any(key[:2] == (name, "srs") for key in store.files):
+                res.srs = copy.copy(res.srs)
+                res.srs.srs = dict.fromkeys(res.srs.srs)
+                for arr in self[name].srs.srs.values():
+                    arr.flush()
+        store.last = j
+        store.cases[j:] = [case]
+        meta = dict(n=store.n, cases=store.cases, names=list(self))
+        filename = os.path.join(store.dirname, _STORE_CHECKPOINT)
+        with open(filename + ".tmp", "wb") as f:
+            pickle.dump(
+                (j, store.files, state, meta), f, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(filename + ".tmp", filename)
 
-            # store results and keep track of extreme srs:
-            res.srs.srs[q][j] = srs_cur
+    def _compute_srs(self, res, dr, resp, respname, x, j, first, sr=None, pf=None):
+        srstype, srs_cur = _calc_srs(dr, resp, respname, x, sr, pf)
+        self._store_srs(res, srstype, srs_cur, j, first)
+
+    def _store_srs(self, res, srstype, srs_cur, j, first):
+        # store results and keep track of extreme srs:
+        res.srs.type = srstype
+        for q, srs_q in srs_cur.items():
+            res.srs.srs[q][j] = srs_q
             if first:
-                res.srs.ext[q] = srs_cur
+                res.srs.ext[q] = srs_q
             else:
-                res.srs.ext[q] = np.fmax(res.srs.ext[q], srs_cur)
+                res.srs.ext[q] = np.fmax(res.srs.ext[q], srs_q)
 
     def time_data_recovery(self, sol, nas, case, DR, n, j, dosrs=True):
         """
@@ -880,39 +1051,188 @@ class DR_Results(OrderedDict):
         The `self` results dictionary is updated (see
         :class:`DR_Results` for an example).
         """
+        pieces = _time_case_recovery(list(self), sol, nas, DR, dosrs)
+        self._store_time_case(pieces, case, DR, n, j, dosrs)
+
+    def _store_time_case(self, pieces, case, DR, n, j, dosrs):
+        # store output of :func:`_time_case_recovery` for case `j`
+        self._check_store(n, j)
         for name, res in self.items():
             first = res.ext is None
             dr = DR.Info[name]  # record with: .desc, .labels, ...
-            uf_reds = dr.uf_reds
-            SOL = sol[uf_reds]
-            drfunc = get_drfunc(dr.drfile, dr.drfunc)
-            resp = drfunc(SOL, nas, DR.Vars, dr.se)
-
-            mm = maxmin(resp, SOL.t)
-            extrema(res, mm, case)
+            pc = pieces[name]
+            extrema(res, pc.mm, case)
 
             if first:
                 self._init_results_cat(
                     name,
                     dr,
-                    resp,
+                    pc.resp0,
                     "hist",
-                    SOL.t,
+                    pc.t,
                     "time",
-                    mm,
+                    pc.mm,
                     n,
                     dohist=True,
                     dosrs=dosrs,
                 )
 
-            self._store_maxmin(res, mm, j, case)
+            self._store_maxmin(res, pc.mm, j, case)
 
             if dr.histpv is not None:
-                res.hist[j] = resp[dr.histpv]
+                res.hist[j] = pc.hist
 
             if dr.srspv is not None and dosrs:
-                sr = 1 / SOL.h if SOL.h else None
-                self._compute_srs(res, dr, resp, "hist", SOL.t, j, first, sr=sr)
+                self._store_srs(res, pc.srstype, pc.srs, j, first)
+        self._checkpoint(j, case)
+
+    def run_time_cases(
+        self,
+        DR,
+        solver_factory,
+        cases,
+        nas=None,
+        dosrs=True,
+        executor=None,
+        batch_size=None,
+        nworkers=None,
+    ):
+        """
+        Run time-domain load cases and do data recovery for each
+
+        Parameters
+        ----------
+        DR : instance of :class:`DR_Event`
+            Defines data recovery for the event; see
+            :func:`time_data_recovery`.
+        solver_factory : callable
+            Called with no arguments to set up the solver; it must
+            return a function ``solve(data)`` that returns the
+            solution for one case ready for data recovery (the output
+            of :func:`DR_Event.apply_uf`, with the ``.t`` time
+            vector). `solver_factory` is called once for each batch
+            of cases (see `batch_size`) so that the expensive set up
+            (for example, creating a :class:`pyyeti.ode.SolveUnc`
+            instance) is done once per batch instead of once per case.
+        cases : iterable
+            Iterable of ``(case, data)`` tuples, one for each load
+            case, in case order. `case` is the unique string
+            identifying the case (see :func:`time_data_recovery`) and
+            `data` is passed to ``solve``.
+        nas : any object; optional
+            Passed to the data recovery functions; see `dr_object` in
+            :func:`time_data_recovery`.
+        dosrs : bool; optional
+            If False, do not calculate SRSs; default is to calculate
+            them.
+        executor : :class:`concurrent.futures.Executor` or None; optional
+            If None, the cases are run one after the other in this
+            process. Otherwise, batches of cases are submitted to
+            `executor`; for example, a
+            :class:`concurrent.futures.ProcessPoolExecutor` to use all
+            cores, or an executor that distributes work over several
+            computers.
+        batch_size : integer or None; optional
+            Number of cases run in each task submitted to `executor`.
+            If None, the cases are split into about four batches per
+            worker (see `nworkers`). Ignored if `executor` is None.
+        nworkers : integer or None; optional
+            Number of workers in `executor`. At most ``2*nworkers``
+            batches are submitted at a time. If None, the
+            ``_max_workers`` attribute of `executor` is used (as set
+            by the executors in :mod:`concurrent.futures`); if
+            `executor` does not have that attribute,
+            :func:`multiprocessing.cpu_count` is used. Set this for
+            executors that distribute work over several computers.
+            Ignored if `executor` is None.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        If a store is open (see :func:`open_store`), cases before the
+        last checkpoint are skipped so an interrupted run resumes
+        where it stopped.
+
+        This routine is equivalent to the usual serial loop::
+
+            solve = solver_factory()
+            for j, (case, data) in enumerate(cases):
+                sol = solve(data)
+                self.time_data_recovery(sol, nas, case, DR, n, j, dosrs)
+
+        With an `executor`, each batch of cases is run in a worker:
+        the worker solves each case and runs the data recovery
+        functions, returning the extrema, response histories and
+        SRSs for the case. These are stored in this process in case
+        order (extrema are merged exactly as in the serial loop), so
+        the results are identical to those of the serial loop no
+        matter which batches finish first. Since at most
+        ``2*nworkers`` batches are in flight at a time, only the
+        results of those batches are held in this process while
+        waiting to be stored.
+
+        For the tasks to be sent to another process, `DR`, `nas`,
+        `solver_factory` and the items in `cases` must be picklable;
+        in particular, `solver_factory` must be defined at the
+        module level (a :func:`functools.partial` of such a function
+        is fine). They are sent to the worker once for each batch.
+        On Windows, be sure the :func:`run_time_cases` call is
+        contained within: ``if __name__ == "__main__":``
+        """
+        cases = list(cases)
+        n = len(cases)
+        store = getattr(self, "_store", None)
+        j0 = 0 if store is None else store.last + 1
+        if j0 > 0:
+            self._check_store(n, j0)
+            names = [case for case, data in cases[:j0]]
+            if names != store.cases:
+                raise ValueError(
+                    f"the first {j0} case names do not match those of "
+                    f"store {store.dirname!r}: {names} vs {store.cases}"
+                )
+        if executor is None:
+            solve = solver_factory()
+            for j, (case, data) in enumerate(cases[j0:], j0):
+                sol = solve(data)
+                self.time_data_recovery(sol, nas, case, DR, n, j, dosrs)
+            return
+
+        if nworkers is None:
+            nworkers = getattr(executor, "_max_workers", None) or mp.cpu_count()
+        nworkers = max(int(nworkers), 1)
+        if batch_size is None:
+            batch_size = -(-(n - j0) // (4 * nworkers))
+        batch_size = max(int(batch_size), 1)
+        names = list(self)
+
+        def _store_next():
+            nonlocal j
+            for pieces in futures.popleft().result():
+                self._store_time_case(pieces, cases[j][0], DR, n, j, dosrs)
+                j += 1
+
+        futures = deque()
+        j = j0
+        for i in range(j0, n, batch_size):
+            if len(futures) >= 2 * nworkers:
+                _store_next()
+            futures.append(
+                executor.submit(
+                    _run_time_cases_batch,
+                    names,
+                    DR,
+                    nas,
+                    solver_factory,
+                    [data for case, data in cases[i : i + batch_size]],
+                    dosrs,
+                )
+            )
+        while futures:
+            _store_next()
 
     def frf_data_recovery(self, sol, nas, case, DR, n, j, dosrs=True):
         """
@@ -956,13 +1276,14 @@ class DR_Results(OrderedDict):
         The `self` results dictionary is updated (see
         :class:`DR_Results` for an example).
         """
+        self._check_store(n, j)
+        products = {}
         for name, res in self.items():
             first = res.ext is None
             dr = DR.Info[name]  # record with: .desc, .labels, ...
             uf_reds = dr.uf_reds
             SOL = sol[uf_reds]
-            drfunc = get_drfunc(dr.drfile, dr.drfunc)
-            resp = drfunc(SOL, nas, DR.Vars, dr.se)
+            resp = _drfunc_response(name, dr, SOL, nas, DR, products)
 
             mm = maxmin(abs(resp), SOL.f)
             mm.ext[:, 1] = -mm.ext[:, 0]
@@ -990,6 +1311,7 @@ class DR_Results(OrderedDict):
 
             if dr.srspv is not None and dosrs:
                 self._compute_srs(res, dr, resp, "frf", SOL.f, j, first)
+        self._checkpoint(j, case)
 
     def solvepsd(
         self,
@@ -1281,6 +1603,7 @@ class DR_Results(OrderedDict):
             sumpsd = p[:, :-1] + p[:, 1:]
             return np.sqrt((df * sumpsd).sum(axis=1) / 2)
 
+        self._check_store(n, j)
         for name, res in self.items():
             first = res.ext is None
             dr = DR.Info[name]  # record with: .desc, .labels, ...
@@ -1320,7 +1643,7 @@ class DR_Results(OrderedDict):
                     dohist=True,
                     dosrs=dosrs,
                 )
-                res.rms = np.zeros((rms.shape[0], n))
+                res.rms = self._zeros((name, "rms"), (rms.shape[0], n), float)
 
             self._store_maxmin(res, mm, j, case)
             res.rms[:, j] = rms
@@ -1339,6 +1662,7 @@ class DR_Results(OrderedDict):
 
         if j == n - 1:
             del res._psd
+        self._checkpoint(j, case)
 
     def calc_ext(self):
         """
@@ -1371,9 +1695,8 @@ class DR_Results(OrderedDict):
             argmx = res.mx.argmax(axis=1)
             argmn = res.mn.argmin(axis=1)
             res.ext = np.column_stack((mx, mn))
-            cases = res.cases
-            res.maxcase = [cases[i] for i in argmx]
-            res.mincase = [cases[i] for i in argmn]
+            _set_case_labels(res, "maxcase", res.cases, argmx)
+            _set_case_labels(res, "mincase", res.cases, argmn)
             res.ext_x = None
 
             # handle SRS if it is there:
@@ -1414,7 +1737,9 @@ class DR_Results(OrderedDict):
             mx = res.mx.mean(axis=1) + k * res.mx.std(ddof=1, axis=1)
             mn = res.mn.mean(axis=1) - k * res.mn.std(ddof=1, axis=1)
             res.ext = np.column_stack((mx, mn))
-            res.maxcase = res.mincase = ["Statistical"] * mx.shape[0]
+            index = np.zeros(mx.shape[0], np.intp)
+            _set_case_labels(res, "maxcase", ["Statistical"], index)
+            _set_case_labels(res, "mincase", ["Statistical"], index)
             res.ext_x = None
 
             # handle SRS if it is there:
@@ -1699,7 +2024,7 @@ class DR_Results(OrderedDict):
         mn_x[:] = np.nan
         drminfo = copy.copy(oldcat.drminfo)
 
-        ret = SimpleNamespace(
+        ret = ExtremaNamespace(
             cases=cases,
             drminfo=drminfo,
             mission=oldcat.mission,
@@ -1729,7 +2054,9 @@ class DR_Results(OrderedDict):
 
         return ret
 
-    def form_extreme(self, ext_name="Envelope", case_order=None, doappend=2):
+    def form_extreme(
+        self, ext_name="Envelope", case_order=None, doappend=2, nthreads=1
+    ):
         """
         Form extreme response over sets of results
 
@@ -1769,6 +2096,11 @@ class DR_Results(OrderedDict):
                         (do not append any keys).
             ==========  ==============================================
 
+        nthreads : integer; optional
+            Number of threads to use; the categories are enveloped
+            independently of each other. The results do not depend
+            on `nthreads`.
+
         Notes
         -----
         This routine will create 'extreme' dictionaries at all
@@ -1812,13 +2144,14 @@ class DR_Results(OrderedDict):
                 doappend = 1
             maxcase = mincase = case
             # handle 1 and 3 settings:
-            if "maxcase" in val.__dict__:  # always true?
-                if doappend == 1:
-                    maxcase = [case + "," + i for i in val.maxcase]
-                    mincase = [case + "," + i for i in val.mincase]
-                elif doappend == 3:
-                    maxcase = val.maxcase
-                    mincase = val.mincase
+            if doappend in (1, 3):
+                maxlbls = _get_case_labels(val, "maxcase")
+                minlbls = _get_case_labels(val, "mincase")
+                if maxlbls is not None and minlbls is not None:
+                    if doappend == 1:
+                        maxlbls = [case + "," + i for i in maxlbls[0]], maxlbls[1]
+                        minlbls = [case + "," + i for i in minlbls[0]], minlbls[1]
+                    maxcase, mincase = maxlbls, minlbls
             return maxcase, mincase
 
         def _expand(ext_old, labels, pv):
@@ -1837,14 +2170,13 @@ class DR_Results(OrderedDict):
                     new[:] = np.nan
                     new[pv] = old
                     ext_new.__dict__[name] = new
-            if ext_old.maxcase is not None:
-                maxcase = ["n/a" for i in range(n)]
-                mincase = ["n/a" for i in range(n)]
-                for i, j in enumerate(pv):
-                    maxcase[j] = ext_old.maxcase[i]
-                    mincase[j] = ext_old.mincase[i]
-                ext_new.maxcase = maxcase
-                ext_new.mincase = mincase
+            for which in ("maxcase", "mincase"):
+                lbls = _get_case_labels(ext_old, which)
+                if lbls is not None:
+                    names, index = lbls
+                    new = np.full(n, len(names), np.intp)
+                    new[pv] = index
+                    _set_case_labels(ext_new, which, [*names, "n/a"], new)
             return ext_new
 
         def _check_row_compatibility(ext1, ext2):
@@ -1871,40 +2203,59 @@ class DR_Results(OrderedDict):
                 cases = list(dct)
             else:
                 cases = [str(i) for i in case_order]
-            new_ext = DR_Results()
-            domain = None
-            for j, case in enumerate(cases):
+            curexts = []
+            for case in cases:
                 try:
-                    curext = dct[case]["extreme"]
-                    use_ext = True
+                    curexts.append((dct[case]["extreme"], True))
                 except KeyError:
-                    curext = dct[case]
-                    use_ext = False
-                domain = None
-                for drm, val in curext.items():
-                    if drm not in new_ext:
-                        new_ext[drm] = new_ext.init_extreme_cat(
+                    curexts.append((dct[case], False))
+
+            def _calc_extreme_cat(drm):
+                # envelope category `drm` over all cases
+                ext = None
+                for j, (case, (curext, use_ext)) in enumerate(zip(cases, curexts)):
+                    try:
+                        val = curext[drm]
+                    except KeyError:
+                        continue
+                    if ext is None:
+                        ext = DR_Results.init_extreme_cat(
                             cases, val, ext_name, DEFDOMAIN
                         )
                     else:
-                        new_ext[drm], val = _check_row_compatibility(new_ext[drm], val)
-                    if domain is not None:
-                        if domain != val.domain:
-                            domain = DEFDOMAIN
-                    else:
-                        domain = val.domain
+                        ext, val = _check_row_compatibility(ext, val)
                     maxcase, mincase = _mk_case_lbls(
                         case, val, use_ext, doappend=doappend
                     )
-                    extrema(new_ext[drm], val, maxcase, mincase, j)
+                    extrema(ext, val, maxcase, mincase, j)
 
                     osrs = getattr(val, "srs", None)
                     if osrs is not None:
-                        _ext = new_ext[drm].srs.ext
-                        _srs = new_ext[drm].srs.srs
+                        _ext = ext.srs.ext
+                        _srs = ext.srs.srs
                         for Q, S in osrs.ext.items():
                             _ext[Q] = np.fmax(_ext[Q], S)
                             _srs[Q][j] = S
+                return ext
+
+            # categories in order of first appearance:
+            drms = list(OrderedDict.fromkeys(drm for c, u in curexts for drm in c))
+            if nthreads > 1 and len(drms) > 1:
+                with ThreadPoolExecutor(max_workers=nthreads) as pool:
+                    exts = list(pool.map(_calc_extreme_cat, drms))
+            else:
+                exts = [_calc_extreme_cat(drm) for drm in drms]
+            new_ext = DR_Results(zip(drms, exts))
+
+            # the domain is set according to the last case:
+            domain = None
+            if curexts:
+                for val in curexts[-1][0].values():
+                    if domain is not None:
+                        if domain != val.domain:
+                            domain = DEFDOMAIN
+                    else:
+                        domain = val.domain
 
             if domain != DEFDOMAIN:
                 for val in new_ext.values():
@@ -1951,7 +2302,14 @@ class DR_Results(OrderedDict):
                     pass
 
     def rptext(
-        self, event=None, direc="ext", doabsmax=False, numform="{:13.5e}", perpage=-1
+        self,
+        event=None,
+        direc="ext",
+        doabsmax=False,
+        numform="{:13.5e}",
+        perpage=-1,
+        executor=None,
+        skip_unchanged=False,
     ):
         """
         Writes .ext files for all max/min results.
@@ -1972,15 +2330,35 @@ class DR_Results(OrderedDict):
         perpage : integer; optional
             The number of lines to write perpage. If < 0, there is no
             limit (one page).
+        executor : :class:`concurrent.futures.Executor` or None; optional
+            If not None, the reports for the categories are written in
+            parallel by submitting them to this executor. It must run
+            the jobs in other processes (for example, a
+            :class:`concurrent.futures.ProcessPoolExecutor`); the
+            workers use the "Agg" backend, so figures are not
+            displayed. Only the parts of the categories that the
+            reports use are sent to the workers (the response
+            histories and SRSs are not).
+        skip_unchanged : bool; optional
+            If True, a report is only written if its inputs changed
+            since the last time it was written into `direc` (or if
+            the file does not exist). See notes.
 
         Notes
         -----
         The output files contain the maximums, minimums and cases as
         applicable. The file names are determined from the category
         names.
+
+        With `skip_unchanged`, a digest of the inputs for each report
+        is recorded in the file ".report_digests.pickle" in `direc`.
+        The digests are only computed when `skip_unchanged` is True;
+        reports written with it False are dropped from that file so
+        they will be written again the next time.
         """
         if not os.path.exists(direc):
             os.mkdir(direc)
+        jobs = []
         for name, res in self.items():
             self._check_labels_len(name, res)
             mission = res.mission
@@ -1988,16 +2366,21 @@ class DR_Results(OrderedDict):
                 event = res.event
             title = f"{mission} - {event} Extrema Results"
             filename = os.path.join(direc, name + ".ext")
-            rptext1(
-                res,
-                filename,
-                title=title,
-                doabsmax=doabsmax,
-                numform=numform,
-                perpage=perpage,
+            kwargs = dict(
+                title=title, doabsmax=doabsmax, numform=numform, perpage=perpage
             )
+            jobs.append((filename, rptext1, (_report_cat(res), filename), kwargs))
+        _write_reports(direc, jobs, executor, skip_unchanged)
 
-    def rpttab(self, event=None, direc="tab", count_filter=1e-6, excel=False):
+    def rpttab(
+        self,
+        event=None,
+        direc="tab",
+        count_filter=1e-6,
+        excel=False,
+        executor=None,
+        skip_unchanged=False,
+    ):
         """
         Write results tables with bin count information.
 
@@ -2018,6 +2401,22 @@ class DR_Results(OrderedDict):
             each data recovery category. If a string, a single '.xlsx'
             file named ``excel + '.xlsx'`` is created with all data
             recovery categories in it.
+        executor : :class:`concurrent.futures.Executor` or None; optional
+            If not None, the reports for the categories are written in
+            parallel by submitting them to this executor. It must run
+            the jobs in other processes (for example, a
+            :class:`concurrent.futures.ProcessPoolExecutor`); the
+            workers use the "Agg" backend, so figures are not
+            displayed. Only the parts of the categories that the
+            reports use are sent to the workers (the response
+            histories and SRSs are not).
+        skip_unchanged : bool; optional
+            If True, a report is only written if its inputs changed
+            since the last time it was written into `direc` (or if
+            the file does not exist). See notes.
+
+            `executor` and `skip_unchanged` are not used if `excel`
+            is a string.
 
         Notes
         -----
@@ -2030,6 +2429,11 @@ class DR_Results(OrderedDict):
 
         The file names are determined from the category names (unless
         `excel` provides the single '.xlsx' filename).
+        With `skip_unchanged`, a digest of the inputs for each report
+        is recorded in the file ".report_digests.pickle" in `direc`.
+        The digests are only computed when `skip_unchanged` is True;
+        reports written with it False are dropped from that file so
+        they will be written again the next time.
         """
         if not os.path.exists(direc):
             os.mkdir(direc)
@@ -2041,6 +2445,7 @@ class DR_Results(OrderedDict):
             filename = workbook
         else:
             workbook = None
+        jobs = []
         try:
             for name in sorted(self):
                 res = self[name]
@@ -2049,15 +2454,19 @@ class DR_Results(OrderedDict):
                 if event is None:
                     event = res.event
                 ttl = f"{mission} - {event} Extrema Results and Bin Count Tables"
+                kwargs = dict(title=ttl, count_filter=count_filter, name=name)
+                if workbook is not None:
+                    rpttab1(res, filename, **kwargs)
+                    continue
                 if excel:
-                    if not isinstance(excel, str):
-                        filename = os.path.join(direc, name + ".xlsx")
+                    filename = os.path.join(direc, name + ".xlsx")
                 else:
                     filename = os.path.join(direc, name + ".tab")
-                rpttab1(res, filename, title=ttl, count_filter=count_filter, name=name)
+                jobs.append((filename, rpttab1, (_report_cat(res), filename), kwargs))
         finally:
             if workbook is not None:
                 workbook.close()
+        _write_reports(direc, jobs, executor, skip_unchanged)
 
     def rptpct(
         self,
@@ -2068,6 +2477,8 @@ class DR_Results(OrderedDict):
         fileext=".cmp",
         direc="compare",
         keyconv=None,
+        executor=None,
+        skip_unchanged=False,
         **rptpct1_args,
     ):
         """
@@ -2119,8 +2530,29 @@ class DR_Results(OrderedDict):
             ``keyconv = {'SC_atm': 'SCATM'}`` would be sufficient.
             Note: if a key is in `keyconv`, it is used even if
             ``refres[key]`` exists.
+        executor : :class:`concurrent.futures.Executor` or None; optional
+            If not None, the reports for the categories are written in
+            parallel by submitting them to this executor. It must run
+            the jobs in other processes (for example, a
+            :class:`concurrent.futures.ProcessPoolExecutor`); the
+            workers use the "Agg" backend, so figures are not
+            displayed. Only the parts of the categories that the
+            reports use are sent to the workers (the response
+            histories and SRSs are not).
+        skip_unchanged : bool; optional
+            If True, a report is only written if its inputs changed
+            since the last time it was written into `direc` (or if
+            the file does not exist). See notes.
         rptpct1_args : dict
             All remaining named args are passed to :func:`rptpct1`
+
+        Notes
+        -----
+        With `skip_unchanged`, a digest of the inputs for each report
+        is recorded in the file ".report_digests.pickle" in `direc`.
+        The digests are only computed when `skip_unchanged` is True;
+        reports written with it False are dropped from that file so
+        they will be written again the next time.
         """
         if not os.path.exists(direc):
             os.mkdir(direc)
@@ -2129,6 +2561,7 @@ class DR_Results(OrderedDict):
             keyconv = {}
         if drms is None:
             drms = self.keys()
+        jobs = []
         for drm in drms:
             refdrm = keyconv[drm] if drm in keyconv else drm
             if refdrm not in refres:
@@ -2141,14 +2574,10 @@ class DR_Results(OrderedDict):
                     event = res.event
                 title = f"{mission}, {event} - {names[0]} vs. {names[1]}"
                 filename = os.path.join(direc, drm + fileext)
-                rptpct1(
-                    res,
-                    refres[refdrm],
-                    filename,
-                    title=title,
-                    names=names,
-                    **rptpct1_args,
-                )
+                kwargs = dict(rptpct1_args, title=title, names=names)
+                args = (_report_cat(res), _report_cat(refres[refdrm]), filename)
+                jobs.append((filename, rptpct1, args, kwargs))
+        _write_reports(direc, jobs, executor, skip_unchanged)
         if len(skipdrms) > 0:
             warnings.warn(
                 "Some comparisons were skipped (not found in `refres`):\n"
@@ -2172,6 +2601,7 @@ class DR_Results(OrderedDict):
         tight_layout_args=None,
         plot=plt.plot,
         show_figures=False,
+        executor=None,
     ):
         """
         Make SRS plots with optional printing to .pdf or .png files.
@@ -2272,6 +2702,9 @@ class DR_Results(OrderedDict):
         show_figures : bool; optional
             If True, plot figures will be displayed on the screen for
             interactive viewing. Warning: there may be many figures.
+        executor : :class:`concurrent.futures.Executor` or None; optional
+            For plotting the categories in parallel; see
+            :func:`mk_plots`.
 
         Returns
         -------
@@ -2310,6 +2743,7 @@ class DR_Results(OrderedDict):
             cases=None,
             plot=plot,
             show_figures=show_figures,
+            executor=executor,
         )
 
     def resp_plots(
@@ -2326,6 +2760,7 @@ class DR_Results(OrderedDict):
         tight_layout_args=None,
         plot=plt.plot,
         show_figures=False,
+        executor=None,
     ):
         """
         Make time or frequency domain responses plots.
@@ -2419,6 +2854,9 @@ class DR_Results(OrderedDict):
         show_figures : bool; optional
             If True, plot figures will be displayed on the screen for
             interactive viewing. Warning: there may be many figures.
+        executor : :class:`concurrent.futures.Executor` or None; optional
+            For plotting the categories in parallel; see
+            :func:`mk_plots`.
 
         Returns
         -------
@@ -2457,22 +2895,269 @@ class DR_Results(OrderedDict):
             showboth=False,
             plot=plot,
             show_figures=show_figures,
+            executor=executor,
         )
 
 
+# name of the file in a report directory with the digests of the
+# report inputs; see :func:`_write_reports`:
+_REPORT_INDEX = ".report_digests.pickle"
+
+
+def _report_digest(func, args, kwargs):
+    # digest of the inputs to a report function; None if the inputs
+    # cannot be pickled
+    try:
+        data = pickle.dumps((func.__name__, args, kwargs), protocol=-1)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return None
+    return hashlib.sha1(data).hexdigest()
+
+
+def _report_cat(res):
+    """
+    Get a shallow copy of category `res` for a report, without the
+    response histories and SRSs (which the reports do not use)
+
+    This keeps the report digests cheap and the data sent to worker
+    processes small. Anything other than a SimpleNamespace is
+    returned as is.
+    """
+    if not isinstance(res, SimpleNamespace):
+        return res
+    res = copy.copy(res)
+    for attr in ("hist", "time", "frf", "psd", "freq", "srs"):
+        res.__dict__.pop(attr, None)
+    return res
+
+
+def _report_worker(func, args, kwargs):
+    # write a report in a worker process; figures are not displayed
+    plt.switch_backend("agg")
+    func(*args, **kwargs)
+
+
+def _write_reports(direc, jobs, executor, skip_unchanged):
+    """
+    Write the reports for :func:`DR_Results.rptext`, etc
+
+    Each job in `jobs` is ``(filename, func, args, kwargs)``. The
+    jobs are run in order, or in parallel via `executor`. If
+    `skip_unchanged` is True, jobs with the same input digest as the
+    one recorded for `filename` are skipped. The digests are kept in
+    `direc` once `skip_unchanged` is used; after that, jobs run with
+    `skip_unchanged` False are removed from the record.
+    """
+    index_file = os.path.join(direc, _REPORT_INDEX)
+    track = skip_unchanged or os.path.exists(index_file)
+    index = {}
+    if track and os.path.exists(index_file):
+        with open(index_file, "rb") as f:
+            index = pickle.load(f)
+
+    futures = []
+    try:
+        for filename, func, args, kwargs in jobs:
+            key = os.path.basename(filename)
+            if skip_unchanged:
+                digest = _report_digest(func, args, kwargs)
+            else:
+                digest = None
+            if (
+                skip_unchanged
+                and digest is not None
+                and index.get(key) == digest
+                and os.path.exists(filename)
+            ):
+                continue
+            index.pop(key, None)
+            if executor is not None:
+                future = executor.submit(_report_worker, func, args, kwargs)
+                futures.append((key, digest, future))
+            else:
+                func(*args, **kwargs)
+                if digest is not None:
+                    index[key] = digest
+        for key, digest, future in futures:
+            future.result()
+            if digest is not None:
+                index[key] = digest
+    finally:
+        if track:
+            with open(index_file + ".tmp", "wb") as f:
+                pickle.dump(index, f, protocol=-1)
+            os.replace(index_file + ".tmp", index_file)
+
+
+# name of the checkpoint file in a store; see
+# :func:`DR_Results.open_store`:
+_STORE_CHECKPOINT = "checkpoint.pickle"
+
+# the "number of rows x number of cases" arrays; they are kept in a
+# store if one is open:
+_STORE_MXMN = ("mx", "mn", "mx_x", "mn_x")
+
+
+def _load_store(results, dirname, mode, names=None):
+    """
+    Put the results from the checkpoint in store `dirname` into
+    `results`, opening the arrays with `mode`; returns the last case
+    number
+
+    If `names` is not None, it is the list of expected category names;
+    a :class:`ValueError` is raised if the checkpoint has different
+    categories.
+    """
+    filename = os.path.join(dirname, _STORE_CHECKPOINT)
+    with open(filename, "rb") as f:
+        j, files, state, meta = pickle.load(f)
+    if names is not None and meta["names"] != names:
+        raise ValueError(
+            f"the categories in store {dirname!r} do not match those "
+            f"of the results: {meta['names']} vs {names}"
+        )
+    for key, arrfile in files.items():
+        arr = np.load(os.path.join(dirname, arrfile), mmap_mode=mode)
+        res = state[key[0]]
+        if key[1] == "srs":
+            res.srs.srs[key[2]] = arr
+        else:
+            setattr(res, key[1], arr)
+    results.clear()
+    results.update(state)
+    store = getattr(results, "_store", None)
+    if store is not None:
+        store.files = files
+        store.last = j
+        store.n = meta["n"]
+        store.cases = meta["cases"]
+    return j
+
+
+def _calc_srs(dr, resp, respname, x, sr=None, pf=None):
+    """
+    Compute the SRSs for a case
+
+    Returns the SRS type ("eqsine" or "srs") and a dict of the SRSs
+    by Q.
+    """
+    if _is_eqsine(dr.srsopts):
+        srstype = "eqsine"
+        eqsine = True
+    else:
+        srstype = "srs"
+        eqsine = False
+
+    rr = resp[dr.srspv].T
+    srs_cur = {}
+    for q in dr.srsQs:
+        fact = dr.srsconv
+
+        # compute the srs:
+        if respname == "hist":
+            srs_cur[q] = fact * srs.srs(rr, sr, dr.srsfrq, q, **dr.srsopts).T
+        elif respname == "frf":
+            if eqsine:
+                fact /= q
+            srs_cur[q] = fact * srs.srs_frf(rr, x, dr.srsfrq, q).T
+        elif respname == "psd":
+            fact *= pf
+            if eqsine:
+                fact /= q
+            srs_cur[q] = fact * srs.vrs((x, rr), x, q, Fn=dr.srsfrq, linear=True).T
+        else:  # pragma: no cover
+            raise ValueError('`respname` must be one of: "hist", "frf", or "psd"')
+    return srstype, srs_cur
+
+
+def _drfunc_response(name, dr, SOL, nas, DR, products):
+    """
+    Compute the response for category `name`
+
+    Uses the stacked matrices of :func:`DR_Event.fuse_drms` if
+    available for this category; otherwise, calls the data recovery
+    function. `products` is a dict for the stacked products of the
+    current case; they are computed on first use.
+    """
+    fused = getattr(DR, "Fused", None)
+    if fused is None or name not in fused.cats:
+        drfunc = get_drfunc(dr.drfile, dr.drfunc)
+        return drfunc(SOL, nas, DR.Vars, dr.se)
+
+    resp = None
+    for key, drm in fused.cats[name]:
+        try:
+            prod = products[key]
+        except KeyError:
+            try:
+                fold = SOL.fold
+            except AttributeError:
+                prod = fused.drms[key] @ getattr(SOL, key[2])
+            else:
+                prod = fold(fused.drms[key], key[2])
+            products[key] = prod
+        part = prod[fused.rows[key][drm]]
+        resp = part if resp is None else resp + part
+    return resp
+
+
+def _time_case_recovery(names, sol, nas, DR, dosrs):
+    """
+    Time-domain data recovery for one case
+
+    Runs the data recovery functions for categories `names` and
+    returns a dict by category name of SimpleNamespaces with the
+    parts of the results :func:`DR_Results._store_time_case` needs:
+    the max/min data, the first column of the response (for
+    initialization), the time vector, the response histories and
+    the SRSs.
+    """
+    pieces = {}
+    products = {}
+    for name in names:
+        dr = DR.Info[name]  # record with: .desc, .labels, ...
+        uf_reds = dr.uf_reds
+        SOL = sol[uf_reds]
+        resp = _drfunc_response(name, dr, SOL, nas, DR, products)
+
+        pc = pieces[name] = SimpleNamespace(
+            mm=maxmin(resp, SOL.t), resp0=resp[:, :1], t=SOL.t
+        )
+
+        if dr.histpv is not None:
+            pc.hist = resp[dr.histpv]
+
+        if dr.srspv is not None and dosrs:
+            sr = 1 / SOL.h if SOL.h else None
+            pc.srstype, pc.srs = _calc_srs(dr, resp, "hist", SOL.t, sr=sr)
+    return pieces
+
+
+def _run_time_cases_batch(names, DR, nas, solver_factory, batch, dosrs):
+    """Solve and recover a batch of cases for :func:`DR_Results.run_time_cases`"""
+    solve = solver_factory()
+    return [_time_case_recovery(names, solve(data), nas, DR, dosrs) for data in batch]
+
+
 # setup pickling for a little bit of future-proofing:
 def unpickle_drresults(kwargs):
-    # pickle_version is not used yet
     pickle_version = kwargs.pop("__pickle_version", 0)
     new_drresults = DR_Results()
     for k, v in kwargs.items():
+        if (
+            pickle_version < 2
+            and type(v) is SimpleNamespace
+            and "maxcase" in v.__dict__
+        ):
+            # category from before ExtremaNamespace:
+            v = ExtremaNamespace(**v.__dict__)
         new_drresults[k] = v
     return new_drresults
 
 
 def pickle_drresults(drresults):
     odct = OrderedDict(drresults)
-    odct["__pickle_version"] = 1
+    odct["__pickle_version"] = 2
     return unpickle_drresults, (odct,)
 
 
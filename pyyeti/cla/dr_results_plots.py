@@ -327,6 +327,12 @@ def _add_xy_labels(issrs, units, uj, xlab, ylab, nplots, sub, srstype):
     return uj
 
 
+def _mk_plots_worker(res, kwargs):
+    # plot one category in a worker process; see :func:`mk_plots`
+    plt.switch_backend("agg")
+    mk_plots(res, **kwargs)
+
+
 def mk_plots(
     res,
     event=None,
@@ -345,6 +351,7 @@ def mk_plots(
     tight_layout_args=None,
     plot=plt.plot,
     show_figures=False,
+    executor=None,
 ):
     """
     Make SRS or response history plots
@@ -457,6 +464,15 @@ def mk_plots(
     show_figures : bool; optional
         If True, plot figures will be displayed on the screen for
         interactive viewing. Warning: there may be many figures.
+    executor : :class:`concurrent.futures.Executor` or None; optional
+        If not None, the categories are plotted in parallel by
+        submitting them to this executor. It must run the jobs in
+        other processes (for example, a
+        :class:`concurrent.futures.ProcessPoolExecutor`); the workers
+        use the "Agg" backend. The executor is only used if each
+        category is written to its own files (that is, if `fmt` is
+        not None and not both 'pdf' and `onepdf`), and if
+        `show_figures` is False.
 
     Notes
     -----
@@ -501,6 +517,43 @@ def mk_plots(
                 if name + "_0rb" in res:
                     alldrms.append(name + "_0rb")
 
+    if (
+        executor is not None
+        and fmt
+        and not (fmt == "pdf" and onepdf)
+        and not show_figures
+    ):
+        for name in alldrms:
+            if name not in res:
+                raise ValueError(f"category {name} does not exist.")
+        kwargs = dict(
+            event=event,
+            issrs=issrs,
+            Q=Q,
+            inc0rb=False,
+            fmt=fmt,
+            onepdf=onepdf,
+            layout=layout,
+            figsize=figsize,
+            showall=showall,
+            showboth=showboth,
+            cases=cases,
+            direc=direc,
+            tight_layout_args=tight_layout_args,
+            plot=plot,
+        )
+        futures = []
+        for name in alldrms:
+            res1 = type(res)()
+            res1[name] = res[name]
+            drms1 = [name] if drms and name in drms else None
+            futures.append(
+                executor.submit(_mk_plots_worker, res1, dict(kwargs, drms=drms1))
+            )
+        for future in futures:
+            future.result()
+        return
+
     pdffile = None
     imode = plt.isinteractive()
     plt.interactive(show_figures)
@@ -17,7 +17,7 @@ except TypeError:
     pass
 
 
-def calcAM(S, freq):
+def calcAM(S, freq, cache=True):
     """
     Calculate apparent mass
 
@@ -30,6 +30,8 @@ def calcAM(S, freq):
         below.
     freq : 1d array_like
         Frequency vector (Hz)
+    cache : bool; optional
+        If True, the result is memoized (see notes below).
 
     Returns
     -------
@@ -57,12 +59,26 @@ def calcAM(S, freq):
            in Craig-Bampton form (uses :func:`pyyeti.cb.cbtf` to
            compute apparent mass).
 
+    If `cache` is True, the apparent mass is saved in a small
+    module-level cache keyed by the contents of the inputs (the last
+    few results are kept). Later calls with the same inputs, for
+    example from :func:`ntfl` studies that use one source or load
+    with many `As` inputs, return a copy of the saved array without
+    solving again.
+
     The routine :func:`ntfl` example demonstrates this function.
 
     See also
     --------
     :func:`ntfl`.
     """
+    if cache:
+        key = tuple(cb._fingerprint(x) for x in (*S[:4], freq))
+        try:
+            return _AM_CACHE[key].copy()
+        except KeyError:
+            pass
+
     lf = len(freq)
     m = S[0]
     b = S[1]
@@ -73,16 +89,14 @@ def calcAM(S, freq):
         r = bdof.shape[0]
         T = bdof
         Frc = np.zeros((r, lf))
-        Acc = np.empty((r, lf, r), dtype=complex)
+        Acc = np.empty((lf, r, r), dtype=complex)
         fs = ode.SolveUnc(m, b, k, pre_eig=True)
         for direc in range(r):
             Frc[direc, :] = 1.0
             sol = fs.fsolve(T.T @ Frc, freq)
-            Acc[:, :, direc] = T @ sol.a
+            Acc[:, :, direc] = (T @ sol.a).T
             Frc[direc, :] = 0.0
-        AM = np.empty((r, lf, r), dtype=complex)
-        for j in range(lf):
-            AM[:, j, :] = la.inv(Acc[:, j, :])
+        AM = np.linalg.inv(Acc).transpose(1, 0, 2)
     else:  # bdof treated as a partition vector for CB model
         r = len(bdof)
         acce = np.eye(r)
@@ -93,12 +107,26 @@ def calcAM(S, freq):
         AM = np.empty((r, lf, r), dtype=complex)
         save = {}
         for direc in range(r):
-            tf = cb.cbtf(m, b, k, acce[direc, :], freq, bdof, save)
+            tf = cb.cbtf(m, b, k, acce[direc, :], freq, bdof, save, rows=[])
             AM[:, :, direc] = tf.frc
+
+    if cache:
+        while len(_AM_CACHE) >= _AM_CACHE_SIZE:
+            del _AM_CACHE[next(iter(_AM_CACHE))]
+        _AM_CACHE[key] = AM.copy()
     return AM
 
 
-def ntfl(Source, Load, As, freq):
+# Memoized :func:`calcAM` results, oldest first:
+_AM_CACHE = {}
+_AM_CACHE_SIZE = 4
+
+# Approximate memory budget in bytes for the work arrays of
+# :func:`ntfl` when `chunk_size` is None:
+_NT_MEMORY = 2 ** 28
+
+
+def ntfl(Source, Load, As, freq, chunk_size=None):
     r"""
     Norton Thevenin Force Limit
 
@@ -123,6 +151,10 @@ def ntfl(Source, Load, As, freq):
     freq : 1d array_like
         Frequency vector in Hz for `Source`, `Load`, `As` and all
         return values.
+    chunk_size : integer or None; optional
+        Number of frequencies to couple at a time. If None, it is set
+        so that the work arrays take about 256 MB. The results do not
+        depend on `chunk_size`.
 
     Returns
     -------
@@ -164,6 +196,9 @@ def ntfl(Source, Load, As, freq):
         F(f) &= S_{AM}(f) \cdot T_{AM}(f)^{-1} \cdot L_{AM}(f) \cdot A_s(f)
         \end{aligned}
 
+    These are computed for `chunk_size` frequencies at a time with
+    stacked solves (see :func:`numpy.linalg.solve`).
+
     The `bdof` input defines boundary DOF in one of two ways as
     follows. Let `N` be total number of DOF in mass, damping, &
     stiffness.
@@ -178,6 +213,11 @@ def ntfl(Source, Load, As, freq):
            in Craig-Bampton form (uses :func:`pyyeti.cb.cbtf` to
            compute apparent mass).
 
+    The apparent masses are computed by :func:`calcAM`, which
+    memoizes them; so, calling :func:`ntfl` again with the same
+    `Source` or `Load` (for example, with a different `As`) does not
+    recompute them.
+
     Note that the Source and Load `bdof` must define the same number
     of boundary DOF and both sets of boundary DOF must be in the same
     coordinate system.
@@ -432,13 +472,20 @@ def ntfl(Source, Load, As, freq):
     R = np.empty((r, c), dtype=complex)
     A = np.empty((r, c), dtype=complex)
     F = np.empty((r, c), dtype=complex)
-    for j in range(c):
-        Ms = SAM[:, j, :]
-        Ml = LAM[:, j, :]
-        Mr = la.solve(Ms + Ml, Ms)
-        R[:, j] = np.diag(Mr)
-        A[:, j] = Mr @ As[:, j]
-        F[:, j] = Ml @ A[:, j]
+    if chunk_size is None:
+        # about 5 complex chunk x r x r arrays are alive per chunk:
+        chunk_size = _NT_MEMORY // (5 * 16 * max(r, 1) ** 2)
+    chunk_size = max(int(chunk_size), 1)
+    for j0 in range(0, c, chunk_size):
+        j = slice(j0, j0 + chunk_size)
+        # freq x bdof x bdof stacks:
+        Ms = SAM[:, j, :].transpose(1, 0, 2)
+        Ml = LAM[:, j, :].transpose(1, 0, 2)
+        Mr = np.linalg.solve(TAM[:, j, :].transpose(1, 0, 2), Ms)
+        R[:, j] = np.diagonal(Mr, axis1=1, axis2=2).T
+        Aj = Mr @ As[:, j].T[:, :, None]
+        A[:, j] = Aj[:, :, 0].T
+        F[:, j] = (Ml @ Aj)[:, :, 0].T
     return SimpleNamespace(R=R, F=F, A=A, LAM=LAM, SAM=SAM, TAM=TAM, freq=freq)
 
 
@@ -20,8 +20,11 @@ def find_vals(m, v):
     ----------
     m : array_like
         Array to be searched.
-    v : array_like
-        Array of values to find in `m`.
+    v : array_like or :class:`Locator`
+        Array of values to find in `m`. For repeated searches with the
+        same values, `v` can be a :class:`Locator` built from the
+        values (note that :class:`Locator` considers NaNs equal to
+        each other).
 
     Returns
     -------
@@ -51,15 +54,16 @@ def find_vals(m, v):
     array([False,  True, False, False], dtype=bool)
     >>> locate.find_vals(m, 100)
     array([False, False, False, False], dtype=bool)
+    >>> locate.find_vals(m, locate.Locator([30, 100]))
+    array([False,  True, False, False], dtype=bool)
     """
     m = np.atleast_1d(m)
-    v = np.atleast_1d(v)
     m = m.ravel(order="F")
+    if isinstance(v, Locator):
+        return v.isin(m)
+    v = np.atleast_1d(v)
     v = v.ravel()
-    pv = np.zeros(len(m), dtype=bool)
-    for i in v:
-        pv |= m == i
-    return pv
+    return np.isin(m, v)
 
 
 def find_duplicates(v, tol=0.0):
@@ -191,8 +195,8 @@ def _bytes_view(arr, dtype):
     # first, need to ensure c-contiguous:
     arr = np.ascontiguousarray(arr, dtype)
 
-    # special precaution for floats:
-    if np.issubdtype(arr.dtype, np.floating):
+    # special precaution for floats (and complex):
+    if np.issubdtype(arr.dtype, np.inexact):
         # add zero to get rid of the minus sign on 0. ... the byte
         # string for 0. and -0. are different:
 
@@ -209,10 +213,174 @@ def _bytes_view(arr, dtype):
         # Out[6]: b'\x00\x00\x00\x00\x00\x00\x00\x80'
         # In [7]: (0. + np.array([-0.])).tostring()
         # Out[7]: b'\x00\x00\x00\x00\x00\x00\x00\x00'
-        arr += 0.0
+
+        # (not in-place: `arr` may be the caller's array)
+        arr = arr + 0.0
     return arr.view(np.dtype((np.void, arr.dtype.itemsize * arr.shape[-1])))
 
 
+def _key_dtype(dtype1, dtype2):
+    """
+    Get common dtype for comparing rows via :func:`_bytes_view`
+
+    Returns None if the rows cannot be compared that way (object
+    arrays, or strings vs numbers, for example); the rows have to be
+    compared as Python objects in that case.
+    """
+    kinds = ("biufc", "U", "S")
+    for kind in kinds:
+        if dtype1.kind in kind and dtype2.kind in kind:
+            return np.result_type(dtype1, dtype2)
+    return None
+
+
+class Locator:
+    """
+    Reusable index for finding rows in an array
+
+    Searching for rows of one array in another (as in
+    :func:`mat_intersect`) requires sorting the array being searched
+    (the "haystack"). A :class:`Locator` does that once so repeated
+    searches of the same haystack only cost a binary search per
+    needle. A :class:`Locator` can be passed in place of an array to
+    :func:`mat_intersect` and in place of the values to
+    :func:`find_vals`.
+
+    Parameters
+    ----------
+    haystack : array_like
+        1d or 2d array to search in. If 1d, each element is treated as
+        a row.
+
+    Notes
+    -----
+    Rows are compared by value (as with :func:`mat_intersect`): the
+    rows of the haystack and needles are converted to a common type
+    and compared as byte-strings (so NaNs compare equal to each other
+    and -0.0 equals 0.0). If the types do not have a common numeric
+    or string type (for example, object arrays or strings vs numbers),
+    the rows are compared as Python objects via a hash table instead.
+
+    If a row occurs more than once in the haystack, the first
+    occurrence is found.
+
+    The haystack should not be modified after creating the
+    :class:`Locator`.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from pyyeti import locate
+    >>> loc = locate.Locator([[7, 3], [6, 8], [4, 0], [9, 2], [1, 5]])
+    >>> loc.find([[9, 2], [1, 1], [7, 3]])  # doctest: +ELLIPSIS
+    (array([0, 2]...), array([3, 0]...))
+    >>> loc.isin([[9, 2], [1, 1], [7, 3]])
+    array([ True, False,  True], dtype=bool)
+    """
+
+    def __init__(self, haystack):
+        haystack = np.asarray(haystack)
+        self.ndim = haystack.ndim
+        self.haystack = self._rows(haystack)
+        self._keys = {}
+        self._table = None
+
+    def _rows(self, a):
+        # shape `a` the same way :func:`mat_intersect` does:
+        a = np.asarray(a)
+        if self.ndim == 1 and a.ndim <= 1:
+            return a.reshape(-1, 1)
+        return np.atleast_2d(a)
+
+    def _sorted_keys(self, dtype):
+        try:
+            return self._keys[dtype]
+        except KeyError:
+            pass
+        keys = _bytes_view(self.haystack, dtype).ravel()
+        sorter = keys.argsort(kind="stable")
+        self._keys[dtype] = keys[sorter], sorter
+        return self._keys[dtype]
+
+    def _hash_table(self):
+        if self._table is None:
+            table = {}
+            for i, row in enumerate(map(tuple, self.haystack.tolist())):
+                table.setdefault(row, i)
+            self._table = table
+        return self._table
+
+    def find(self, needles):
+        """
+        Find rows of `needles` in the haystack
+
+        Parameters
+        ----------
+        needles : array_like
+            1d or 2d array of rows to find; shaped as in
+            :func:`mat_intersect`.
+
+        Returns
+        -------
+        pv1 : 1d ndarray
+            Index vector into the rows of `needles` that were found,
+            in order.
+        pv2 : 1d ndarray
+            Index vector into the rows of the haystack such that
+            ``needles[pv1] == haystack[pv2]``.
+        """
+        needles = self._rows(needles)
+        if needles.shape[1] != self.haystack.shape[1] or self.haystack.size == 0:
+            return np.array([], dtype=int), np.array([], dtype=int)
+
+        dtype = _key_dtype(self.haystack.dtype, needles.dtype)
+        if dtype is None:
+            table = self._hash_table()
+            pv1 = []
+            pv2 = []
+            for i, row in enumerate(map(tuple, needles.tolist())):
+                j = table.get(row)
+                if j is not None:
+                    pv1.append(i)
+                    pv2.append(j)
+            return np.array(pv1, dtype=np.int64), np.array(pv2, dtype=np.int64)
+
+        keys, sorter = self._sorted_keys(dtype)
+        needles = _bytes_view(needles, dtype).ravel()
+        pvi = np.searchsorted(keys, needles)
+
+        # since searchsorted can return length as index:
+        pvi[pvi == keys.size] -= 1
+
+        # trim down to exact matches:
+        pv1 = np.nonzero(keys[pvi] == needles)[0]
+        return pv1, sorter[pvi[pv1]]
+
+    def isin(self, needles):
+        """
+        Returns True/False vector indicating which rows of `needles`
+        are in the haystack
+        """
+        pv1 = self.find(needles)[0]
+        tf = np.zeros(self._rows(needles).shape[0], bool)
+        tf[pv1] = True
+        return tf
+
+
+def _order_by_haystack(pvh, pvn):
+    """
+    Reorder the output of :func:`Locator.find` to be as if the
+    haystack had been looped over: sorted by haystack row and with
+    each haystack row matched only once
+    """
+    i = pvh.argsort(kind="stable")
+    pvh = pvh[i]
+    pvn = pvn[i]
+    first = np.ones(pvh.size, bool)
+    first[1:] = pvh[1:] != pvh[:-1]
+    return pvh[first], pvn[first]
+
+
 def mat_intersect(D1, D2, keep=0):
     """
     Get row intersection partition vectors between two matrices or
@@ -220,9 +388,9 @@ def mat_intersect(D1, D2, keep=0):
 
     Parameters
     ----------
-    D1 : array_like
+    D1 : array_like or :class:`Locator`
         1d or 2d array.
-    D2 : array_like
+    D2 : array_like or :class:`Locator`
         1d or 2d array.
     keep : integer
         0, 1 or 2:
@@ -232,6 +400,11 @@ def mat_intersect(D1, D2, keep=0):
           - if 1, loop over `D1`, finding where the rows occur in `D2`
           - if 2, loop over `D2`, finding where the rows occur in `D1`
 
+        If `D1` or `D2` is a :class:`Locator`, it is always the one
+        searched in. If `keep` is 0, the other array is looped over;
+        otherwise, the output is the same as if the :class:`Locator`
+        array had been looped over.
+
     Returns
     -------
     pv1 : 1d ndarray
@@ -249,6 +422,10 @@ def mat_intersect(D1, D2, keep=0):
     For matrices, the number of columns in `D1` and `D2` must be equal
     to get non-empty results.
 
+    To search the same array many times, make a :class:`Locator` from
+    it once and pass that instead of the array; that avoids sorting
+    the array on every call.
+
     Examples
     --------
     >>> import numpy as np
@@ -271,7 +448,24 @@ def mat_intersect(D1, D2, keep=0):
     >>> mat3 = np.array([[1, 2, 3]])
     >>> locate.mat_intersect(mat1, mat3)     # doctest: +ELLIPSIS
     (array([], dtype=int...), array([], dtype=int...)
+    >>> loc = locate.Locator(mat1)
+    >>> locate.mat_intersect(mat2, loc)      # doctest: +ELLIPSIS
+    (array([0, 1, 2]...), array([3, 4, 0]...))
+    >>> locate.mat_intersect(mat2, loc, 2)   # doctest: +ELLIPSIS
+    (array([2, 0, 1]...), array([0, 3, 4]...))
     """
+    if isinstance(D2, Locator):
+        pv1, pv2 = D2.find(D1)
+        if keep == 2:
+            pv2, pv1 = _order_by_haystack(pv2, pv1)
+        return pv1, pv2
+
+    if isinstance(D1, Locator):
+        pv2, pv1 = D1.find(D2)
+        if keep == 1:
+            pv1, pv2 = _order_by_haystack(pv1, pv2)
+        return pv1, pv2
+
     D1 = np.array(D1)
     D2 = np.array(D2)
     if D1.ndim == D2.ndim == 1:
@@ -302,23 +496,7 @@ def mat_intersect(D1, D2, keep=0):
         haystack = D1
         switch = True
 
-    # to use the byte-string view, types must be the same:
-    out_dtype = np.find_common_type([haystack.dtype, needles.dtype], [])
-
-    # view entire rows as a single values:
-    haystack = _bytes_view(haystack, out_dtype).ravel()
-    needles = _bytes_view(needles, out_dtype).ravel()
-
-    i = haystack.argsort()
-    pvi = np.searchsorted(haystack, needles, sorter=i)
-
-    # since searchsorted can return length as index:
-    pvi[pvi == i.size] -= 1
-    pv2 = i[pvi]
-
-    # trim pv2 down to exact matches and create pv1:
-    pv1 = np.where(haystack[pv2] == needles)[0]
-    pv2 = pv2[pv1]
+    pv1, pv2 = Locator(haystack).find(needles)
 
     if switch:
         pv1, pv2 = pv2, pv1
@@ -441,18 +619,22 @@ def list_intersect(L1, L2):
     ...                       [1, 2])       # doctest: +ELLIPSIS
     (array([], dtype=int...), array([], dtype=int...))
     """
-    inters = set(L1) & set(L2)
-    r = len(inters)
-    if r == 0:
+    # position of first occurrence of each item in L2:
+    pos2 = {}
+    for i, item in enumerate(L2):
+        pos2.setdefault(item, i)
+    if not pos2:
+        return np.array([], dtype=int), np.array([], dtype=int)
+    pv1 = []
+    pv2 = []
+    for i, item in enumerate(L1):
+        j = pos2.pop(item, None)
+        if j is not None:
+            pv1.append(i)
+            pv2.append(j)
+    if not pv1:
         return np.array([], dtype=int), np.array([], dtype=int)
-    pv1 = np.zeros(r, dtype=np.int64)
-    pv2 = np.zeros(r, dtype=np.int64)
-    j = 0
-    for j, item in enumerate(inters):
-        pv1[j] = L1.index(item)
-        pv2[j] = L2.index(item)
-    si = pv1.argsort()
-    return pv1[si], pv2[si]
+    return np.array(pv1, dtype=np.int64), np.array(pv2, dtype=np.int64)
 
 
 def merge_lists(list1, list2):
@@ -496,6 +678,11 @@ def merge_lists(list1, list2):
     >>> locate.merge_lists(l1, [])
     (['one', 'four', 'ten'], [0, 1, 2], [])
     """
+    try:
+        return _merge_hashable_lists(list1, list2)
+    except TypeError:
+        # unhashable elements
+        pass
     merged = list1[:]
     elements = []
     for e in list2:
@@ -520,3 +707,61 @@ def merge_lists(list1, list2):
     for i, e in enumerate(list1):
         prev = pv1[i] = merged.index(e, prev)
     return merged, pv1, [merged.index(e) for e in list2]
+
+
+def _merge_hashable_lists(list1, list2):
+    """
+    Routine used by :func:`merge_lists` when all elements are
+    hashable. Gives the same results, but uses a linked list and a
+    hash table so the cost is linear in the list lengths.
+    """
+    # doubly linked list; node 0 is the head, nodes 1 to len(list1)
+    # are the elements of list1 and the next node is the tail:
+    n1 = len(list1)
+    tail = n1 + 1
+    values = [None] + list(list1) + [None]
+    nxt = list(range(1, tail + 1)) + [None]
+    prv = [None] + list(range(tail))
+    first = {}  # value -> first node with that value
+    for node, e in enumerate(list1, 1):
+        first.setdefault(e, node)
+
+    def _insert(elements, node):
+        # insert elements in order, just in front of node:
+        for x in elements:
+            new = len(values)
+            values.append(x)
+            nxt.append(node)
+            prv.append(prv[node])
+            nxt[prv[node]] = new
+            prv[node] = new
+            first.setdefault(x, new)
+        del elements[:]
+
+    elements = []
+    for e in list2:
+        node = first.get(e)
+        if node is None:
+            # e is not in merged ... save it so it can be inserted
+            # later, just in front of the next common element
+            elements.append(e)
+        else:
+            _insert(elements, node)
+    _insert(elements, tail)
+
+    merged = []
+    pos = [0] * len(values)
+    node = nxt[0]
+    while node != tail:
+        pos[node] = len(merged)
+        merged.append(values[node])
+        node = nxt[node]
+
+    # form pv1, knowing that list1 elements are in order (a repeated
+    # element gets the same index as the one before it, as
+    # merged.index(e, prev) would give):
+    pv1 = [pos[node] for node in range(1, tail)]
+    for j in range(1, n1):
+        if list1[j] == list1[j - 1]:
+            pv1[j] = pv1[j - 1]
+    return merged, pv1, [pos[first[e]] for e in list2]
@@ -13,7 +13,10 @@ True
 """
 
 import os
+import io
 import re
+import sys
+import multiprocessing as mp
 import textwrap
 import numpy as np
 import pandas as pd
@@ -27,6 +30,8 @@ __all__ = [
     "fsearch",
     "rdgpwg",
     "rdcards",
+    "BulkIndex",
+    "rdcards_deck",
     "rddmig",
     "mkcomment",
     "wtdmig",
@@ -413,6 +418,142 @@ def _rdfixed(fiter, s, n, conchar, blank, tolist, keep_name):
     return vals
 
 
+def _rdfixed_lines(fiter, s, n, conchar):
+    """
+    Collect the lines of a fixed field card for :func:`_parse_fixed`:
+    fiter : file iterator
+    s : string, current line from file (card start)
+    n : field width, 8 or 16
+    conchar : string, set of chars that make up continuation
+              - either ' +' or '*'
+
+    Returns (lines, nvals) where `lines` is a list of the data fields
+    portion of each line (padded to 64 characters) and `nvals` is the
+    number of values :func:`_rdfixed` would return for the card.
+    """
+    inc = 4 if n > 8 else 8
+    length = len(s)
+    s = _proc_line(s[:72])
+    lines = [s[8:].ljust(64)]
+    while 1:
+        s = fiter.send(False)
+        if s is None or len(s) == 0 or conchar.find(s[0]) < 0:
+            break
+        s = _proc_line(s[:72])
+        length = len(s)
+        lines.append(s[8:].ljust(64))
+    # number of fields read from the last line (`length` <= 72):
+    nlast = (length - 8 + n - 1) // n if length > 8 else 0
+    return lines, (len(lines) - 1) * inc + nlast
+
+
+def _nas_sscanf_fields(fields, blank):
+    """
+    Vectorized version of :func:`nas_sscanf` for fixed width fields:
+    fields : 2d uint8 or uint32 array of character codes; one field
+             per row
+    blank : value to use for blank fields and string-valued fields
+
+    Returns 1d float64 array of the values. Fields containing only
+    digits, signs, decimal points, exponent characters ('e' or 'd')
+    and surrounding blanks are converted by numpy in bulk after the
+    Nastran shortcut exponents (eg, '1.7-4') are expanded. All others,
+    and any field that numpy cannot convert, are passed through
+    :func:`nas_sscanf`.
+    """
+    nfields, w = fields.shape
+    out = np.empty(nfields)
+    out[:] = blank
+    codes = fields
+    if codes.dtype != np.uint8:
+        codes = np.where(codes < 128, codes, 0).astype(np.uint8)
+    allowed = np.zeros(256, bool)
+    allowed[list(b" 0123456789.+-eEdD")] = True
+    nonblank = codes != 32
+    rows = np.arange(nfields)
+    first = nonblank.argmax(axis=1)
+    filled = nonblank[rows, first]
+    simple = filled & allowed[codes].all(axis=1)
+
+    # embedded blanks are not simple:
+    last = w - 1 - nonblank[:, ::-1].argmax(axis=1)
+    simple &= nonblank.sum(axis=1) == last - first + 1
+
+    index = np.nonzero(simple)[0]
+    A = np.full((len(index), w + 1), 32, np.uint8)
+    A[:, :w] = codes[index]
+    A[(A == ord("d")) | (A == ord("D"))] = ord("e")
+
+    # a sign after the first character that does not follow an 'e'
+    # starts a shortcut exponent; insert an 'e' in front of it (if
+    # there is more than one, the conversion fails and nas_sscanf
+    # handles it):
+    is_e = (A == ord("e")) | (A == ord("E"))
+    sign = (A == ord("+")) | (A == ord("-"))
+    sign[:, 1:] &= ~is_e[:, :-1]
+    sign &= np.arange(w + 1) > first[index, None]
+    sc = np.nonzero(sign.any(axis=1))[0]
+    if len(sc) > 0:
+        p = sign[sc].argmax(axis=1)[:, None]
+        cols = np.arange(w + 1)
+        src = np.minimum(cols - (cols > p), w - 1)
+        B = A[sc[:, None], src]
+        B[cols == p] = ord("e")
+        A[sc] = B
+
+    slow = [np.nonzero(filled & ~simple)[0]]
+    strings = A.view(f"S{w + 1}").ravel()
+    # if numpy cannot handle a field, try again in blocks so only the
+    # offending blocks are sent to nas_sscanf:
+    try:
+        out[index] = strings.astype(np.float64)
+    except ValueError:
+        for j in range(0, len(index), 1024):
+            try:
+                out[index[j : j + 1024]] = strings[j : j + 1024].astype(np.float64)
+            except ValueError:
+                slow.append(index[j : j + 1024])
+
+    for i in np.concatenate(slow):
+        v = nas_sscanf("".join(map(chr, fields[i])))
+        if v is not None:
+            out[i] = v
+    return out
+
+
+def _parse_fixed(cards, n, blank):
+    """
+    Parse fixed field cards collected by :func:`_rdfixed_lines`:
+    cards : list of (lines, nvals) tuples, all with field width `n`
+    blank : value to use for blank fields and string-valued fields
+
+    Returns (values, keys): `values` is a 2d float64 array with one
+    row per card (padded with `blank`) and `keys` is a list of the
+    first value of each card before conversion to the output type (the
+    key for the 'dict' output of :func:`rdcards`).
+    """
+    inc = 4 if n > 8 else 8
+    nlines = np.array([len(lines) for lines, nvals in cards])
+    text = "".join(line for lines, nvals in cards for line in lines)
+    try:
+        fields = np.frombuffer(text.encode("ascii"), np.uint8)
+    except UnicodeEncodeError:
+        fields = np.frombuffer(text.encode("utf-32-le"), np.uint32)
+    values = _nas_sscanf_fields(fields.reshape(-1, n), blank)
+    firsts = (np.cumsum(nlines) - nlines) * inc
+    keys = [nas_sscanf(text[i * n : i * n + n]) for i in firsts.tolist()]
+    keys = [blank if key is None else key for key in keys]
+
+    # scatter the lines into rows of the output:
+    out = np.empty((len(cards), nlines.max() * inc))
+    out[:] = blank
+    row = np.repeat(np.arange(len(cards)), nlines)
+    line = np.arange(len(row)) - np.repeat(firsts // inc, nlines)
+    cols = (line * inc)[:, None] + np.arange(inc)
+    out[row[:, None], cols] = values.reshape(-1, inc)
+    return out, keys
+
+
 def _rdcomma(fiter, s, conchar, blank, tolist, keep_name):
     """
     Read comma delimited cards:
@@ -473,11 +614,13 @@ def rdcards(
 
     Parameters
     ----------
-    f : string or file_like or None
+    f : string or file_like or None or BulkIndex
         Either a name of a file, or is a file_like object as returned
         by :func:`open`. If file_like object, it is rewound first. Can
         also be the name of a directory or None; in these cases, a GUI
-        is opened for file selection.
+        is opened for file selection. Can also be a :class:`BulkIndex`
+        object; in that case, the cards are read using the index
+        instead of scanning the file.
     name : string
         Usually the card name, but is really just the initial part of
         the string to look for. This means that `name` can span more
@@ -635,6 +778,27 @@ def rdcards(
     ['DTI', 'SELOAD', '', 8.0, "'a'"]
     """
 
+    if isinstance(f, BulkIndex):
+        return f.rdcards(
+            name,
+            blank=blank,
+            return_var=return_var,
+            dtype=dtype,
+            no_data_return=no_data_return,
+            regex=regex,
+            keep_name=keep_name,
+            keep_comments=keep_comments,
+        )
+
+    Vals, todict, tolist, blank = _rdcards_init(return_var, blank)
+    f.seek(0, 0)
+    fiter = _next_line(f, name, regex, tolist and keep_comments, Vals)
+    return _rdcards(
+        fiter, Vals, todict, tolist, blank, dtype, no_data_return, keep_name
+    )
+
+
+def _rdcards_init(return_var, blank):
     if return_var not in ("array", "list", "dict"):
         raise ValueError(
             'invalid `return_var` setting; must be one of: ("array", "list", "dict")'
@@ -651,11 +815,24 @@ def rdcards(
 
     if blank is None:
         blank = "" if tolist else 0
+    return Vals, todict, tolist, blank
 
-    mxlen = 0
-    f.seek(0, 0)
 
-    fiter = _next_line(f, name, regex, tolist and keep_comments, Vals)
+def _rdcards(fiter, Vals, todict, tolist, blank, dtype, no_data_return, keep_name):
+    """
+    Read matching cards from line iterator `fiter`; see
+    :func:`_next_line` for the protocol.
+
+    For array and dict output with a numeric `dtype`, the fixed field
+    cards are collected and parsed together by :func:`_parse_fixed`;
+    comma-delimited cards are parsed one at a time by
+    :func:`_rdcomma`.
+    """
+    fast = not tolist and np.dtype(dtype).kind in "iuf"
+    # for `fast`, `cards` holds the values from _rdcomma or, for fixed
+    # field cards, a (field width, index into `fixed[n]`) tuple:
+    cards = []
+    fixed = {8: [], 16: []}
     s = next(fiter)
     while s is not None:
         # if here, have matching line
@@ -665,18 +842,15 @@ def rdcards(
             s = s[:72].rstrip()
             p = s[:8].find("*")
             field, continuation = (16, "*") if p > -1 else (8, " +")
-            vals = _rdfixed(fiter, s, field, continuation, blank, tolist, keep_name)
+            if fast:
+                fixed[field].append(_rdfixed_lines(fiter, s, field, continuation))
+                vals = field, len(fixed[field]) - 1
+            else:
+                vals = _rdfixed(fiter, s, field, continuation, blank, tolist, keep_name)
         if tolist:
             Vals.append(vals)
         else:
-            cur = len(vals)
-            mxlen = max(mxlen, cur)
-            key = vals[0]  # before it gets turned into dtype
-            vals = np.array(vals).astype(dtype)
-            if todict:
-                Vals[key] = vals
-            else:
-                Vals.append(vals)
+            cards.append(vals)
         try:
             s = fiter.send(True)
         except StopIteration:
@@ -689,15 +863,677 @@ def rdcards(
         pass
     del fiter
 
-    if len(Vals) > 0:
-        if not (todict or tolist):
-            npVals = np.empty((len(Vals), mxlen), dtype=dtype)
-            npVals[:] = blank
-            for i, vals in enumerate(Vals):
-                npVals[i, : len(vals)] = vals
-            Vals = npVals
+    if tolist:
+        return Vals if len(Vals) > 0 else no_data_return
+
+    if len(cards) == 0:
+        return no_data_return
+
+    parsed = {
+        n: _parse_fixed(fixed_cards, n, blank)
+        for n, fixed_cards in fixed.items()
+        if fixed_cards
+    }
+
+    def _get_vals(vals):
+        if isinstance(vals, tuple):
+            n, j = vals
+            values, keys = parsed[n]
+            return keys[j], values[j, : fixed[n][j][1]]
+        # key is taken before it gets turned into dtype:
+        return vals[0], np.array(vals)
+
+    if todict:
+        for vals in cards:
+            key, vals = _get_vals(vals)
+            Vals[key] = vals.astype(dtype)
         return Vals
-    return no_data_return
+
+    mxlen = max(
+        fixed[vals[0]][vals[1]][1] if isinstance(vals, tuple) else len(vals)
+        for vals in cards
+    )
+    npVals = np.empty((len(cards), mxlen), dtype=dtype)
+    npVals[:] = blank
+    for n, (values, keys) in parsed.items():
+        rows = [
+            i
+            for i, vals in enumerate(cards)
+            if isinstance(vals, tuple) and vals[0] == n
+        ]
+        width = min(values.shape[1], mxlen)
+        npVals[rows, :width] = values[:, :width].astype(dtype)
+    for i, vals in enumerate(cards):
+        if isinstance(vals, list):
+            npVals[i, : len(vals)] = np.array(vals).astype(dtype)
+    return npVals
+
+
+class BulkIndex:
+    r"""
+    Index of the cards in a Nastran bulk data file
+
+    The file is tokenized once: the name, the file offset and the
+    extent (first line plus any continuation lines) of each card are
+    recorded, along with the location of each comment line. After
+    that, any number of :func:`rdcards` style queries can be answered
+    by reading only the matching cards from the file.
+
+    Parameters
+    ----------
+    f : string or file_like or None
+        Either a name of a file, or is a file_like object as returned
+        by :func:`open`. If file_like object, it is rewound first and
+        its contents are copied to memory (unless it is a file on
+        disk, in which case it is reopened by name). Can also be the
+        name of a directory or None; in these cases, a GUI is opened
+        for file selection.
+    index_file : string or True or None; optional
+        Name of file to store the index in so that it can be reused
+        the next time the same bulk file is indexed. If True, the
+        name is formed by appending ".bulkidx.npz" to the name of the
+        bulk file. If the index file exists and was made from the
+        current version of the bulk file (as judged by file size and
+        modification time), the index is loaded from it; otherwise,
+        the index is built and saved to `index_file`. If None, the
+        index is built and not saved. See also :func:`save`.
+
+    Notes
+    -----
+    An instance of this class can be used in place of the file
+    argument for :func:`rdcards` and for the routines that call it:
+    :func:`rdgrids`, :func:`rdcord2cards`, :func:`rddmig` (for punch
+    files), :func:`rdcsupers`, :func:`rdextrn`, :func:`rdtabled1`
+    and :func:`rddtipch`. The output is the same as reading the file
+    directly.
+
+    When the card `name` is a plain string, the recorded card names
+    are used to select the candidate cards so only those cards are
+    read from the file. Regular expressions can't be resolved that
+    way; in that case, the first line of each card is read and
+    checked.
+
+    Continuation lines follow the :func:`rdcards` rules: a card
+    continues on lines starting with "+" or a space (8-character
+    fixed field), with "*" (16-character fixed field) or with "+",
+    "," or a space (comma-delimited). A comment line ends a card and
+    comment lines are never continued.
+
+    Examples
+    --------
+    >>> from io import StringIO
+    >>> from pyyeti.nastran import bulk
+    >>> fs = StringIO('''
+    ... GRID,1,0,0.,0.,0.
+    ... CORD2R  10      0       0.      0.      0.      0.      0.      1.
+    ...         1.      0.      0.
+    ... GRID*                  2               0      1.00000000      2.00000000
+    ... *             3.00000000
+    ... ''')
+    >>> index = bulk.BulkIndex(fs)
+    >>> len(index)
+    3
+    >>> index.names()
+    ['grid', 'cord2r']
+    >>> bulk.rdgrids(index)
+    array([[ 1.,  0.,  0.,  0.,  0.,  0.,  0.,  0.],
+           [ 2.,  0.,  1.,  2.,  3.,  0.,  0.,  0.]])
+    >>> index.rdcards('cord2r', return_var='list')
+    [[10, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 1.0, 0.0, 0.0]]
+    """
+
+    _version = 1
+    _comment = -1
+
+    def __init__(self, f, index_file=None):
+        f = guitools.get_file_name(f, read=True)
+        if not isinstance(f, str):
+            name = getattr(f, "name", None)
+            if isinstance(name, str) and os.path.isfile(name):
+                f = name
+        if isinstance(f, str):
+            self.filename = f
+            self._data = None
+        else:
+            f.seek(0, 0)
+            self.filename = None
+            self._data = f.read().encode()
+
+        if index_file is True:
+            if self.filename is None:
+                raise ValueError(
+                    "`index_file` cannot be True when `f` is not a file name"
+                )
+            index_file = self.filename + ".bulkidx.npz"
+
+        if index_file and self._load(index_file):
+            return
+        self._build()
+        if index_file:
+            self.save(index_file)
+
+    def __len__(self):
+        """Return the number of cards (not counting comments)"""
+        codes = [i for i, name in enumerate(self._names) if name]
+        return int(np.count_nonzero(np.isin(self._codes, codes)))
+
+    def names(self):
+        """
+        Return list of card names in the order first encountered
+
+        The names are lower case and do not include the "*" of
+        16-character fixed field cards.
+        """
+        return [name for name in self._names if name]
+
+    def _open(self):
+        if self.filename is None:
+            return io.BytesIO(self._data)
+        return open(self.filename, "rb")
+
+    def _source_stats(self):
+        if self.filename is None:
+            return -1, -1
+        st = os.stat(self.filename)
+        return st.st_size, st.st_mtime_ns
+
+    def _build(self):
+        names = {}
+        codes = []
+        starts = []
+        stops = []
+        conchar = b""
+        pos = 0
+        with self._open() as fh:
+            for line in fh:
+                c = line[:1]
+                if conchar and c and (b" " if c == b"\t" else c) in conchar:
+                    # continuation line:
+                    stops[-1] += len(line)
+                    pos += len(line)
+                    continue
+                conchar = b""
+                if c == b"$":
+                    codes.append(self._comment)
+                    starts.append(pos)
+                    stops.append(pos + len(line))
+                else:
+                    expline = line.expandtabs()
+                    if expline.find(b",") > -1:
+                        name = expline.split(b",", 1)[0]
+                        conchar = b" +,"
+                    else:
+                        head = expline[:72].rstrip()[:8]
+                        name = head
+                        conchar = b"*" if head.find(b"*") > -1 else b" +"
+                    name = name.strip().rstrip(b"*").lower().decode()
+                    codes.append(names.setdefault(name, len(names)))
+                    starts.append(pos)
+                    stops.append(pos + len(line))
+                pos += len(line)
+        self._names = list(names)
+        self._codes = np.array(codes, dtype=np.int32)
+        self._starts = np.array(starts, dtype=np.int64)
+        self._stops = np.array(stops, dtype=np.int64)
+        self._stats = self._source_stats()
+
+    def save(self, index_file=None):
+        """
+        Save index to a file
+
+        Parameters
+        ----------
+        index_file : string or None; optional
+            Name of file to write. If None, ".bulkidx.npz" is
+            appended to the name of the bulk file.
+
+        Notes
+        -----
+        The index can be reloaded by specifying the same
+        `index_file` when creating a :class:`BulkIndex` for the same
+        bulk file.
+        """
+        if index_file is None:
+            if self.filename is None:
+                raise ValueError(
+                    "`index_file` must be specified when the bulk data is "
+                    "not from a file"
+                )
+            index_file = self.filename + ".bulkidx.npz"
+        with open(index_file, "wb") as fh:
+            np.savez(
+                fh,
+                version=self._version,
+                stats=np.array(self._stats, dtype=np.int64),
+                names=np.array(self._names, dtype=str),
+                codes=self._codes,
+                starts=self._starts,
+                stops=self._stops,
+            )
+
+    def _load(self, index_file):
+        """Load index from file; return False if not valid"""
+        if self.filename is None or not os.path.exists(index_file):
+            return False
+        with np.load(index_file) as dct:
+            if int(dct["version"]) != self._version or tuple(
+                dct["stats"]
+            ) != self._source_stats():
+                return False
+            self._names = [str(name) for name in dct["names"]]
+            self._codes = dct["codes"]
+            self._starts = dct["starts"]
+            self._stops = dct["stops"]
+        self._stats = self._source_stats()
+        return True
+
+    def _candidates(self, name, regex, keep_comments):
+        """
+        Return entry indices (in deck order) that could match `name`;
+        comments are included if they could match or if they are to
+        be kept
+        """
+        if regex:
+            pv = np.ones(len(self._codes), bool)
+        else:
+            token = re.split(r"[\s,*]", name.lower(), 1)[0]
+            codes = [
+                i
+                for i, nm in enumerate(self._names)
+                if nm and (nm.startswith(token) or token.startswith(nm))
+            ]
+            if keep_comments or token.startswith("$"):
+                codes.append(self._comment)
+            pv = np.isin(self._codes, codes)
+        return np.nonzero(pv)[0]
+
+    @staticmethod
+    def _decode(line):
+        if line.endswith(b"\r\n"):
+            line = line[:-2] + b"\n"
+        return line.decode()
+
+    def _next_line(self, name, regex, keep_comments, Vals):
+        """
+        Index-based version of :func:`_next_line`
+
+        The generator protocol is the same. Only the candidate cards
+        are visited; the continuation lines of a matching card are
+        read with the same rules as :func:`_next_line`.
+        """
+        if regex:
+            prog = re.compile(name, re.IGNORECASE)
+
+            def ismatch(line):
+                return prog.match(line)
+
+        else:
+            prog = name.lower()
+
+            def ismatch(line):
+                return line.lower().find(prog) == 0
+
+        comment_list = []
+        entries = self._candidates(name, regex, keep_comments)
+        starts = self._starts[entries].tolist()
+        comments = (self._codes[entries] == self._comment).tolist()
+        consumed = 0
+        # the line that ended the last card; often it is the start of
+        # the next candidate, so it is kept to avoid rereading it:
+        next_pos, next_line = -1, None
+        decode = self._decode
+        with self._open() as fh:
+            readline = fh.readline
+            for start, is_comment in zip(starts, comments):
+                if start < consumed:
+                    # already read as part of a previous card
+                    continue
+                if start == next_pos:
+                    bline = next_line
+                else:
+                    fh.seek(start)
+                    bline = readline()
+                line = decode(bline)
+                if is_comment and keep_comments:
+                    comment_list.append(line)
+                    continue
+                line = line.expandtabs()
+                if not ismatch(line):
+                    continue
+                _handle_comments(comment_list, Vals)
+                pos = start + len(bline)
+                do_match = yield line
+                while not do_match:
+                    bline = readline()
+                    if not bline:
+                        break
+                    pos += len(bline)
+                    line = decode(bline)
+                    if keep_comments and line.startswith("$"):
+                        comment_list.append(line)
+                        continue
+                    do_match = yield line.expandtabs()
+                # the last line read was not part of the card:
+                consumed = next_pos = pos - len(bline)
+                next_line = bline
+
+        yield None  # mark the end of input
+        _handle_comments(comment_list, Vals)
+
+    def rdcards(
+        self,
+        name,
+        blank=None,
+        return_var="array",
+        dtype=float,
+        no_data_return=None,
+        regex=False,
+        keep_name=False,
+        keep_comments=False,
+    ):
+        """
+        Read Nastran cards from indexed file
+
+        See :func:`rdcards` for a description of the parameters and
+        output.
+        """
+        Vals, todict, tolist, blank = _rdcards_init(return_var, blank)
+        fiter = self._next_line(name, regex, tolist and keep_comments, Vals)
+        return _rdcards(
+            fiter, Vals, todict, tolist, blank, dtype, no_data_return, keep_name
+        )
+
+
+def _include_path(fh, line):
+    """
+    Get the file name from an INCLUDE statement:
+    fh : file handle (binary) positioned after `line`
+    line : bytes, the INCLUDE line
+
+    The file name is usually enclosed in single quotes and can then
+    be continued over several lines; blanks at the start and end of
+    each line are ignored. Returns (name, nbytes) where `nbytes` is
+    the number of bytes read from `fh` beyond `line`.
+    """
+    text = line[7:].decode().strip()
+    if not text.startswith("'"):
+        return text.split()[0] if text else "", 0
+    text = text[1:]
+    nbytes = 0
+    while text.find("'") < 0:
+        nxt = fh.readline()
+        if not nxt:
+            raise ValueError(f"unterminated file name in INCLUDE: {line!r}")
+        nbytes += len(nxt)
+        text += nxt.decode().strip()
+    return text[: text.find("'")].strip(), nbytes
+
+
+def _deck_pieces(source, chain=()):
+    """
+    Get the pieces of a bulk data deck with INCLUDE statements
+    expanded:
+    source : string (file name) or bytes (contents of file)
+    chain : tuple of the absolute names of the including files; used
+            to detect recursive INCLUDE statements
+
+    Returns list of (source, start, stop) tuples, in deck order, of the
+    byte ranges that make up the deck; the INCLUDE statements
+    themselves are not part of the deck. Relative file names in INCLUDE
+    statements are relative to the directory of the including file
+    (or the working directory if `source` is bytes).
+    """
+    if isinstance(source, str):
+        fh = open(source, "rb")
+        path = os.path.dirname(os.path.abspath(source))
+    else:
+        fh = io.BytesIO(source)
+        path = os.getcwd()
+    pieces = []
+    start = pos = 0
+    with fh:
+        for line in fh:
+            if line[:7].lower() == b"include" and line[7:8] in b" \t'\r\n":
+                if pos > start:
+                    pieces.append((source, start, pos))
+                name, nbytes = _include_path(fh, line)
+                name = os.path.join(path, os.path.expanduser(name))
+                fullname = os.path.abspath(name)
+                if fullname in chain:
+                    raise ValueError(f"recursive INCLUDE of {name!r}")
+                pieces.extend(_deck_pieces(name, chain + (fullname,)))
+                pos += len(line) + nbytes
+                start = pos
+            else:
+                pos += len(line)
+    if pos > start:
+        pieces.append((source, start, pos))
+    return pieces
+
+
+def _split_piece(source, start, stop, chunk_size):
+    """
+    Split a byte range of a bulk data file into chunks of about
+    `chunk_size` bytes; each chunk starts at the beginning of a card.
+
+    A card (or a run of cards and comments) can only end before a line
+    that does not start with a continuation character for any card
+    type (a blank, tab, "+", "*" or ","). Comment lines are not used as
+    split points since they may be inside a card.
+    """
+    if stop - start <= chunk_size:
+        return [(source, start, stop)]
+    fh = open(source, "rb") if isinstance(source, str) else io.BytesIO(source)
+    chunks = []
+    with fh:
+        while stop - start > chunk_size:
+            fh.seek(start + chunk_size)
+            pos = start + chunk_size + len(fh.readline())
+            while pos < stop:
+                line = fh.readline()
+                if not line or line[:1] not in b" \t+*,$":
+                    break
+                pos += len(line)
+            if pos >= stop:
+                break
+            chunks.append((source, start, pos))
+            start = pos
+    chunks.append((source, start, stop))
+    return chunks
+
+
+def _rdcards_piece(args):
+    """Utility routine for :func:`rdcards_deck`; reads one chunk"""
+    (source, start, stop), name, blank, return_var, dtype, opts = args
+    if isinstance(source, str):
+        with open(source, "rb") as fh:
+            fh.seek(start)
+            data = fh.read(stop - start)
+    else:
+        data = source[start:stop]
+    Vals, todict, tolist, blank = _rdcards_init(return_var, blank)
+    with io.TextIOWrapper(io.BytesIO(data)) as f:
+        fiter = _next_line(
+            f, name, opts["regex"], tolist and opts["keep_comments"], Vals
+        )
+        return _rdcards(
+            fiter, Vals, todict, tolist, blank, dtype, None, opts["keep_name"]
+        )
+
+
+def rdcards_deck(
+    f,
+    name,
+    blank=None,
+    return_var="array",
+    dtype=float,
+    no_data_return=None,
+    regex=False,
+    keep_name=False,
+    keep_comments=False,
+    *,
+    parallel="auto",
+    maxcpu=None,
+    chunk_size=2 ** 24,
+):
+    r"""
+    Read Nastran cards from a deck, following INCLUDE statements
+
+    Parameters
+    ----------
+    f : string or file_like or None
+        Either a name of a file, or is a file_like object as returned
+        by :func:`open`. If file_like object, it is rewound first and,
+        unless it is a file on disk, its contents are copied to
+        memory. Can also be the name of a directory or None; in these
+        cases, a GUI is opened for file selection.
+    name : string
+        See :func:`rdcards`.
+    blank, return_var, dtype, no_data_return : optional
+        See :func:`rdcards`.
+    regex, keep_name, keep_comments : bool; optional
+        See :func:`rdcards`.
+    parallel : string; optional
+        Controls the parallelization of the reading:
+
+        ==========   ============================================
+        `parallel`   Notes
+        ==========   ============================================
+        'auto'       Routine determines whether or not to run
+                     parallel (based on the total size of the
+                     deck).
+        'no'         Do not use parallel processing.
+        'yes'        Use parallel processing. On Windows, be sure
+                     the :func:`rdcards_deck` call is contained
+                     within: ``if __name__ == "__main__":``
+        ==========   ============================================
+
+    maxcpu : integer or None; optional
+        Specifies maximum number of CPUs to use. If None, it is
+        internally set to 4/5 of available CPUs (as determined from
+        :func:`multiprocessing.cpu_count`).
+    chunk_size : integer; optional
+        When running in parallel, files larger than `chunk_size`
+        bytes are split into chunks of about that size (on card
+        boundaries) so they can be read concurrently.
+
+    Returns
+    -------
+    ndarray or dictionary or list
+        Same as :func:`rdcards` for the deck formed by replacing each
+        INCLUDE statement with the contents of the file it names.
+
+    Notes
+    -----
+    An INCLUDE statement starts in column 1 and names the file in
+    single quotes. The quoted name can be continued over several
+    lines; blanks at the start and end of each of those lines are
+    ignored::
+
+        INCLUDE '/very/long/path/
+                 to/model.blk'
+
+    Relative file names are taken relative to the directory of the
+    file that contains the INCLUDE statement. INCLUDE statements can
+    be nested.
+
+    The deck is read in pieces: the parts of each file between INCLUDE
+    statements and, when running in parallel, chunks of large files.
+    Each piece is read by :func:`rdcards` rules and the results are
+    merged in deck order, so the output is the same as reading the
+    expanded deck serially. A card cannot continue across an INCLUDE
+    statement.
+
+    See also
+    --------
+    :func:`rdcards`, :class:`BulkIndex`
+
+    Examples
+    --------
+    >>> import os
+    >>> import tempfile
+    >>> from pyyeti import nastran
+    >>> with tempfile.TemporaryDirectory() as tmp:
+    ...     with open(os.path.join(tmp, 'grids.blk'), 'w') as f:
+    ...         _ = f.write('GRID,2,0,1.,2.,3.\n')
+    ...     with open(os.path.join(tmp, 'model.blk'), 'w') as f:
+    ...         _ = f.write("GRID,1,0,0.,0.,0.\n"
+    ...                     "INCLUDE 'grids.blk'\n"
+    ...                     "GRID,3,0,4.,5.,6.\n")
+    ...     nastran.rdcards_deck(os.path.join(tmp, 'model.blk'), 'grid')
+    array([[ 1.,  0.,  0.,  0.,  0.],
+           [ 2.,  0.,  1.,  2.,  3.],
+           [ 3.,  0.,  4.,  5.,  6.]])
+    """
+    if parallel not in ("auto", "yes", "no"):
+        raise ValueError("invalid parallel option")
+    f = guitools.get_file_name(f, read=True)
+    if not isinstance(f, str):
+        fname = getattr(f, "name", None)
+        if isinstance(fname, str) and os.path.isfile(fname):
+            f = fname
+        else:
+            f.seek(0, 0)
+            f = f.read().encode()
+
+    pieces = _deck_pieces(f)
+    total = sum(stop - start for source, start, stop in pieces)
+    ncpu = mp.cpu_count() if parallel != "no" else 1
+    if parallel == "auto":
+        parallel = (
+            "yes"
+            if total > chunk_size and ncpu > 1 and not sys.platform.startswith("win")
+            else "no"
+        )
+    if parallel == "yes":
+        if maxcpu and ncpu > maxcpu:
+            ncpu = maxcpu
+        elif ncpu > 4:
+            ncpu = (ncpu * 4) // 5
+        pieces = [
+            chunk for piece in pieces for chunk in _split_piece(*piece, chunk_size)
+        ]
+
+    opts = dict(regex=regex, keep_name=keep_name, keep_comments=keep_comments)
+    args = [
+        (
+            (source, start, stop)
+            if isinstance(source, str)
+            else (source[start:stop], 0, stop - start),
+            name,
+            blank,
+            return_var,
+            dtype,
+            opts,
+        )
+        for source, start, stop in pieces
+    ]
+    if parallel == "yes" and len(pieces) > 1:
+        with mp.Pool(processes=min(ncpu, len(pieces))) as pool:
+            results = pool.map(_rdcards_piece, args)
+    else:
+        results = [_rdcards_piece(arg) for arg in args]
+
+    # merge in deck order:
+    Vals, todict, tolist, blank = _rdcards_init(return_var, blank)
+    results = [res for res in results if res is not None]
+    if len(results) == 0:
+        return no_data_return
+    if tolist:
+        for res in results:
+            Vals.extend(res)
+    elif todict:
+        for res in results:
+            Vals.update(res)
+    else:
+        mxlen = max(res.shape[1] for res in results)
+        Vals = np.empty((sum(len(res) for res in results), mxlen), dtype=dtype)
+        Vals[:] = blank
+        i = 0
+        for res in results:
+            Vals[i : i + len(res), : res.shape[1]] = res
+            i += len(res)
+    return Vals
 
 
 def rddmig(f, dmig_names=None, *, expanded=False, square=False):
@@ -1308,7 +2144,8 @@ def rdgrids(f):
         Either a name of a file, or is a file_like object as returned
         by :func:`open`. If file_like object, it is rewound first. Can
         also be the name of a directory or None; in these cases, a GUI
-        is opened for file selection.
+        is opened for file selection. Can also be a
+        :class:`BulkIndex`.
 
     Returns
     -------
@@ -1369,7 +2206,8 @@ def rdcord2cards(f):
         Either a name of a file, or is a file_like object as returned
         by :func:`open`. If file_like object, it is rewound first. Can
         also be the name of a directory or None; in these cases, a GUI
-        is opened for file selection.
+        is opened for file selection. Can also be a
+        :class:`BulkIndex`.
 
     Returns
     -------
@@ -1501,7 +2339,8 @@ def rdtabled1(f, name="tabled1"):
         Either a name of a file, or is a file_like object as returned
         by :func:`open`. If file_like object, it is rewound first. Can
         also be the name of a directory or None; in these cases, a GUI
-        is opened for file selection.
+        is opened for file selection. Can also be a
+        :class:`BulkIndex`.
     name : string; optional
         Name of cards to read.
 
@@ -1996,7 +2835,8 @@ def rdcsupers(f):
         Either a filename, or is a file_like object as returned
         by :func:`open`. If file_like object, it is rewound first. Can
         also be the name of a directory or None; in these cases, a GUI
-        is opened for file selection.
+        is opened for file selection. Can also be a
+        :class:`BulkIndex`.
 
     Returns
     -------
@@ -2037,7 +2877,8 @@ def rdextrn(f, expand=True):
         Either a name of a file, or is a file_like object as returned
         by :func:`open`. If file_like object, it is rewound first. Can
         also be the name of a directory or None; in these cases, a GUI
-        is opened for file selection.
+        is opened for file selection. Can also be a
+        :class:`BulkIndex`.
     expand : bool; optional
         If True, expand rows like this::
 
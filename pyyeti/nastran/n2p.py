@@ -22,12 +22,13 @@ True
 import math
 import sys
 import warnings
-import itertools
 import copy
+import weakref
 from types import SimpleNamespace
 import numpy as np
 import pandas as pd
 import scipy.linalg as linalg
+import scipy.sparse as sp
 from pyyeti import locate, ytools
 
 
@@ -41,12 +42,15 @@ except TypeError:
 __all__ = [
     "addgrid",
     "addulvs",
+    "basic_to_coords",
     "build_coords",
+    "coords_to_basic",
     "mkcordcardinfo",
     "expanddof",
     "find_xyz_triples",
     "formdrm",
     "formrbe3",
+    "formrbe3_batch",
     "formtran",
     "formulvs",
     "getcoordinates",
@@ -220,62 +224,71 @@ def rbgeom_uset(uset, refpoint=np.array([[0, 0, 0]])):
     xyz = uset_dof1.loc[:, "x":"z"].values
     rb = rbgeom(xyz, refpoint)
 
+    # each grid has 6 rows in uset: [location; coordinate system
+    # type; origin; 3x3 transform to basic]
+    info = uset.iloc[:, 1:].values.reshape(ngrids, 6, 3)
+    t = info[:, 3:].transpose(0, 2, 1)  # basic to local
+    rb = rb.reshape(ngrids, 2, 3, 6)
+
     # treat as rectangular here; fix cylindrical & spherical below
-    rb2 = np.zeros((np.shape(rb)))
-    for j in range(ngrids):
-        i = 6 * j
-        t = uset.iloc[i + 3 : i + 6, 1:].values.T
-        rb2[i : i + 3] = t @ rb[i : i + 3]
-        rb2[i + 3 : i + 6] = t @ rb[i + 3 : i + 6]
-
-    # fix up cylindrical:
-    grid_loc = np.arange(0, uset.shape[0], 6)
-    cyl = (uset.loc[(slice(None), 2), "y"] == 2).values
-    if cyl.any():
-        grid_loc_cyl = grid_loc[cyl]
-        for i in grid_loc_cyl:
-            t = uset.iloc[i + 3 : i + 6, 1:].values.T
-            loc = uset.iloc[i, 1:]
-            loc2 = t @ (loc - uset.iloc[i + 2, 1:]).values
-            if abs(loc2[1]) + abs(loc2[0]) > 1e-8:
-                th = math.atan2(loc2[1], loc2[0])
-                c = math.cos(th)
-                s = math.sin(th)
-                t = np.array([[c, s], [-s, c]])
-                rb2[i : i + 2] = t @ rb2[i : i + 2]
-                rb2[i + 3 : i + 5] = t @ rb2[i + 3 : i + 5]
-
-    # fix up spherical:
-    sph = (uset.loc[(slice(None), 2), "y"] == 3).values
-    if sph.any():
-        grid_loc_sph = grid_loc[sph]
-        for i in grid_loc_sph:
-            t = uset.iloc[i + 3 : i + 6, 1:].values.T
-            loc = uset.iloc[i, 1:]
-            loc2 = t @ (loc - uset.iloc[i + 2, 1:]).values
-            if abs(loc2[1]) + abs(loc2[0]) > 1e-8:
-                phi = math.atan2(loc2[1], loc2[0])
-                c = math.cos(phi)
-                s = math.sin(phi)
-                t = np.array([[c, s], [-s, c]])
-                rb2[i : i + 2] = t @ rb2[i : i + 2]
-                rb2[i + 3 : i + 5] = t @ rb2[i + 3 : i + 5]
-                loc2[:2] = t @ loc2[:2]
-            if abs(loc2[2]) + abs(loc2[0]) > 1e-8:
-                th = math.atan2(loc2[0], loc2[2])
-            else:
-                th = 0
-            c = math.cos(th)
-            s = math.sin(th)
-            t = np.array([[s, 0, c], [c, 0, -s], [0, 1, 0]])
-            rb2[i : i + 3] = t @ rb2[i : i + 3]
-            rb2[i + 3 : i + 6] = t @ rb2[i + 3 : i + 6]
+    rb2 = t[:, None] @ rb
+    _rotate_curvilinear(info, t, rb2)
+    rb2 = rb2.reshape(-1, 6)
 
     # prepare final output:
     rbmodes[grid_rows] = rb2
     return rbmodes
 
 
+def _rotate_curvilinear(info, t, rb2):
+    """
+    Utility for :func:`rbgeom_uset` and :func:`formrbe3_batch`:
+    rotates rows from the rectangular axes of each grid's coordinate
+    system to the local axes of the grid (only changes grids in
+    cylindrical and spherical coordinate systems)
+
+    `info` is the (ngrids, 6, 3) USET information for the grids, `t`
+    is the (ngrids, 3, 3) basic to coordinate system transform and
+    `rb2` is a (ngrids, k, 3, m) array of rows in the rectangular axes
+    of the coordinate systems. `rb2` is modified in place.
+    """
+    ctype = info[:, 1, 1]
+    curv = np.nonzero((ctype == 2) | (ctype == 3))[0]
+    if curv.size > 0:
+        # location relative to coordinate system origin, in the
+        # rectangular axes of the coordinate system:
+        loc2 = (t[curv] @ (info[curv, 0] - info[curv, 2])[:, :, None])[:, :, 0]
+
+        # rotate by theta (cylindrical) or phi (spherical) about z:
+        pv = abs(loc2[:, 1]) + abs(loc2[:, 0]) > 1e-8
+        th = np.arctan2(loc2[pv, 1], loc2[pv, 0])
+        c = np.cos(th)[:, None, None]
+        s = np.sin(th)[:, None, None]
+        g = curv[pv]
+        r0 = rb2[g, :, 0].copy()
+        r1 = rb2[g, :, 1]
+        rb2[g, :, 0] = c * r0 + s * r1
+        rb2[g, :, 1] = -s * r0 + c * r1
+        x0 = loc2[pv, 0].copy()
+        loc2[pv, 0] = c[:, 0, 0] * x0 + s[:, 0, 0] * loc2[pv, 1]
+        loc2[pv, 1] = -s[:, 0, 0] * x0 + c[:, 0, 0] * loc2[pv, 1]
+
+        # for spherical, rotate by theta about the new y:
+        sph = ctype[curv] == 3
+        if sph.any():
+            loc2 = loc2[sph]
+            g = curv[sph]
+            th = np.zeros(g.size)
+            pv = abs(loc2[:, 2]) + abs(loc2[:, 0]) > 1e-8
+            th[pv] = np.arctan2(loc2[pv, 0], loc2[pv, 2])
+            c = np.cos(th)[:, None, None]
+            s = np.sin(th)[:, None, None]
+            r0, r1, r2 = (rb2[g, :, k].copy() for k in range(3))
+            rb2[g, :, 0] = s * r0 + c * r2
+            rb2[g, :, 1] = c * r0 - s * r2
+            rb2[g, :, 2] = r1
+
+
 def rbmove(rb, oldref, newref):
     """
     Returns rigid-body modes relative to new reference point.
@@ -603,58 +616,108 @@ def rbcoords(rb, verbose=2):
     if (r // 6) * 6 != r:
         raise ValueError("`rb` must have a multiple of 6 rows")
     n = r // 6
-    coords = np.zeros((n, 3))
-    maxerr = 0
-    maxdev = 0
-    haderr = 0
-    for j in range(n):
-        row = j * 6
-        T = rb[row : row + 3, :3]
-        R = linalg.lstsq(T, rb[row : row + 3, 3:])[0]
-        deltax = R[1, 2]
-        deltay = R[2, 0]
-        deltaz = R[0, 1]
-
-        deltax2 = -R[2, 1]
-        deltay2 = -R[0, 2]
-        deltaz2 = -R[1, 0]
-        dev = np.max(
-            np.vstack(
-                (
-                    np.max(np.abs(np.diag(R))),
-                    np.abs(deltax - deltax2),
-                    np.abs(deltay - deltay2),
-                    np.abs(deltaz - deltaz2),
-                )
+    rb = np.asarray(rb).reshape(n, 6, 6)
+
+    # least squares solution for all nodes at once:
+    R = np.linalg.pinv(rb[:, :3, :3]) @ rb[:, :3, 3:]
+    coords = np.column_stack((R[:, 1, 2], R[:, 2, 0], R[:, 0, 1]))
+    coords2 = -np.column_stack((R[:, 2, 1], R[:, 0, 2], R[:, 1, 0]))
+    dev = np.column_stack(
+        (abs(np.diagonal(R, axis1=1, axis2=2)), abs(coords - coords2))
+    ).max(axis=1)
+    mc = abs(coords).max(axis=1)
+    eps = np.finfo(float).eps
+    err = dev / np.where(mc > eps, mc, eps) * 100.0
+    # nan deviations are flagged but don't count towards the maximums:
+    maxdev = np.fmax.reduce(dev, initial=0.0)
+    maxerr = np.fmax.reduce(err, initial=0.0)
+    bad = np.nonzero((dev > mc * 1.0e-6) | np.isnan(dev))[0]
+    haderr = bad.size > 0
+    if verbose > 1:
+        for j in bad:
+            print(
+                "Warning:  deviation from standard pattern, "
+                f"node #{j + 1} starting at index {j * 6}:"
             )
-        )
-        coords[j] = [deltax, deltay, deltaz]
-        mc = np.max(np.abs(coords[j]))
-        if mc > np.finfo(float).eps:
-            err = dev / mc * 100.0
-        else:
-            err = dev / np.finfo(float).eps * 100.0
-        maxdev = max([maxdev, dev])
-        maxerr = max([maxerr, err])
-        if verbose > 0 and (dev > mc * 1.0e-6 or math.isnan(dev)):
-            if verbose > 1:
-                print(
-                    "Warning:  deviation from standard pattern, "
-                    f"node #{j + 1} starting at index {row}:"
-                )
-                print(f"  Max deviation = {dev:.3g} units.")
-                print(f"  Max % error   = {err:.3g}%.")
-                print("  Rigid-Body Rotations:")
-                for k in range(3):
-                    print("         {:10.4f} {:10.4f} {:10.4f}".format(*R[k, :3]))
-                print("")
-            haderr = 1
+            print(f"  Max deviation = {dev[j]:.3g} units.")
+            print(f"  Max % error   = {err[j]:.3g}%.")
+            print("  Rigid-Body Rotations:")
+            for k in range(3):
+                print("         {:10.4f} {:10.4f} {:10.4f}".format(*R[j, k, :3]))
+            print("")
     if verbose > 0 and haderr:
         print(f"Maximum absolute coordinate location error: {maxdev:.3g} units")
         print(f"Maximum % error: {maxerr:.3g}%.")
     return coords, maxdev, maxerr
 
 
+def _allclose_stacked(a, b, mx):
+    """
+    Vectorized version of ``np.allclose(a[i], b[i], rtol=0.001,
+    atol=max(0.001 * mx[i], 1.0e-5))`` for each i
+    """
+    atol = np.fmax(0.001 * mx, 1.0e-5)[:, None, None]
+    with np.errstate(invalid="ignore"):
+        close = abs(a - b) <= atol + 0.001 * abs(b)
+    return close.all(axis=(1, 2))
+
+
+def _xyz_triple_candidates(drmrb):
+    """
+    Utility for :func:`find_xyz_triples`: find all starting rows of 3
+    consecutive rows in `drmrb` that have the rigid-body pattern of an
+    xyz triple
+
+    Returns ``(starts, T2, xyz, csqr)``: the starting rows, the 3x3
+    transforms to the reference node coordinate system, the
+    coordinates and the squared scales.
+    """
+    n = drmrb.shape[0]
+    empty = np.zeros(0, np.int64)
+    if n < 3:
+        return empty, np.zeros((0, 3, 3)), np.zeros((0, 3)), np.zeros(0)
+    j = np.arange(n - 2)[:, None] + np.arange(3)
+    T1 = drmrb[j, :3].astype(float)
+    # check for a scalar multiplier (like .00259, for example)
+    csqr = (T1[:, :, 0] ** 2).sum(axis=1)
+
+    # invert the non-singular ones:
+    T2 = np.zeros_like(T1)
+    ok = np.linalg.det(T1) != 0.0
+    try:
+        T2[ok] = np.linalg.inv(T1[ok])
+    except np.linalg.LinAlgError:  # pragma: no cover
+        for i in np.nonzero(ok)[0]:
+            try:
+                T2[i] = linalg.inv(T1[i])
+            except linalg.LinAlgError:
+                ok[i] = False
+    i = np.nonzero(ok)[0]
+    mx = abs(T1[i]).max(axis=(1, 2))
+    T1t = T1[i].transpose(0, 2, 1)
+    i = i[_allclose_stacked(csqr[i, None, None] * T2[i], T1t, mx)]
+
+    # check rotation pattern:
+    rbrot = T2[i] @ drmrb[j[i], 3:]
+    x = rbrot[:, 1, 2]
+    y = rbrot[:, 2, 0]
+    z = rbrot[:, 0, 1]
+    zero = np.zeros_like(x)
+    rbrot_ideal = np.stack(
+        (
+            np.column_stack((zero, z, -y)),
+            np.column_stack((-z, zero, x)),
+            np.column_stack((y, -x, zero)),
+        ),
+        axis=1,
+    )
+    mx = abs(rbrot_ideal).max(axis=(1, 2), initial=0.0)
+    good = _allclose_stacked(rbrot, rbrot_ideal, mx)
+    i = i[good]
+    xyz = np.column_stack((x, y, z))[good]
+    return i, T2[i], xyz, csqr[i]
+
+
 def find_xyz_triples(drmrb, get_trans=False, mats=None, inplace=False):
     """
     Find x, y, z triples in rigid-body motion matrix.
@@ -766,12 +829,12 @@ def find_xyz_triples(drmrb, get_trans=False, mats=None, inplace=False):
     array([  1.,   1.,   1.,  nan,  nan,  nan,  10.,  10.,  10.])
     >>> len(trips.Ts)
     2
-    >>> trips.Ts[0]
-    array([[ 1.,  0., -0.],
-           [ 0.,  1., -0.],
+    >>> trips.Ts[0].round(12) + 0.0  # + 0.0 to avoid "-0."
+    array([[ 1.,  0.,  0.],
+           [ 0.,  1.,  0.],
            [ 0.,  0.,  1.]])
-    >>> trips.Ts[1]
-    array([[ 0.1   , -0.    , -0.    ],
+    >>> trips.Ts[1].round(12) + 0.0
+    array([[ 0.1   ,  0.    ,  0.    ],
            [ 0.    ,  0.0707, -0.0707],
            [ 0.    ,  0.0707,  0.0707]])
     >>> np.allclose(trips.outmats['rb'],
@@ -813,9 +876,6 @@ def find_xyz_triples(drmrb, get_trans=False, mats=None, inplace=False):
     scales = np.empty(n)
     scales[:] = np.nan
 
-    if get_trans:
-        Ts = []
-
     if mats:
         if inplace:
             outmats = mats
@@ -824,50 +884,29 @@ def find_xyz_triples(drmrb, get_trans=False, mats=None, inplace=False):
     else:
         outmats = None
 
-    j = 0
-    while j + 2 < n:
-        pv = slice(j, j + 3)
-        T1 = drmrb[pv, :3]
-        # check for a scalar multiplier (like .00259, for example)
-        T1tT1 = T1.T @ T1
-        csqr = T1tT1[0, 0]
-        try:
-            T2 = linalg.inv(T1)
-        except linalg.LinAlgError:
-            good = False
-        else:
-            mx = abs(T1).max()
-            good = np.allclose(
-                csqr * T2, T1.T, rtol=0.001, atol=max(0.001 * mx, 1.0e-5)
-            )
-        if good:
-            rbrot = T2 @ drmrb[pv, 3:]
-            x = rbrot[1, 2]
-            y = rbrot[2, 0]
-            z = rbrot[0, 1]
-            rbrot_ideal = np.array([[0, z, -y], [-z, 0, x], [y, -x, 0]])
-            mx = abs(rbrot_ideal).max()
-            if np.allclose(
-                rbrot, rbrot_ideal, rtol=0.001, atol=max(0.001 * mx, 1.0e-5)
-            ):
-                coords[pv, 0] = x
-                coords[pv, 1] = y
-                coords[pv, 2] = z
-                scales[pv] = np.sqrt(csqr)
-                if get_trans:
-                    Ts.append(T2)
-                if outmats:
-                    for val in outmats.values():
-                        val[pv] = T2 @ val[pv]
-                j += 3
-            else:
-                j += 1
-        else:
-            j += 1
+    # check every set of 3 consecutive rows at once:
+    starts, T2, xyz, csqr = _xyz_triple_candidates(drmrb)
+
+    # accept triples from the top down; each accepted triple uses up
+    # its 3 rows (same as checking one row at a time and skipping
+    # ahead 3 rows after finding a triple):
+    keep = []
+    nxt = 0
+    for i, j in enumerate(starts.tolist()):
+        if j >= nxt:
+            keep.append(i)
+            nxt = j + 3
+    T2 = T2[keep]
+    rows = starts[keep][:, None] + np.arange(3)
+    coords[rows] = xyz[keep][:, None]
+    scales[rows] = np.sqrt(csqr[keep])[:, None]
+    if outmats:
+        for val in outmats.values():
+            val[rows] = T2 @ val[rows]
     pv = ~np.isnan(coords[:, 0])
     s = SimpleNamespace(pv=pv, coords=coords, scales=scales)
     if get_trans:
-        s.Ts = Ts
+        s.Ts = list(T2)
     if outmats:
         s.outmats = outmats
     return s
@@ -928,7 +967,10 @@ def expanddof(dof):
     if dof.size == 0:
         return np.zeros((0, 2), dtype=np.int64)
     if dof.ndim < 2 or dof.shape[1] == 1:
-        return np.array([[n, i] for n in dof.ravel() for i in range(1, 7)])
+        dof = dof.ravel()
+        return np.column_stack(
+            (np.repeat(dof, 6), np.tile(np.arange(1, 7, dtype=np.int64), dof.size))
+        )
     elif dof[:, 1].max() <= 6:
         return dof
     edof = np.array([[node, int(i)] for node, arg in dof for i in str(arg)])
@@ -1299,6 +1341,106 @@ def usetprt(file, uset, printsets="M,S,O,Q,R,C,B,E,L,T,A,F,N,G"):
     return return_table
 
 
+class _UsetIndex:
+    """
+    Set-membership index for a Nastran USET table
+
+    Holds the information that :func:`mksetpv`, :func:`mkdofpv`,
+    :func:`upasetpv`, :func:`upqsetpv` and :func:`formtran` need from
+    a USET table so it only has to be computed once per table:
+
+        - ``iddof``: the [id, dof] rows of the table
+        - ``ids``: the id of each row
+        - ``node_rows``, ``node_ids``: the row offset of the first
+          DOF of each grid or spoint and the corresponding ids
+        - a True/False vector for each set bitmask (made on first
+          use), and a sorted ``id*10+dof`` key vector for each set
+          used by :func:`mkdofpv`
+        - ``locator``: a :class:`pyyeti.locate.Locator` for ``iddof``
+          (made on first use) for :func:`formrbe3`
+
+    Use :func:`_uset_index` to get the index for a table; it is
+    rebuilt automatically if the table has changed.
+    """
+
+    def __init__(self, uset):
+        self.index = uset.index
+        self.nasset = uset["nasset"].values.copy()
+        ids = self.index.get_level_values("id").values
+        dof = self.index.get_level_values("dof").values
+        self.ids = ids
+        self.iddof = np.column_stack((ids, dof))
+        self.node_rows = np.nonzero(dof <= 1)[0]
+        self.node_ids = ids[self.node_rows]
+        self._pvs = {}
+        self._keys = {}
+        self._locator = None
+
+    @property
+    def locator(self):
+        """:class:`pyyeti.locate.Locator` for the [id, dof] rows"""
+        if self._locator is None:
+            self._locator = locate.Locator(self.iddof)
+        return self._locator
+
+    def is_current(self, uset):
+        """Check that `uset` still matches this index"""
+        return uset.index is self.index and np.array_equal(
+            uset["nasset"].values, self.nasset
+        )
+
+    def pv(self, mask):
+        """True/False vector of the DOF in the set(s) of `mask`"""
+        try:
+            return self._pvs[mask]
+        except KeyError:
+            pv = self._pvs[mask] = (self.nasset & mask) != 0
+            return pv
+
+    def sorted_keys(self, nasset):
+        """
+        ``id*10+dof`` keys of the DOF in `nasset` (all DOF if 'p') and
+        the sorting index vector for them
+        """
+        try:
+            return self._keys[nasset]
+        except KeyError:
+            pass
+        keys = self.iddof[:, 0] * 10 + self.iddof[:, 1]
+        if nasset != "p":
+            keys = keys[mksetpv(self, "p", nasset)]
+        self._keys[nasset] = keys, np.argsort(keys)
+        return self._keys[nasset]
+
+
+_USET_INDEXES = {}
+
+
+def _uset_index(uset):
+    """
+    Get the :class:`_UsetIndex` for `uset`
+
+    The index is cached by the identity of the DataFrame and is
+    rebuilt when the table has been modified (the index replaced or
+    the "nasset" column changed). The cache entry is dropped when the
+    DataFrame is garbage collected.
+    """
+    if isinstance(uset, _UsetIndex):
+        return uset
+    key = id(uset)
+    try:
+        ref, usi = _USET_INDEXES[key]
+    except KeyError:
+        pass
+    else:
+        if ref() is uset and usi.is_current(uset):
+            return usi
+    usi = _UsetIndex(uset)
+    ref = weakref.ref(uset, lambda r, key=key: _USET_INDEXES.pop(key, None))
+    _USET_INDEXES[key] = ref, usi
+    return usi
+
+
 def mksetpv(uset, major, minor):
     r"""
     Make a set partition vector from a Nastran USET table.
@@ -1383,9 +1525,9 @@ def mksetpv(uset, major, minor):
         major = mkusetmask(major)
     if isinstance(minor, str):
         minor = mkusetmask(minor)
-    uset_set = uset["nasset"].values
-    pvmajor = (uset_set & major) != 0
-    pvminor = (uset_set & minor) != 0
+    usi = _uset_index(uset)
+    pvmajor = usi.pv(major)
+    pvminor = usi.pv(minor)
     if np.any(~pvmajor & pvminor):
         raise ValueError("`minorset` is not completely containedin `majorset`")
     pv = pvminor[pvmajor]
@@ -1476,22 +1618,17 @@ def mkdofpv(uset, nasset, dof, strict=True):
            [100,   3]]...))
     """
     if isinstance(uset, pd.DataFrame):
-        if nasset != "p":
-            setpv = mksetpv(uset, "p", nasset)
-            uset = uset.loc[setpv]
-        uset_set = uset.index.get_level_values("id") * 10 + uset.index.get_level_values(
-            "dof"
-        )
+        uset_set, i = _uset_index(uset).sorted_keys(nasset)
     else:
         if nasset == "p":
             uset_set = (uset[:, 0] * 10 + uset[:, 1]).astype(np.int64)
         else:
             raise ValueError('`nasset` must be "p" if `uset` is not a pandas DataFrame')
+        i = np.argsort(uset_set)
 
     dof = expanddof(dof)
     _dof = dof[:, 0] * 10 + dof[:, 1]
 
-    i = np.argsort(uset_set)
     pvi = np.searchsorted(uset_set, _dof, sorter=i)
     # since searchsorted can return length as index:
     pvi[pvi == i.size] -= 1
@@ -2141,60 +2278,274 @@ def getcoordinates(uset, gid, csys, coordref=None):
         xyz_basic = np.asarray(gid).ravel()
     if np.size(csys) == 1 and csys == 0:
         return xyz_basic
-    # get input "coordinfo" [ cid type 0; location(1x3); T(3x3) ]:
-    if coordref is None:
-        coordref = {}
-    coordinfo = mkusetcoordinfo(csys, uset, coordref)
-    xyz_coord = coordinfo[1]
-    T = coordinfo[2:]  # transform to basic for coordinate system
-    g = T.T @ (xyz_basic - xyz_coord)
-    ctype = coordinfo[0, 1].astype(np.int64)
-    if ctype == 1:
-        return g
-    if ctype == 2:
-        R = math.hypot(g[0], g[1])
-        theta = math.atan2(g[1], g[0])
-        return np.array([R, theta * 180 / math.pi, g[2]])
-    R = linalg.norm(g)
-    phi = math.atan2(g[1], g[0])
-    s = math.sin(phi)
-    c = math.cos(phi)
-    if abs(s) > abs(c):
-        theta = math.atan2(g[1] / s, g[2])
-    else:
-        theta = math.atan2(g[0] / c, g[2])
-    return np.array([R, theta * 180 / math.pi, phi * 180 / math.pi])
+    return basic_to_coords(xyz_basic, csys, uset, coordref)[0]
 
 
-def _get_loc_a_basic(coordinfo, a):
+def _coord_ids(csys):
+    """
+    Utility for :func:`_coordinfo_arrays`: returns (cids, specs) where
+    `cids` is None if `csys` is a single coordinate system id or 4x3
+    matrix, and is a 1d integer array of ids (one per entry)
+    otherwise; `specs` is the single item or a sequence of them.
+    """
+    if isinstance(csys, (list, tuple)) and len({np.size(c) for c in csys}) > 1:
+        # ragged: mix of ids and 4x3 matrices
+        cids = [int(np.ravel(c)[0]) for c in csys]
+        return np.array(cids, dtype=np.int64), csys
+    arr = np.asarray(csys, dtype=float)
+    if arr.ndim == 0 or arr.shape == (4, 3):
+        return None, csys
+    if arr.ndim == 1:
+        return arr.astype(np.int64), arr.astype(np.int64)
+    return arr.reshape(arr.shape[0], -1)[:, 0].astype(np.int64), arr
+
+
+def _coordinfo_arrays(csys_list, n, uset, coordref):
     """
-    Function for getting location of point "a" in basic; called by
-    :func:`addgrid`.
+    Resolve coordinate systems for `n` points
 
-    `coordinfo` is 5x3 and `a` is [x, y, z]
+    Parameters
+    ----------
+    csys_list : list
+        Each item is `csys` input as described in
+        :func:`coords_to_basic`.
+    n : integer
+        Number of points.
+    uset : pandas DataFrame or None
+        Passed to :func:`mkusetcoordinfo`.
+    coordref : dictionary
+        Passed to :func:`mkusetcoordinfo`.
+
+    Returns
+    -------
+    list
+        One ``(n, 5, 3)`` array for each item in `csys_list`; see
+        :func:`mkusetcoordinfo` for a description of the 5x3
+        coordinate system information.
+
+    Notes
+    -----
+    Each different coordinate system is only resolved once (by
+    :func:`mkusetcoordinfo`). The systems are resolved in the order
+    they are first used, taking the items of `csys_list` in turn for
+    each point; that way, a 4x3 matrix can reference a coordinate
+    system defined earlier.
     """
-    # tranformation from global to basic:
-    Tg = coordinfo[2:]
-    coordloc = coordinfo[1]
-    if coordinfo[0, 1] == 1:
-        location = coordloc + Tg @ a
-    else:
-        a2r = math.pi / 180.0
-        if coordinfo[0, 1] == 2:  # cylindrical
-            vec = np.array(
-                [a[0] * math.cos(a[1] * a2r), a[0] * math.sin(a[1] * a2r), a[2]]
+    nsets = len(csys_list)
+    parsed = [_coord_ids(csys) for csys in csys_list]
+    allcids = []
+    for cids, specs in parsed:
+        if cids is None:
+            allcids.append(np.zeros(n, np.int64))
+        elif len(cids) != n:
+            raise ValueError(
+                f"number of coordinate systems ({len(cids)}) must be 1 or "
+                f"match the number of points ({n})"
             )
-        else:  # spherical
-            s = math.sin(a[1] * a2r)
-            vec = a[0] * np.array(
-                [
-                    s * math.cos(a[2] * a2r),
-                    s * math.sin(a[2] * a2r),
-                    math.cos(a[1] * a2r),
-                ]
+        else:
+            allcids.append(cids)
+
+    # resolve each system (in order of first use):
+    table = {}
+    first = {}
+    for k, (cids, specs) in enumerate(parsed):
+        if cids is None:
+            table[("single", k)] = mkusetcoordinfo(specs, uset, coordref)
+            continue
+        ucids, index = np.unique(cids, return_index=True)
+        for cid, i in zip(ucids.tolist(), index.tolist()):
+            key = i * nsets + k
+            if cid not in first or key < first[cid][0]:
+                first[cid] = key, specs[i]
+    for cid, (key, spec) in sorted(first.items(), key=lambda item: item[1][0]):
+        table[cid] = mkusetcoordinfo(spec, uset, coordref)
+
+    out = []
+    for k, (cids, specs) in enumerate(parsed):
+        if cids is None:
+            out.append(np.broadcast_to(table[("single", k)], (n, 5, 3)))
+        else:
+            ucids, inverse = np.unique(cids, return_inverse=True)
+            info = np.array([table[cid] for cid in ucids.tolist()]).reshape(-1, 5, 3)
+            out.append(info[inverse])
+    return out
+
+
+def _to_basic(coordinfo, xyz):
+    """
+    Vectorized conversion of locations to basic:
+    coordinfo : (n, 5, 3) coordinate system information
+    xyz : (n, 3) locations in the coordinate systems
+    """
+    ctype = coordinfo[:, 0, 1]
+    vec = np.array(xyz, dtype=float)
+    a2r = math.pi / 180.0
+    cyl = ctype == 2
+    if cyl.any():
+        r, th = xyz[cyl, 0], xyz[cyl, 1] * a2r
+        vec[cyl, 0] = r * np.cos(th)
+        vec[cyl, 1] = r * np.sin(th)
+    sph = ctype == 3
+    if sph.any():
+        r, th, phi = xyz[sph, 0], xyz[sph, 1] * a2r, xyz[sph, 2] * a2r
+        s = np.sin(th)
+        vec[sph, 0] = r * (s * np.cos(phi))
+        vec[sph, 1] = r * (s * np.sin(phi))
+        vec[sph, 2] = r * np.cos(th)
+    return coordinfo[:, 1] + (coordinfo[:, 2:] @ vec[:, :, None])[:, :, 0]
+
+
+def _from_basic(coordinfo, xyz_basic):
+    """
+    Vectorized conversion of locations in basic to coordinate systems;
+    inverse of :func:`_to_basic`
+    """
+    T = coordinfo[:, 2:]
+    g = (xyz_basic - coordinfo[:, 1])[:, None, :] @ T
+    g = g[:, 0, :]
+    ctype = coordinfo[:, 0, 1]
+    out = g.copy()
+    cyl = ctype == 2
+    if cyl.any():
+        x, y = g[cyl, 0], g[cyl, 1]
+        out[cyl, 0] = np.hypot(x, y)
+        out[cyl, 1] = np.arctan2(y, x) * 180 / math.pi
+    sph = ctype == 3
+    if sph.any():
+        x, y, z = g[sph].T
+        phi = np.arctan2(y, x)
+        s = np.sin(phi)
+        c = np.cos(phi)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            theta = np.where(
+                abs(s) > abs(c), np.arctan2(y / s, z), np.arctan2(x / c, z)
             )
-        location = coordloc + Tg @ vec
-    return location
+        out[sph, 0] = np.sqrt(x ** 2 + y ** 2 + z ** 2)
+        out[sph, 1] = theta * 180 / math.pi
+        out[sph, 2] = phi * 180 / math.pi
+    return out
+
+
+def coords_to_basic(xyz, csys, uset=None, coordref=None):
+    """
+    Convert locations from any coordinate systems to basic
+
+    Parameters
+    ----------
+    xyz : 1d or 2d array_like
+        Each row is a location in the corresponding `csys`
+        coordinates::
+
+                 rectangular:  [X, Y, Z]
+                 cylindrical:  [R, Theta, Z]
+                 spherical:    [R, Theta, Phi]
+                 - angles are specified in degrees
+
+    csys : integer or 4x3 matrix; or list_like of those items
+        Coordinate system(s) of `xyz`; either one for all rows or
+        one for each row. See `coordin` in :func:`addgrid`.
+    uset : pandas DataFrame or None; optional
+        A DataFrame as output by
+        :func:`pyyeti.nastran.op2.OP2.rdn2cop2`. Searched for
+        coordinate systems not in `coordref`.
+    coordref : dictionary or None; optional
+        If None, this input is ignored. Otherwise, it is a read/write
+        dictionary of coordinate system information; see
+        :func:`addgrid`.
+
+    Returns
+    -------
+    2d ndarray
+        ``len(xyz) x 3`` array of locations in basic.
+
+    Notes
+    -----
+    Each coordinate system is resolved once (see
+    :func:`mkusetcoordinfo`) and then all locations are converted
+    together. See :func:`getcoordinates` for the equations.
+
+    See also
+    --------
+    :func:`basic_to_coords`, :func:`getcoordinates`,
+    :func:`addgrid`, :func:`build_coords`
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from pyyeti.nastran import n2p
+    >>> cylcoord = np.array([[1, 2, 0], [0, 0, 0], [1, 0, 0],
+    ...                     [0, 1, 0]])
+    >>> np.set_printoptions(precision=2, suppress=True)
+    >>> n2p.coords_to_basic([[5, 10, 15], [32, 90, 10]],
+    ...                     [0, cylcoord])
+    array([[  5.,  10.,  15.],
+           [ 10.,   0.,  32.]])
+    """
+    xyz = np.atleast_2d(np.asarray(xyz, dtype=float))
+    if coordref is None:
+        coordref = {}
+    (coordinfo,) = _coordinfo_arrays([csys], xyz.shape[0], uset, coordref)
+    return _to_basic(coordinfo, xyz)
+
+
+def basic_to_coords(xyz_basic, csys, uset=None, coordref=None):
+    """
+    Convert locations in basic to any coordinate systems
+
+    Parameters
+    ----------
+    xyz_basic : 1d or 2d array_like
+        Each row is a location in basic. To get the coordinates of
+        grids in a USET table, use, for example::
+
+            uset.loc[(gids, 1), "x":"z"].values
+
+    csys : integer or 4x3 matrix; or list_like of those items
+        Coordinate system(s) to convert to; either one for all rows
+        or one for each row. See `csys` in :func:`getcoordinates`.
+    uset : pandas DataFrame or None; optional
+        A DataFrame as output by
+        :func:`pyyeti.nastran.op2.OP2.rdn2cop2`. Searched for
+        coordinate systems not in `coordref`.
+    coordref : dictionary or None; optional
+        If None, this input is ignored. Otherwise, it is a read/write
+        dictionary of coordinate system information; see
+        :func:`addgrid`.
+
+    Returns
+    -------
+    2d ndarray
+        ``len(xyz_basic) x 3`` array of locations::
+
+            - Rectangular: [x, y, z]
+            - Cylindrical: [R, theta, z]    (theta is in deg)
+            - Spherical:   [R, theta, phi]  (theta and phi are in deg)
+
+    Notes
+    -----
+    This is the vectorized version of :func:`getcoordinates`; see
+    that routine for the equations.
+
+    See also
+    --------
+    :func:`coords_to_basic`, :func:`getcoordinates`
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from pyyeti.nastran import n2p
+    >>> cylcoord = np.array([[1, 2, 0], [0, 0, 0], [1, 0, 0],
+    ...                     [0, 1, 0]])
+    >>> np.set_printoptions(precision=2, suppress=True)
+    >>> n2p.basic_to_coords([[5, 10, 15], [10, 0, 32]], cylcoord)
+    array([[ 18.03,  56.31,   5.  ],
+           [ 32.  ,  90.  ,  10.  ]])
+    """
+    xyz_basic = np.atleast_2d(np.asarray(xyz_basic, dtype=float))
+    if coordref is None:
+        coordref = {}
+    (coordinfo,) = _coordinfo_arrays([csys], xyz_basic.shape[0], uset, coordref)
+    return _from_basic(coordinfo, xyz_basic)
 
 
 def _ensure_iter(obj):
@@ -2384,48 +2735,6 @@ def make_uset(dof, nasset=0, xyz=None):
     return usetdf
 
 
-def _addgrid_proc_ci(coord, uset, coordref):
-    """
-    :func:`addgrid` utility to ensure "coord" is iterable
-    """
-    try:
-        len(coord)
-    except TypeError:
-        # assume integer id, just make it iterable
-        coord = itertools.cycle((coord,))
-    else:
-        # is iterable ... but is it just one coord matrix?
-        try:
-            ci = mkusetcoordinfo(coord, uset, coordref)
-        except (TypeError, ValueError, IndexError):
-            # assume it's a good iterable already
-            pass
-        else:
-            # was just one coord matrix ... make iterable of cid
-            coord = itertools.cycle((int(ci[0, 0]),))
-    return coord
-
-
-def _addgrid_get_uset(nasset, mask, smap):
-    sid = id(nasset)
-    try:
-        uset = smap[sid]
-    except KeyError:
-        if len(nasset) == 6:
-            uset = [
-                mask[nasset[0]],
-                mask[nasset[1]],
-                mask[nasset[2]],
-                mask[nasset[3]],
-                mask[nasset[4]],
-                mask[nasset[5]],
-            ]
-        else:
-            uset = mask[nasset]
-        smap[sid] = uset
-    return uset
-
-
 def addgrid(uset, gid, nasset, coordin, xyz, coordout, coordref=None):
     r"""
     Add a grid or grids to a USET table.
@@ -2608,42 +2917,46 @@ def addgrid(uset, gid, nasset, coordin, xyz, coordout, coordref=None):
         except KeyError:
             coordref[0] = np.vstack((np.array([[0, 1, 0], [0.0, 0.0, 0.0]]), np.eye(3)))
 
-    mask = mkusetmask()
-
     # allocate dataframe:
     usetid = make_uset(gid)
-    nd_nasset = np.zeros(usetid.shape[0], np.int32)
-    nd_xyz = np.zeros((usetid.shape[0], 3))
-
-    # ensure nasset is iterable:
-    smap = {}
-    if isinstance(nasset, str):
-        nasset = itertools.cycle((nasset,))
-
-    # make sure coordin and coordout are iterables:
-    cin = _addgrid_proc_ci(coordin, uset, coordref)
-    cout = _addgrid_proc_ci(coordout, uset, coordref)
-
-    # make sure xyz is 2d ndarray:
-    xyz = np.atleast_2d(xyz)
+    n = len(gid)
 
-    # cols = ['nasset', 'x', 'y', 'z']
-    i = 0
-    for g, u, _cin, _xyz, _cout in zip(gid, nasset, cin, xyz, cout):
-        _uset = _addgrid_get_uset(u, mask, smap)
+    # nastran set membership for each dof:
+    mask = mkusetmask()
+    setmap = {}
 
-        # get location of point in basic:
-        _cin = mkusetcoordinfo(_cin, uset, coordref)
-        loc = _get_loc_a_basic(_cin, _xyz)
+    def _getset(u):
+        try:
+            return setmap[u]
+        except KeyError:
+            setmap[u] = [mask[c] for c in u] if len(u) == 6 else [mask[u]] * 6
+            return setmap[u]
 
-        # form x, y, z columns of dataframe:
-        _cout = mkusetcoordinfo(_cout, uset, coordref)
+    if isinstance(nasset, str):
+        nd_nasset = np.tile(np.array(_getset(nasset), np.int32), n)
+    else:
+        nd_nasset = np.array([_getset(u) for u in nasset], np.int32).ravel()
+        if nd_nasset.size != 6 * n:
+            raise ValueError(
+                f"number of `nasset` entries must be 1 or match the number of "
+                f"grids ({n})"
+            )
 
-        # put in dataframe:
-        nd_nasset[i : i + 6] = _uset
-        nd_xyz[i] = loc
-        nd_xyz[i + 1 : i + 6] = _cout
-        i += 6
+    # resolve the coordinate systems, then get the location of each
+    # point in basic:
+    xyz = np.atleast_2d(np.asarray(xyz, dtype=float))
+    if xyz.shape[0] == 1 and n > 1:
+        xyz = np.repeat(xyz, n, axis=0)
+    elif xyz.shape[0] != n:
+        raise ValueError(
+            f"number of rows in `xyz` ({xyz.shape[0]}) must match the number "
+            f"of grids ({n})"
+        )
+    cin, cout = _coordinfo_arrays([coordin, coordout], n, uset, coordref)
+    nd_xyz = np.empty((n, 6, 3))
+    nd_xyz[:, 0] = _to_basic(cin, xyz)
+    nd_xyz[:, 1:] = cout
+    nd_xyz = nd_xyz.reshape(-1, 3)
 
     # turn back into dataframe:
     usetid.iloc[:, 0] = nd_nasset
@@ -2668,6 +2981,29 @@ def _solve(a, b):
     return linalg.solve(a, b)
 
 
+def _rbe3_indep(Ind_List):
+    """
+    Utility for :func:`formrbe3` and :func:`formrbe3_batch`: returns
+    the expanded independent DOF table and the weight of each DOF
+    """
+    idof = []
+    wtdof = []
+    for j in range(0, len(Ind_List), 2):
+        # eg:  [[123, 1.2], [95, 195, 1000], 123456, 95]
+        DOF_ind = np.atleast_1d(Ind_List[j])
+        GRIDS_ind = np.atleast_1d(Ind_List[j + 1])
+        if len(DOF_ind) == 2:
+            wtcur = DOF_ind[1]
+            DOF_ind = DOF_ind[0]
+        else:
+            wtcur = 1.0
+            DOF_ind = DOF_ind[0]
+        newdof = expanddof([[n, DOF_ind] for n in GRIDS_ind])
+        idof.extend(newdof)
+        wtdof.extend([wtcur for i in range(len(newdof))])
+    return np.array(idof), np.array(wtdof)
+
+
 def formrbe3(uset, GRID_dep, DOF_dep, Ind_List, UM_List=None):
     """
     Form a least squares interpolation matrix, like RBE3 in Nastran.
@@ -2819,24 +3155,8 @@ def formrbe3(uset, GRID_dep, DOF_dep, Ind_List, UM_List=None):
     ddof = expanddof([[GRID_dep, DOF_dep]])
 
     # form independent DOF table:
-    usetdof = uset.iloc[:, :0].reset_index().values
-    idof = []
-    wtdof = []
-    for j in range(0, len(Ind_List), 2):
-        # eg:  [[123, 1.2], [95, 195, 1000], 123456, 95]
-        DOF_ind = np.atleast_1d(Ind_List[j])
-        GRIDS_ind = np.atleast_1d(Ind_List[j + 1])
-        if len(DOF_ind) == 2:
-            wtcur = DOF_ind[1]
-            DOF_ind = DOF_ind[0]
-        else:
-            wtcur = 1.0
-        newdof = expanddof([[n, DOF_ind] for n in GRIDS_ind])
-        idof.extend(newdof)
-        wtdof.extend([wtcur for i in range(len(newdof))])
-
-    idof = np.array(idof)
-    wtdof = np.array(wtdof)
+    usetdof = _uset_index(uset).locator
+    idof, wtdof = _rbe3_indep(Ind_List)
 
     # Sort idof according to uset:
     pv = locate.mat_intersect(idof, usetdof, 2)[0]
@@ -2968,6 +3288,225 @@ def formrbe3(uset, GRID_dep, DOF_dep, Ind_List, UM_List=None):
     return rbe3[:, pv]
 
 
+def formrbe3_batch(uset, rbe3s):
+    """
+    Form least squares interpolation matrices for many RBE3 elements
+
+    Parameters
+    ----------
+    uset : pandas DataFrame
+        A DataFrame as output by
+        :func:`pyyeti.nastran.op2.OP2.rdn2cop2`
+    rbe3s : list
+        Each item defines one RBE3 and is a tuple of ``(GRID_dep,
+        DOF_dep, Ind_List)`` or ``(GRID_dep, DOF_dep, Ind_List,
+        UM_List)``; see :func:`formrbe3` for a description of these
+        inputs.
+
+    Returns
+    -------
+    rbe3 : :class:`scipy.sparse.csr_matrix`
+        The interpolation matrix for all RBE3 elements. There is one
+        row for each dependent DOF (see `depdof`) and one column for
+        each DOF in `uset` (in the order of `uset`).
+    depdof : 2d ndarray
+        Two column [id, dof] array of the dependent DOF, one row for
+        each row of `rbe3`. The rows for each RBE3 are together and
+        in the order of `rbe3s`. Within an RBE3, the DOF are in the
+        order of `DOF_dep` or, if `UM_List` is used, in the order of
+        the M-set DOF in `uset`.
+
+    Notes
+    -----
+    The result for each RBE3 is the same (to numerical precision) as
+    from :func:`formrbe3`, only scattered into the columns of the
+    full `uset` table. However, instead of forming the rigid-body
+    modes for each RBE3 separately, the global transforms of all
+    grids used are formed at once and the rigid-body rows of all
+    independent DOF are computed together. The least squares
+    solutions are then computed for groups of RBE3 elements that have
+    the same number of independent DOF (as a stack of 6x6 systems).
+
+    RBE3 elements that use the `UM_List` option are passed to
+    :func:`formrbe3` one at a time.
+
+    Raises
+    ------
+    ValueError
+        When any of the DOF are not in `uset`.
+
+    See also
+    --------
+    :func:`formrbe3`, :func:`pyyeti.nastran.bulk.wtrbe3`
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from pyyeti import nastran
+    >>> locs = [[ 1,  0, 0],   #  node 100 in basic
+    ...         [ 0,  1, 0],   #  node 200 in basic
+    ...         [-1,  0, 0],   #  node 300 in basic
+    ...         [ 0, -1, 0],   #  node 400 in basic
+    ...         [ 0,  0, 0]]   #  node 500 in basic
+    >>> uset = nastran.addgrid(None, np.arange(100, 600, 100), 'b', 0,
+    ...                        locs, 0)
+    >>> rbe3, depdof = nastran.formrbe3_batch(
+    ...     uset, [(500, 123, [123, [100, 200, 300, 400]]),
+    ...            (100, 3, [123, [200, 300, 400]])])
+    >>> depdof
+    array([[500,   1],
+           [500,   2],
+           [500,   3],
+           [100,   3]])
+    >>> rbe3.shape
+    (4, 30)
+    >>> np.set_printoptions(linewidth=75, precision=2, suppress=True)
+    >>> # x-translation columns of grids 100 to 500:
+    >>> print(rbe3[:, ::6].toarray() + 0)
+    [[ 0.25  0.25  0.25  0.25  0.  ]
+     [ 0.    0.    0.    0.    0.  ]
+     [ 0.    0.    0.    0.    0.  ]
+     [ 0.    0.    0.    0.    0.  ]]
+    >>> # z-translation columns of grids 100 to 500:
+    >>> print(rbe3[:, 2::6].toarray() + 0)
+    [[ 0.    0.    0.    0.    0.  ]
+     [ 0.    0.    0.    0.    0.  ]
+     [ 0.25  0.25  0.25  0.25  0.  ]
+     [ 0.    1.   -1.    1.    0.  ]]
+    """
+    nrows = uset.shape[0]
+    depdofs = []  # dependent dof of each rbe3
+    idofs = []  # independent dof of batched rbe3
+    wtdofs = []
+    batched = []
+    um = []
+    for k, item in enumerate(rbe3s):
+        GRID_dep, DOF_dep, Ind_List = item[:3]
+        UM_List = item[3] if len(item) > 3 else None
+        if UM_List is not None:
+            mdof = expanddof(
+                [[UM_List[j], UM_List[j + 1]] for j in range(0, len(UM_List), 2)]
+            )
+            mpv = mkdofpv(uset, "p", mdof)[0]
+            depdofs.append(mdof[np.argsort(mpv)])
+            um.append(k)
+            continue
+        depdofs.append(expanddof([[GRID_dep, DOF_dep]]))
+        idof, wtdof = _rbe3_indep(Ind_List)
+        idofs.append(idof)
+        wtdofs.append(wtdof)
+        batched.append(k)
+
+    ndep = np.array([len(d) for d in depdofs], dtype=np.int64)
+    dstart = np.zeros(len(depdofs) + 1, np.int64)
+    np.cumsum(ndep, out=dstart[1:])
+    rows, cols, vals = [], [], []
+
+    if batched:
+        depdof = np.vstack([depdofs[k] for k in batched])
+        idof = np.vstack(idofs)
+        w = np.hstack(wtdofs).astype(float)
+        nind = np.array([len(i) for i in idofs], dtype=np.int64)
+        nb = len(batched)
+        istart = np.zeros(nb + 1, np.int64)
+        np.cumsum(nind, out=istart[1:])
+        sk = np.repeat(np.arange(nb), nind)  # rbe3 of each independent dof
+        gdep = np.array([rbe3s[k][0] for k in batched], dtype=np.int64)
+
+        # transforms from basic to global for all grids used:
+        gids, ginv = np.unique(np.hstack((gdep, idof[:, 0])), return_inverse=True)
+        gd, gi = ginv[:nb], ginv[nb:]
+        pv1 = mkdofpv(uset, "p", np.column_stack((gids, np.ones_like(gids))))[0]
+        info = uset.iloc[:, 1:].values[pv1[:, None] + np.arange(6)]
+        t = info[:, 3:].transpose(0, 2, 1)
+        G = t[:, None].copy()
+        _rotate_curvilinear(info, t, G)
+        G = G[:, 0]
+        xyz = info[:, 0]
+
+        # need to scale rotation weights by characteristic length:
+        rot = idof[:, 1] > 3
+        if rot.any():
+            # sum distance of each grid from the dependent grid:
+            ng = gids.size
+            pairs = np.unique(np.hstack((sk * ng + gi, np.arange(nb) * ng + gd)))
+            k, g = np.divmod(pairs, ng)
+            dist = np.sqrt(((xyz[g] - xyz[gd[k]]) ** 2).sum(axis=1))
+            with np.errstate(invalid="ignore", divide="ignore"):
+                Lc = np.bincount(k, dist, nb) / (np.bincount(k, None, nb) - 1)
+            scale = Lc > 1.0e-12
+            w[rot] *= np.where(scale, Lc * Lc, 1.0)[sk[rot]]
+
+        # rigid-body modes of the independent dof relative to the
+        # dependent grids, in global:
+        c = idof[:, 1] - 1
+        grow = G[gi, c % 3]
+        rb = np.zeros((len(idof), 6))
+        tr = ~rot
+        rb[rot, 3:] = grow[rot]
+        rb[tr, :3] = grow[tr]
+        r = xyz[gi[tr]] - xyz[gd[sk[tr]]]
+        rb[tr, 3] = grow[tr, 2] * r[:, 1] - grow[tr, 1] * r[:, 2]
+        rb[tr, 4] = grow[tr, 0] * r[:, 2] - grow[tr, 2] * r[:, 0]
+        rb[tr, 5] = grow[tr, 1] * r[:, 0] - grow[tr, 0] * r[:, 1]
+        icols = mkdofpv(uset, "p", idof)[0]
+
+        # dependent dof of the batched rbe3:
+        dk = np.repeat(np.arange(nb), ndep[batched])
+        dc = depdof[:, 1] - 1
+        drows = np.hstack(
+            [np.arange(dstart[k], dstart[k + 1]) for k in batched]
+        ).astype(np.int64)
+
+        # solve the least squares problems in groups of same size:
+        for n in np.unique(nind):
+            ks = np.nonzero(nind == n)[0]
+            j = istart[ks][:, None] + np.arange(n)
+            rbk = rb[j]
+            rbw = (rbk * w[j][:, :, None]).transpose(0, 2, 1)
+            a = rbw @ rbk
+            cond = np.linalg.cond(a)
+            if (cond > 1 / np.finfo(float).eps).any():
+                warnings.warn(
+                    f"matrix is poorly conditioned (cond={cond.max():.3e}) for "
+                    f"{np.count_nonzero(cond > 1 / np.finfo(float).eps)} "
+                    "RBE3(s). Solution will likely be inaccurate.",
+                    RuntimeWarning,
+                )
+            x = np.linalg.solve(a, rbw)
+            Gd = G[gd[ks]]
+            res = np.concatenate((Gd @ x[:, :3], Gd @ x[:, 3:]), axis=1)
+
+            # scatter into output:
+            pos = np.full(nb, -1)
+            pos[ks] = np.arange(ks.size)
+            d = np.nonzero(pos[dk] >= 0)[0]
+            vals.append(res[pos[dk[d]], dc[d]].ravel())
+            rows.append(np.repeat(drows[d], n))
+            cols.append(icols[istart[dk[d]][:, None] + np.arange(n)].ravel())
+
+    for k in um:
+        GRID_dep, DOF_dep, Ind_List, UM_List = rbe3s[k][:4]
+        mat = formrbe3(uset, GRID_dep, DOF_dep, Ind_List, UM_List)
+        alldof = np.vstack((expanddof([[GRID_dep, DOF_dep]]), _rbe3_indep(Ind_List)[0]))
+        icols = np.setdiff1d(
+            mkdofpv(uset, "p", alldof)[0], mkdofpv(uset, "p", depdofs[k])[0]
+        )
+        r, c = np.indices(mat.shape).reshape(2, -1)
+        vals.append(mat.ravel())
+        rows.append(dstart[k] + r)
+        cols.append(icols[c])
+
+    if rows:
+        rows = np.hstack(rows)
+        cols = np.hstack(cols)
+        vals = np.hstack(vals)
+    rbe3 = sp.coo_matrix((vals, (rows, cols)), shape=(dstart[-1], nrows)).tocsr()
+    rbe3.eliminate_zeros()
+    depdof = np.vstack(depdofs) if depdofs else np.zeros((0, 2), np.int64)
+    return rbe3, depdof
+
+
 def _findse(nas, se):
     """
     Find row in nas['selist'] the superelement `se`.
@@ -2992,9 +3531,7 @@ def _findse(nas, se):
 
 
 def _get_node_ids(uset):
-    ids = uset.index.get_level_values("id")
-    dof = uset.index.get_level_values("dof")
-    return ids[dof <= 1]
+    return _uset_index(uset).node_ids
 
 
 def upasetpv(nas, seup):
@@ -3042,7 +3579,8 @@ def upasetpv(nas, seup):
     maps = nas["maps"][seup]
 
     # number of rows in pv should equal size of upstream a-set
-    pv = usetdn.index.isin(dnids, level=0).nonzero()[0]
+    usidn = _uset_index(usetdn)
+    pv = np.isin(usidn.ids, dnids).nonzero()[0]
     if len(pv) < len(dnids):
         # must be an external se, but non-csuper type (the extseout,
         # seconct, etc, type)
@@ -3052,7 +3590,7 @@ def upasetpv(nas, seup):
         ids = _get_node_ids(usetdn)
 
         # number of rows should equal size of upstream a-set
-        pv = usetdn.index.isin(ids[pv], level="id").nonzero()[0]
+        pv = np.isin(usidn.ids, ids[pv]).nonzero()[0]
         if len(pv) < len(dnids):  # pragma: no cover
             raise ValueError("not all upstream DOF could be found in downstream")
     if len(maps) > 0:
@@ -3121,6 +3659,7 @@ def upqsetpv(nas, sedn=0):
         raise ValueError(msg)
 
     usetdn = nas["uset"][sedn]
+    usidn = _uset_index(usetdn)
     pv = np.zeros(usetdn.shape[0], bool)
 
     for r in rows:
@@ -3134,7 +3673,7 @@ def upqsetpv(nas, sedn=0):
         qup = mksetpv(usetup, "a", "q")
         if not qup.any():
             # assume any a-set spoints are q-set
-            dof = usetup.index.get_level_values("dof")
+            dof = _uset_index(usetup).iddof[:, 1]
             qup = dof[mksetpv(usetup, "p", "a")] == 0
             # qup = usetup[mksetpv(usetup, 'p', 'a'), 1] == 0
 
@@ -3148,7 +3687,7 @@ def upqsetpv(nas, sedn=0):
             # expand downstream ids to include all dof:
             # number of rows in pv1 should equal size of
             # upstream a-set
-            pv1 = usetdn.index.isin(dnids, level="id")
+            pv1 = np.isin(usidn.ids, dnids)
 
             if np.count_nonzero(pv1) < dnids.size:
                 # must be an external se, but non-csuper type (the
@@ -3167,7 +3706,7 @@ def upqsetpv(nas, sedn=0):
                 ids = _get_node_ids(usetdn)
 
                 # length of pv1 should equal size of upstream a-set
-                pv1 = usetdn.index.isin(ids[pv1], level="id")
+                pv1 = np.isin(usidn.ids, ids[pv1])
                 cnt = np.count_nonzero(pv1)
                 if cnt < dnids.size:  # pragma: no cover
                     raise ValueError(
@@ -3185,6 +3724,18 @@ def upqsetpv(nas, sedn=0):
     return pv
 
 
+def _dense(a):
+    """Return `a` as an ndarray if it is a :mod:`scipy.sparse` matrix"""
+    return a.toarray() if sp.issparse(a) else a
+
+
+def _any_cols(a):
+    """True/False vector of the columns of `a` that have nonzeros"""
+    if sp.issparse(a):
+        return (a != 0).getnnz(axis=0) > 0
+    return np.any(a, 0)
+
+
 def _proc_mset(nas, se, dof):
     """
     Private utility routine to get m-set information for
@@ -3198,7 +3749,7 @@ def _proc_mset(nas, se, dof):
     m = np.nonzero(mksetpv(uset, "g", "m"))[0]
     pvdofm = gm = None
     if m.size > 0:
-        iddof = uset.iloc[m, :0].reset_index().values
+        iddof = _uset_index(uset).iddof[m]
         pvdofm = locate.mat_intersect(iddof, dof)[0]
 
         if pvdofm.size > 0:
@@ -3206,6 +3757,8 @@ def _proc_mset(nas, se, dof):
             m = m[pvdofm]
             # need gm
             gm = nas["gm"][se]
+            if sp.issparse(gm):
+                gm = gm.tocsr()
             gm = gm[pvdofm]
     return hasm, m, pvdofm, gm
 
@@ -3231,7 +3784,7 @@ def _formtran_0(nas, dof, gset):
         raise RuntimeError("neither nas['phg'][0] nor nas['pha'][0] are available.")
 
     o = np.nonzero(mksetpv(uset, "g", "o"))[0]
-    iddof = uset.iloc[:, :0].reset_index().values
+    iddof = _uset_index(uset).iddof
     if o.size > 0:  # pragma: no cover
         v = locate.mat_intersect(iddof[o], dof)[0]
         if v.size > 0:
@@ -3253,7 +3806,7 @@ def _formtran_0(nas, dof, gset):
     if hasm:
         o_n = mksetpv(uset, "n", "o")
         if np.any(o_n):
-            if np.any(gm[:, o_n]):
+            if np.any(_any_cols(gm[:, o_n])):
                 raise RuntimeError(
                     "M-set for residual is dependent"
                     " on O-set (through GM). "
@@ -3377,7 +3930,7 @@ def formtran(nas, se, dof, gset=False):
 
     sets = np.zeros(0, np.int64)
     t = np.nonzero(mksetpv(uset, "g", "t"))[0]
-    iddof = uset.iloc[:, :0].reset_index().values
+    iddof = _uset_index(uset).iddof
     pvdoft = locate.mat_intersect(iddof[t], dof)[0]
     hast = 0
     if pvdoft.size > 0:
@@ -3479,17 +4032,17 @@ def formtran(nas, se, dof, gset=False):
     if hasm:
         ulvsm = np.zeros((gm.shape[0], ct + cq))
         gmo = gm[:, o_n]
-        v = np.nonzero(np.any(gmo, 0))[0]
+        v = np.nonzero(_any_cols(gmo))[0]
         if v.size > 0:
             gmo = gmo[:, v]
-            ulvsm[:, t_a] = gm[:, t_n] + gmo @ got[v]
+            ulvsm[:, t_a] = _dense(gm[:, t_n]) + gmo @ got[v]
             if cq:
                 ulvsm[:, q_a] = gmo @ goq[v]
         else:
-            ulvsm[:, t_a] = gm[:, t_n]
+            ulvsm[:, t_a] = _dense(gm[:, t_n])
         if cq:
             # m-set dependent on q-set (via MPC maybe)
-            ulvsm[:, q_a] += gm[:, q_n]
+            ulvsm[:, q_a] += _dense(gm[:, q_n])
         tran[R : R + len(m)] = ulvsm
         R += len(m)
 
@@ -3506,7 +4059,29 @@ def formtran(nas, se, dof, gset=False):
     return tran, dof
 
 
-def formulvs(nas, seup, sedn=0, keepcset=True, shortcut=True, gset=False):
+def _ulvs_link(nas, seup, sedown, keepcset, gset):
+    """
+    Utility routine for :func:`formulvs`: forms the ULVS from
+    `sedown` to `seup`, where `sedown` is directly downstream of
+    `seup`.
+    """
+    usetup = nas["uset"][seup]
+    usetdn = nas["uset"][sedown]
+    tqup = upasetpv(nas, seup)
+    iddof = _uset_index(usetdn).iddof[tqup]
+    ulvs1 = formtran(nas, sedown, iddof, gset)[0]
+    # get rid of c-set if required
+    if not keepcset:
+        noncrows = np.logical_not(mksetpv(usetup, "a", "c"))
+        if sedown != 0:
+            nonccols = np.logical_not(mksetpv(usetdn, "a", "c"))
+            ulvs1 = ulvs1[np.ix_(noncrows, nonccols)]
+        else:
+            ulvs1 = ulvs1[noncrows]
+    return ulvs1
+
+
+def formulvs(nas, seup, sedn=0, keepcset=True, shortcut=True, gset=False, cache=None):
     """
     Form ULVS for an upstream SE relative to a given downstream SE.
 
@@ -3528,6 +4103,15 @@ def formulvs(nas, seup, sedn=0, keepcset=True, shortcut=True, gset=False):
     gset : bool; optional
         If true, and `sedn` == 0, transform from g-set instead of
         modal DOF. See below.
+    cache : dictionary or None; optional
+        If None, this input is ignored. Otherwise, it is a read/write
+        dictionary of ULVS matrices with keys ``(seup, sedn, gset,
+        keepcset)``. For speed reasons, this routine will look in
+        `cache` before forming a ULVS and it will store all the
+        ULVS matrices it forms along the way (one for each
+        superelement in the chain from `seup` down to `sedn`). Can
+        be empty. The matrices in `cache` are returned directly, so
+        do not modify them in place.
 
     Returns
     -------
@@ -3548,10 +4132,17 @@ def formulvs(nas, seup, sedn=0, keepcset=True, shortcut=True, gset=False):
 
     Notes
     -----
-    This routine starts from seup and works down to sedn, forming the
-    appropriate ULVS at each level (by calling formtran()) and
-    multiplying them together to form the total ULVS from sedn DOF to
-    seup T & Q-set DOF.
+    This routine follows the chain of superelements from seup down to
+    sedn, forming the appropriate ULVS at each level (by calling
+    formtran()) and multiplying them together to form the total ULVS
+    from sedn DOF to seup T & Q-set DOF. The products are formed from
+    the downstream end so that each partial product is the ULVS of
+    another superelement in the chain; those are saved in `cache` (if
+    provided) and reused by later calls for any superelement that
+    shares that part of the chain.
+
+    The GM matrices in ``nas["gm"]`` may be :mod:`scipy.sparse`
+    matrices.
 
     The routine :func:`addulvs` is an interface routine to this
     routine that simplifies the creation of the standard ULVS matrices
@@ -3569,37 +4160,49 @@ def formulvs(nas, seup, sedn=0, keepcset=True, shortcut=True, gset=False):
     --------
     :func:`addulvs`, :func:`formdrm`, :func:`formtran`
     """
-    # work from up to down:
     r = _findse(nas, seup)
     sedown = nas["selist"][r, 1]
     if sedown == seup or sedn == seup:
         return 1.0
     if shortcut and sedn == 0 and not gset and "ulvs" in nas and seup in nas["ulvs"]:
         return nas["ulvs"][seup]
-    ulvs = 1.0
-    while True:
-        usetup = nas["uset"][seup]
-        usetdn = nas["uset"][sedown]
-        tqup = upasetpv(nas, seup)
-        iddof = usetdn.iloc[tqup, :0].reset_index().values
-        ulvs1 = formtran(nas, sedown, iddof, gset)[0]
-        # get rid of c-set if required
-        if not keepcset:
-            noncrows = np.logical_not(mksetpv(usetup, "a", "c"))
-            if sedown != 0:
-                nonccols = np.logical_not(mksetpv(usetdn, "a", "c"))
-                ulvs1 = ulvs1[np.ix_(noncrows, nonccols)]
-            else:
-                ulvs1 = ulvs1[noncrows]
-        ulvs = np.dot(ulvs, ulvs1)
-        if sedown == sedn:
-            return ulvs
-        seup = sedown
-        r = _findse(nas, seup)
+    if cache is None:
+        cache = {}
+
+    # chain of superelements from up to down:
+    chain = [seup, sedown]
+    while sedown != sedn:
+        r = _findse(nas, sedown)
+        if nas["selist"][r, 1] == sedown:
+            raise ValueError(
+                f"superelement {sedn} is not downstream of superelement {seup}"
+            )
         sedown = nas["selist"][r, 1]
+        chain.append(sedown)
 
-
-def formdrm(nas, seup, dof, sedn=0, gset=False):
+    # start from the lowest ULVS that still needs to be formed:
+    ulvs = 1.0
+    k = len(chain) - 1
+    for i in range(k):
+        key = (chain[i], sedn, gset, keepcset)
+        if key in cache:
+            ulvs = cache[key]
+            k = i
+            break
+
+    # work from down to up:
+    for i in range(k - 1, -1, -1):
+        up, dn = chain[i], chain[i + 1]
+        link = cache.get((up, dn, gset, keepcset))
+        if link is None:
+            link = _ulvs_link(nas, up, dn, keepcset, gset)
+            cache[(up, dn, gset, keepcset)] = link
+        ulvs = link if dn == sedn else np.dot(link, ulvs)
+        cache[(up, sedn, gset, keepcset)] = ulvs
+    return ulvs
+
+
+def formdrm(nas, seup, dof, sedn=0, gset=False, cache=None):
     """
     Form a displacement data recovery matrix for specified dof.
 
@@ -3626,6 +4229,10 @@ def formdrm(nas, seup, dof, sedn=0, gset=False):
     gset : bool; optional
         If true, and `sedn` == 0, transform from g-set instead of
         modal DOF. See below.
+    cache : dictionary or None; optional
+        Read/write dictionary of ULVS matrices passed to
+        :func:`formulvs`; use the same dictionary for all calls to
+        avoid forming the same ULVS matrices repeatedly.
 
     Returns
     -------
@@ -3669,7 +4276,7 @@ def formdrm(nas, seup, dof, sedn=0, gset=False):
     :func:`formulvs`, :func:`formtran`
     """
     t, outdof = formtran(nas, seup, dof, gset=gset)
-    u = formulvs(nas, seup, sedn, keepcset=True, shortcut=True, gset=gset)
+    u = formulvs(nas, seup, sedn, keepcset=True, shortcut=True, gset=gset, cache=cache)
     if np.size(u) > 1:
         # check for null c-sets (extra cols in t):
         c = t.shape[1]
@@ -3700,6 +4307,11 @@ def addulvs(nas, *ses, **kwargs):
     dictionary. The matrices are indexed by the superelement
     number. See :func:`formulvs` for more information.
 
+    Unless a `cache` dictionary is provided in `kwargs`, one is
+    created for this call and shared by all superelements in `ses`;
+    that way, the ULVS for the downstream part of a superelement
+    chain is only formed once.
+
     Example usage::
 
         >>> from pyyeti.nastran import op2, n2p   # doctest: +SKIP
@@ -3718,5 +4330,6 @@ def addulvs(nas, *ses, **kwargs):
     if "ulvs" not in nas:
         nas["ulvs"] = {}
 
+    kwargs.setdefault("cache", {})
     for se in ses:
         nas["ulvs"][se] = formulvs(nas, se, **kwargs)
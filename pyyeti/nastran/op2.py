@@ -20,6 +20,7 @@ import os
 import struct
 import warnings
 import numpy as np
+import scipy.sparse as sp
 from pyyeti import guitools
 from pyyeti.nastran import op4, n2p
 
@@ -476,17 +477,45 @@ class OP2:
         rec_type = self._getkey()
         return db_name, trailer, rec_type
 
-    def rdop2matrix(self, trailer):
+    def rdop2matrix(self, trailer, sparse=False):
         """
         Read and return Nastran op2 matrix at current file position.
 
         It is assumed that the name has already been read in via
         :func:`rdop2nt`.
 
-        The size of the matrix is read from trailer:
-             rows = trailer[2]
-             cols = trailer[1]
+        Parameters
+        ----------
+        trailer : tuple
+            The data block trailer as returned by :func:`rdop2nt`.
+            The size of the matrix is read from trailer::
+
+                rows = trailer[2]
+                cols = trailer[1]
+
+        sparse : bool or two-tuple_like; optional
+            Specifies whether the matrix is returned as a regular
+            :class:`numpy.ndarray` or as a sparse matrix. If
+            True, the matrix is returned in the
+            :class:`scipy.sparse.csc_matrix` format; it is built
+            directly from the string records of each column so the
+            full dense matrix is never formed. If `sparse` is
+            two-tuple_like, the first element is the bool described
+            above and the second element is a callable that is applied
+            to the sparse matrix (for example, to convert to CSR
+            format, use ``sparse=(True, scipy.sparse.csc_matrix.tocsr)``).
+            The callable is ignored for non-sparse matrices. This
+            follows the `sparse` option of
+            :func:`pyyeti.nastran.op4.load`, except that the "auto"
+            setting of None is treated as False: op2 files do not
+            distinguish between dense and sparse formats.
+
+        Returns
+        -------
+        2d ndarray or sparse matrix
+            The matrix; real or complex, always in double precision.
         """
+        sparse, sparsefunc = op4.OP4._get_sparsefunc(sparse)
         dtype = 1
         rows = trailer[2]
         mtype = trailer[4]
@@ -501,7 +530,16 @@ class OP2:
             frmu = self._endian + "%dd"
             bytes_per = 8
 
-        matrix = np.zeros((rows, trailer[1]), order="F")
+        if sparse:
+            # collect csc arrays; complex values are stored as
+            # real/imaginary pairs and viewed as complex at the end
+            wper = 2 if mtype > 2 else 1
+            indptr = [0]
+            indices = []
+            data = []
+            nnz = 0
+        else:
+            matrix = np.zeros((rows, trailer[1]), order="F")
         intsize = self._ibytes
         col = 0
         while dtype > 0:  # read in matrix columns
@@ -512,22 +550,44 @@ class OP2:
             while key > 0:
                 reclen = self._Str4.unpack(self._fileh.read(4))[0]
                 r = self._Str.unpack(self._fileh.read(intsize))[0] - 1
-                if mtype > 2:
-                    r *= 2
                 n = (reclen - intsize) // bytes_per
                 if n < self._rowsCutoff:
-                    matrix[r : r + n, col] = struct.unpack(
-                        frmu % n, self._fileh.read(n * bytes_per)
-                    )
+                    values = struct.unpack(frmu % n, self._fileh.read(n * bytes_per))
+                else:
+                    values = np.fromfile(self._fileh, frm, n)
+                if sparse:
+                    n //= wper
+                    indices.append(np.arange(r, r + n))
+                    data.append(np.asarray(values, dtype=float))
+                    nnz += n
                 else:
-                    matrix[r : r + n, col] = np.fromfile(self._fileh, frm, n)
+                    if mtype > 2:
+                        r *= 2
+                    matrix[r : r + n, col] = values
                 self._fileh.read(4)  # endrec
                 key = self._getkey()
             col += 1
+            if sparse:
+                indptr.append(nnz)
             self._getkey()
             dtype = self._getkey()
         self.rdop2eot()
-        if mtype > 2:
+        if sparse:
+            indptr.extend([nnz] * (trailer[1] + 1 - len(indptr)))
+            if nnz > 0:
+                indices = np.concatenate(indices)
+                data = np.concatenate(data)
+            else:
+                indices = np.zeros(0, dtype=np.int64)
+                data = np.zeros(0)
+            if mtype > 2:
+                data = data.view(complex)
+            matrix = sp.csc_matrix(
+                (data, indices, np.array(indptr)), shape=(trailer[2], trailer[1])
+            )
+            if sparsefunc:
+                matrix = sparsefunc(matrix)
+        elif mtype > 2:
             matrix.dtype = complex
         return matrix
 
@@ -571,7 +631,7 @@ class OP2:
             self._skipkey(2)
             eot, key = self.rdop2eot()
 
-    def rdop2mats(self, names=None):
+    def rdop2mats(self, names=None, sparse=False):
         """
         Read all matrices from Nastran output2 file.
 
@@ -580,6 +640,9 @@ class OP2:
         names : list_like; optional
             Iterable of names to read in. If None, read all. These can
             be input in lower case.
+        sparse : bool or two-tuple_like; optional
+            Passed to :func:`rdop2matrix`; if True, matrices are
+            returned in sparse format.
 
         Returns
         -------
@@ -602,7 +665,7 @@ class OP2:
             if rectype > 0:
                 if not names or name in names:
                     print(f"Reading matrix {name}...")
-                    mats[name] = self.rdop2matrix(trailer)
+                    mats[name] = self.rdop2matrix(trailer, sparse)
                 else:
                     self.skipop2matrix(trailer)
             else:
@@ -877,21 +940,20 @@ class OP2:
                 f.read(4)  # endrec
                 key = self._getkey()
         else:
+            # collect each physical record as an array and concatenate
+            # once at the end:
             data = []
             while key > 0:
                 reclen = self._Str4.unpack(f.read(4))[0]
                 # f.read(4)  # reclen
                 n = reclen // bytes_per
-                if n < self._rowsCutoff:
-                    b = n * bytes_per
-                    cur = struct.unpack(frmu % n, f.read(b))
-                else:
-                    cur = np.fromfile(f, frm, n)
-                data.extend(cur)
-                # data = np.hstack((data, cur))
+                data.append(np.frombuffer(f.read(n * bytes_per), frm))
                 f.read(4)  # endrec
                 key = self._getkey()
-            data = np.array(data, dtype=frm)
+            if len(data) == 1:
+                data = data[0].copy()
+            else:
+                data = np.concatenate(data) if data else np.empty(0, frm)
         self._skipkey(2)
         return data
 
@@ -906,6 +968,100 @@ class OP2:
             key = self._getkey()
         self._skipkey(2)
 
+    def _scan_records(self):
+        """
+        Scan the records from the current position to the end of the
+        data block.
+
+        Returns
+        -------
+        records : list
+            One entry per record (or 'super' record). Each entry is a
+            list of ``(offset, nbytes)`` tuples giving the file
+            position and size of the data of each physical record
+            making up the record.
+
+        Notes
+        -----
+        The data is not read; the file is only seeked through. On
+        return, the file is positioned at the end of the data block
+        (as if :func:`skipop2table` had been called). The records can
+        be decoded with :func:`_stack_records`.
+        """
+        f = self._fileh
+        records = []
+        key = self._getkey()
+        while key > 0:
+            chunks = []
+            while key > 0:
+                reclen = self._Str4.unpack(f.read(4))[0]
+                chunks.append((f.tell(), reclen))
+                f.seek(reclen + 4, 1)
+                key = self._getkey()
+            self._skipkey(2)
+            records.append(chunks)
+            key = self._getkey()
+        return records
+
+    def _memmap(self):
+        """Return a read-only uint8 memory map of the op2 file."""
+        # np.memmap moves the file position; restore it:
+        pos = self._fileh.tell()
+        mm = np.memmap(self._fileh, dtype=np.uint8, mode="r")
+        self._fileh.seek(pos)
+        return mm
+
+    @staticmethod
+    def _stack_records(mm, records, dtype, offset=0, count=None):
+        """
+        Decode equal-length records into a 2d array.
+
+        Parameters
+        ----------
+        mm : 1d ndarray
+            uint8 memory map of the file; see :func:`_memmap`.
+        records : list
+            List of records as output by :func:`_scan_records`. All
+            records must have the same number of bytes.
+        dtype : numpy dtype
+            Data type to decode (with endianness).
+        offset : integer; optional
+            Starting byte offset within each record.
+        count : integer or None; optional
+            Number of `dtype` items to decode from each record. If
+            None, decode to the end of the records.
+
+        Returns
+        -------
+        2d ndarray
+            Array with one row per record. If each record is a single
+            physical record and the records are evenly spaced in the
+            file (the usual case), this is a strided view into `mm`
+            and no data is copied.
+        """
+        dtype = np.dtype(dtype)
+        size = sum(chunk[1] for chunk in records[0])
+        if count is None:
+            count = (size - offset) // dtype.itemsize
+        starts = np.array([chunks[0][0] for chunks in records])
+        single = all(len(chunks) == 1 and chunks[0][1] == size for chunks in records)
+        steps = np.diff(starts)
+        if single and (len(steps) == 0 or (steps == steps[0]).all()):
+            stride = int(steps[0]) if len(steps) > 0 else size
+            return np.ndarray(
+                (len(records), count),
+                dtype,
+                buffer=mm,
+                offset=int(starts[0]) + offset,
+                strides=(stride, dtype.itemsize),
+            )
+        nbytes = count * dtype.itemsize
+        out = np.empty((len(records), count), dtype)
+        for i, chunks in enumerate(records):
+            buf = np.concatenate([mm[pos : pos + n] for pos, n in chunks])
+            out[i] = buf[offset : offset + nbytes].view(dtype)
+        return out
+
     def rdop2tabheaders(self, name):
         """
         Read op2 table headers and echo them to the screen.
@@ -1081,73 +1237,39 @@ class OP2:
         Can currently only read a real eigenvalue table (ACODE,4 = 2,
         TCODE,1 = 1, TCODE,2 = 7, and TCODE,7 in [0, 2]).
         """
-        float2_Str = struct.Struct(self._endian + "ff")
-        iif6_int = np.dtype(self._endian + "i4")
-        iif6_bytes = 32
-        i4_Str = struct.Struct(self._endian + self._i * 4)
-        i4_bytes = 4 * self._ibytes
-        pos = self._fileh.tell()
-        key = self._getkey()
-        lam = np.empty(1, float)
-        ougv1 = None
-        J = 0
-        eot = 0
-        while not eot:
-            if J == 1:
-                # compute number of modes by files bytes:
-                startpos = pos + 8 + self._ibytes
-                bytes_per_mode = self._fileh.tell() - startpos
-                _, endpos = self._get_block_bytes(name, startpos)
-                nmodes = (endpos - startpos) // bytes_per_mode
-                keep = lam
-                lam = np.empty(nmodes, float)
-                lam[0] = keep
-                keep = ougv1
-                ougv1 = np.empty((keep.shape[0], nmodes), float, order="F")
-                ougv1[:, 0] = keep[:, 0]
-
-            # IDENT record:
-            reclen = self._Str4.unpack(self._fileh.read(4))[0]
-            header = i4_Str.unpack(self._fileh.read(i4_bytes))
-            # header = (ACODE, TCODE, ...)
-            achk = self._check_code(header[0], [4], [[2]], "ACODE")
-            tchk = self._check_code(header[1], [1, 2, 7], [[1], [7], [0, 2]], "TCODE")
-            if not (achk and tchk):
-                self._fileh.seek(pos)
-                self.skipop2table()
+        # Scan all IDENT/DATA record pairs (one pair per mode) in one
+        # pass, then decode them all at once from the memory map:
+        recs = self._scan_records()
+        mm = self._memmap()
+        ident = self._stack_records(mm, recs[::2], self._intstr, count=4)
+        # header = (ACODE, TCODE, ...)
+        for acode in np.unique(ident[:, 0]):
+            if not self._check_code(acode, [4], [[2]], "ACODE"):
                 return
-            self._fileh.read(self._ibytes)  # mode bytes
-            lam[J] = float2_Str.unpack(self._fileh.read(8))[0]
-            # ttl bytes = reclen + 4 + 3*(4+ibytes+4)
-            #           = reclen + 28 - 3*ibytes
-            # read bytes = 4*ibytes + ibytes + 8 = 8 + 5*ibytes
-            # self._fileh.seek(reclen-2*self._ibytes+20, 1)  # ... or:
-            self._fileh.read(reclen - 2 * self._ibytes + 20)
-
-            # DATA record:
-            if ougv1 is None:
-                # - process DOF information on first column only
-                # - there are 8 elements per node:
-                #   id*10, type, x, y, z, rx, ry, rz
-                data = self.rdop2record("bytes")  # 1st column
-                n = len(data) // iif6_bytes
-                data = np.fromstring(data, iif6_int)
-                data1 = (data.reshape(n, 8))[:, :2]
-                pvgrids = data1[:, 1] == 1
-                dof = _expanddof(data1[:, 0] // 10, pvgrids)
-                # form partition vector for modeshape data:
-                V = np.zeros((n, 8), bool)
-                V[:, 2] = True  # all nodes have 'x'
-                V[pvgrids, 3:] = True  # only grids have all 6
-                V = V.ravel()
-                # initialize ougv1 with first mode shape:
-                data.dtype = np.float32  # reinterpret as floats
-                ougv1 = data[V].reshape(-1, 1)
-            else:
-                data = self.rdop2record("single", V.shape[0])
-                ougv1[:, J] = data[V]
-            J += 1
-            eot, key = self.rdop2eot()
+        for tcode in np.unique(ident[:, 1]):
+            if not self._check_code(tcode, [1, 2, 7], [[1], [7], [0, 2]], "TCODE"):
+                return
+        # eigenvalue follows the 4 header words and the mode number:
+        lam = self._stack_records(
+            mm, recs[::2], self._endian + "f4", offset=5 * self._ibytes, count=1
+        )[:, 0].astype(float)
+
+        # DATA records:
+        # - process DOF information on first column only
+        # - there are 8 elements per node:
+        #   id*10, type, x, y, z, rx, ry, rz
+        data1 = self._stack_records(mm, recs[1:2], self._endian + "i4")
+        data1 = data1.reshape(-1, 8)[:, :2]
+        pvgrids = data1[:, 1] == 1
+        dof = _expanddof(data1[:, 0] // 10, pvgrids)
+        # form partition vector for modeshape data:
+        V = np.zeros((data1.shape[0], 8), bool)
+        V[:, 2] = True  # all nodes have 'x'
+        V[pvgrids, 3:] = True  # only grids have all 6
+        V = V.ravel()
+        data = self._stack_records(mm, recs[1::2], self._endian + "f4")
+        ougv1 = np.empty((np.count_nonzero(V), data.shape[0]), order="F")
+        ougv1.T[:] = data[:, V]
         return {"ougv1": ougv1, "lambda": lam, "dof": dof}
 
     def _rdop2emap(self, nas, nse, trailer):
@@ -1622,71 +1744,52 @@ class OP2:
         # Expect IDENT/DATA record pairs. They repeat for each element
         # type for each mode.
         # This routine assumes all values are written, even the zeros.
-
-        def _getdrm(pos, e, s, eids, etypes, ibytes):
-            bytes_per_col = pos - s
-            nrows = len(eids)
-            ncols = (e - s) // bytes_per_col
-            dtype = np.int32 if ibytes == 4 else np.int64
-            drm = np.empty((nrows, ncols), dtype, order="F")
-            elem_info = np.column_stack((eids, etypes))
-            elem_info[:, 0] //= 10
-            return drm, elem_info
-
-        s = self._fileh.tell()
-        _, e = self._get_block_bytes(name, s)
-
-        # read first IDENT above loop & check ACODE/TCODE:
-        ident = self.rdop2record()
-        n_ident = len(ident)
-        achk = self._check_code(ident[0], [4], [[2]], "ACODE")
-        tchk = self._check_code(ident[1], [1, 7], [[1], [0, 2]], "TCODE")
+        recs = self._scan_records()
+        mm = self._memmap()
+        ident = self._stack_records(mm, recs[::2], self._intstr)
+        achk = self._check_code(ident[0, 0], [4], [[2]], "ACODE")
+        tchk = self._check_code(ident[0, 1], [1, 7], [[1], [0, 2]], "TCODE")
         if not (achk and tchk):
             raise ValueError("invalid ACODE and/or TCODE value")
 
+        data_recs = recs[1::2]
+        elemtypes = ident[:, 2]
+        modes = ident[:, 4]
+        nwords = ident[:, 9]  # number of words/entry
+
+        # the records for mode 1 define the rows of the drm; records
+        # for the other modes follow the same pattern:
+        first = np.nonzero(modes == 1)[0]
+        nfirst = len(first)
+        nelems = [
+            sum(chunk[1] for chunk in data_recs[i]) // (self._ibytes * nwords[i])
+            for i in first
+        ]
+        nrows = [ne * (nwords[i] - 1) for i, ne in zip(first, nelems)]
+        rowstarts = np.cumsum([0] + nrows)
+
+        drm = np.empty(
+            (rowstarts[-1], modes.max()),
+            np.float32 if self._ibytes == 4 else np.float64,
+            order="F",
+        )
         eids = []
         etypes = []
-        column = []
-        drm = None
-        n_data = []
-        r = 0
-        j = 0
-        while ident is not None:
-            elemtype = ident[2]
-            mode = ident[4]
-            nwords = ident[9]  # number of words/entry
-
-            if mode == 1:
-                # DATA record:
-                data = self.rdop2record().reshape(-1, nwords).T
-                n_data.append(data.size)
-                pos = self._fileh.tell()
-                z = np.zeros((nwords - 1, 1), data.dtype)
-                eids.extend((data[0] + z).T.ravel())
-                etypes.extend([elemtype] * data.shape[1] * (nwords - 1))
-                column.extend(data[1:].T.ravel())
-            else:
-                # DATA record:
-                data = self.rdop2record(N=n_data[j])
-                data = data.reshape(-1, nwords).T
-                if drm is None:
-                    drm, elem_info = _getdrm(pos, e, s, eids, etypes, self._ibytes)
-                    drm[:, mode - 2] = column
-                n = (nwords - 1) * data.shape[1]
-                drm[r : r + n, mode - 1] = data[1:].T.ravel()
-                j += 1
-                r += n
-                if r == drm.shape[0]:
-                    j = 0
-                    r = 0
-
-            # IDENT record:
-            ident = self.rdop2record(N=n_ident)
-
-        if drm is None:
-            drm, elem_info = _getdrm(pos, e, s, eids, etypes, self._ibytes)
-            drm[:, mode - 1] = column
-        drm.dtype = np.float32 if self._ibytes == 4 else np.float64
+        pos = np.arange(len(data_recs)) % nfirst
+        for j, i in enumerate(first):
+            nw = nwords[i]
+            r = slice(rowstarts[j], rowstarts[j + 1])
+            ids = self._stack_records(mm, data_recs[i : i + 1], self._intstr)
+            eids.append(np.repeat(ids.reshape(-1, nw)[:, 0], nw - 1))
+            etypes.append(np.full(nrows[j], elemtypes[i]))
+            # decode this record for all modes in one go:
+            group = np.nonzero(pos == j)[0]
+            data = self._stack_records(mm, [data_recs[k] for k in group], self._rfrm)
+            data = data.reshape(len(group), nelems[j], nw)[:, :, 1:]
+            drm[r, modes[group] - 1] = data.reshape(len(group), -1).T
+
+        elem_info = np.column_stack((np.concatenate(eids), np.concatenate(etypes)))
+        elem_info[:, 0] //= 10
         return drm, elem_info
 
     def rddrm2op2(self, verbose=False):
@@ -2004,7 +2107,7 @@ class OP2:
         return nas
 
 
-def rdmats(filename=None, names=None):
+def rdmats(filename=None, names=None, sparse=False):
     """
     Read all matrices from Nastran output2 file.
 
@@ -2016,6 +2119,9 @@ def rdmats(filename=None, names=None):
     names : list_like; optional
         Iterable of names to read in. If None, read all. These can
         be input in lower case.
+    sparse : bool or two-tuple_like; optional
+        If True, matrices are returned in sparse format. See
+        :func:`OP2.rdop2matrix`.
 
     Returns
     -------
@@ -2030,10 +2136,10 @@ def rdmats(filename=None, names=None):
     This routine is for convenience; this is what it does::
 
         filename = guitools.get_file_name(filename, read=True)
-        return OP2(filename).rdop2mats(names)
+        return OP2(filename).rdop2mats(names, sparse)
     """
     filename = guitools.get_file_name(filename, read=True)
-    return OP2(filename).rdop2mats(names)
+    return OP2(filename).rdop2mats(names, sparse)
 
 
 def _get_op2_op4(op2file, op4file):
@@ -2944,7 +3050,12 @@ def procdrm12(op2file=None, op4file=None, dosort=True):
 
 
 def rdpostop2(
-    op2file=None, verbose=False, getougv1=False, getoef1=False, getoes1=False
+    op2file=None,
+    verbose=False,
+    getougv1=False,
+    getoef1=False,
+    getoes1=False,
+    sparse=False,
 ):
     """
     Reads PARAM,POST,-1 op2 file and returns dictionary of data.
@@ -2961,6 +3072,9 @@ def rdpostop2(
         If True, read the OEF1* matrices, if any
     getoes1 : bool
         If True, read the OES1* matrices, if any
+    sparse : bool or two-tuple_like; optional
+        If True, the matrices in the op2 file (not the tables) are
+        returned in sparse format. See :func:`OP2.rdop2matrix`.
 
     Returns
     -------
@@ -3014,7 +3128,7 @@ def rdpostop2(
                     print(f"Reading matrix {name}...")
                 if name not in mats:
                     mats[name] = []
-                mats[name] += [o2.rdop2matrix(trailer)]
+                mats[name] += [o2.rdop2matrix(trailer, sparse)]
             else:
                 if name.find("BGPDT") == 0:
                     if verbose:
@@ -3,6 +3,8 @@
 Collection of tools for writing formatted text to files.
 """
 
+import itertools
+from string import Formatter
 import numpy as np
 from pyyeti import ytools
 
@@ -53,13 +55,105 @@ def getith(i, args, fncs):
     return lst
 
 
+def _plain_fields(string):
+    """
+    Utility routine for :func:`vecwrite`: return the set of indices
+    of the positional arguments of format `string` that are only
+    formatted via a format spec (no "!r" or "!s" conversion, and no
+    attribute or index lookup). For these, Python scalars format the
+    same as numpy scalars. Returns an empty set if `string` has
+    nested replacement fields.
+    """
+    plain = set()
+    other = set()
+    auto = 0
+    try:
+        fields = list(Formatter().parse(string))
+    except ValueError:
+        return plain
+    for literal, name, spec, conversion in fields:
+        if name is None:
+            continue
+        if "{" in spec:
+            return set()
+        key = name
+        for j, ch in enumerate(name):
+            if ch in ".[":
+                key = name[:j]
+                break
+        if key == "":
+            i = auto
+            auto += 1
+        elif key.isdigit():
+            i = int(key)
+        else:  # keyword argument; not used by vecwrite
+            continue
+        if conversion or key != name:
+            other.add(i)
+        else:
+            plain.add(i)
+    return plain - other
+
+
+def _get_columns(args, kinds, v, so, plain):
+    """
+    Utility routine for :func:`vecwrite`: return list of sequences;
+    one per conversion field, each of length ``len(v)`` (where `v` is
+    ``range(length)[so]``). Returns None if the arguments cannot be
+    put in that form (the row-by-row writer handles those). `plain`
+    is the output of :func:`_plain_fields`.
+    """
+    n = len(v)
+    cols = []
+    for arg, kind in zip(args, kinds):
+        if kind == "scalar":
+            cols.append(itertools.repeat(arg, n))
+        elif kind == "scalar1":
+            cols.append(itertools.repeat(arg[0], n))
+        elif type(arg) in (np.ndarray, np.memmap):
+            if so is not None:
+                arg = arg[so]
+            if len(arg) != n:
+                return None
+            newcols = list(arg.T) if kind == "matrow" else [arg]
+            if arg.dtype.kind in "biuf":
+                # with only a format spec, these format the same as
+                # the Python values, which are quicker to format:
+                newcols = [
+                    col.tolist() if len(cols) + k in plain else col
+                    for k, col in enumerate(newcols)
+                ]
+            cols.extend(newcols)
+        else:
+            items = [arg[i] for i in v]
+            if kind == "itemi":
+                cols.append(items)
+            elif len({len(row) for row in items}) > 1:
+                return None
+            else:
+                cols.extend(zip(*items))
+    return cols
+
+
 @ytools.write_text_file
-def _vecwrite(fout, string, length, args, fncs, postfunc, pfargs, so):
+def _vecwrite(fout, string, length, args, fncs, postfunc, pfargs, so, kinds):
     """Utility routine for :func:`vecwrite`."""
     v = range(length)
     if so is not None:
         v = v[so]
-    if postfunc:
+    if len(v) > 0:
+        cols = _get_columns(args, kinds, v, so, _plain_fields(string))
+    else:
+        cols = None
+    if cols is not None:
+        # format all rows in one C-level pass:
+        lines = map(string.format, *cols)
+        if postfunc:
+            if pfargs is None:
+                pfargs = []
+            lines = (postfunc(s, *pfargs) for s in lines)
+        fout.write("".join(lines))
+    elif postfunc:
         if pfargs is None:
             pfargs = []
         for i in v:
@@ -176,16 +270,20 @@ def vecwrite(f, string, *args, postfunc=None, pfargs=None, so=None):
 
     length = 1
     fncs = []
+    kinds = []
     for i, arg in enumerate(args):
         if not isinstance(arg, str) and hasattr(arg, "__len__"):
             if np.ndim(arg) == 2:
                 fncs.append(_get_matrow)
+                kinds.append("matrow")
                 curlen = np.size(arg, 0)
             elif len(arg) == 1:
                 fncs.append(_get_scalar1)
+                kinds.append("scalar1")
                 curlen = 1
             else:
                 fncs.append(_get_itemi)
+                kinds.append("itemi")
                 curlen = len(arg)
             if curlen > 1:
                 if length > 1:
@@ -206,7 +304,8 @@ def vecwrite(f, string, *args, postfunc=None, pfargs=None, so=None):
                 length = curlen
         else:
             fncs.append(_get_scalar)
-    _vecwrite(f, string, length, args, fncs, postfunc, pfargs, so)
+            kinds.append("scalar")
+    _vecwrite(f, string, length, args, fncs, postfunc, pfargs, so, kinds)
 
 
 def formheader(headers, widths, formats, sep=(0, 2), just=-1, ulchar="-"):
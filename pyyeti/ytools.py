@@ -5,6 +5,8 @@ this module were originally translated from Yeti (now a dead language)
 to Python.
 """
 
+import io
+import os
 import pickle
 import gzip
 import bz2
@@ -15,6 +17,8 @@ from types import SimpleNamespace
 from functools import wraps
 import numpy as np
 import scipy.linalg as linalg
+import scipy.sparse as sp
+import scipy.sparse.linalg as sp_la
 from scipy.optimize import leastsq
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
@@ -670,7 +674,7 @@ def isdiag(A, tol=1e-12):
 
     Parameters
     ----------
-    A : 2d numpy array
+    A : 2d numpy array or scipy sparse matrix
         If not square or if number of dimensions does not equal 2, this
         routine returns False.
     tol : scalar; optional
@@ -706,12 +710,55 @@ def isdiag(A, tol=1e-12):
     """
     if A.shape[0] != A.shape[1]:
         return False
-    d = np.diag(A)
-    max_off = abs(np.diag(d) - A).max()
+    if sp.issparse(A):
+        d = A.diagonal()
+        max_off = abs(sp.diags(d) - A).max()
+    else:
+        d = np.diag(A)
+        max_off = abs(np.diag(d) - A).max()
     max_on = abs(d).max()
     return max_off <= tol * max_on
 
 
+def _isclose_transpose(A, conj=False):
+    """
+    Returns ``np.allclose(A, A.T)`` (or ``A.T.conj()`` if `conj` is
+    True); `A` can be sparse
+    """
+    At = A.T.conj() if conj else A.T
+    if sp.issparse(A):
+        # same tolerances as np.allclose:
+        return (abs(A - At) - 1.0e-5 * abs(At)).max() <= 1.0e-8
+    return np.allclose(A, At)
+
+
+def _cholesky_ok(A):
+    """
+    Returns True if the Cholesky decomposition of `A` succeeds; `A`
+    can be sparse
+
+    For sparse `A`, an LU decomposition restricted to diagonal
+    pivots is used: `A` is positive definite if it can be factored
+    without off-diagonal pivoting and all pivots are positive.
+    """
+    if sp.issparse(A):
+        try:
+            lu = sp_la.splu(
+                sp.csc_matrix(A),
+                permc_spec="MMD_AT_PLUS_A",
+                diag_pivot_thresh=0.0,
+                options=dict(SymmetricMode=True),
+            )
+        except RuntimeError:
+            return False
+        return (lu.perm_r == lu.perm_c).all() and (lu.U.diagonal().real > 0).all()
+    try:
+        linalg.cholesky(A)
+        return True
+    except linalg.LinAlgError:
+        return False
+
+
 def mattype(A, mtype=None):
     """
     Checks contents of square matrix `A` to see if it is symmetric,
@@ -719,7 +766,7 @@ def mattype(A, mtype=None):
 
     Parameters
     ----------
-    A : 2d array_like or None
+    A : 2d array_like or scipy sparse matrix or None
         If not square or if number of dimensions does not equal 2, the
         return type is 0. If None, just return the `mattypes` output
         (not a tuple).
@@ -758,6 +805,10 @@ def mattype(A, mtype=None):
         mattype(A, 'symmetric')  # returns True or False
         mattype(None)            # returns mattypes
 
+    `A` can also be a scipy sparse matrix. In that case, the
+    positive-definite check uses a sparse LU decomposition with
+    diagonal pivoting instead of a Cholesky decomposition.
+
     See also
     --------
     :func:`isdiag`
@@ -802,28 +853,22 @@ def mattype(A, mtype=None):
     if A is None:
         return mattypes
     Atype = 0
-    A = np.asarray(A)
+    if not sp.issparse(A):
+        A = np.asarray(A)
     if mtype is None:
         if A.ndim != 2 or A.shape[0] != A.shape[1]:
             return Atype, mattypes
-        if np.allclose(A, A.T):
+        if _isclose_transpose(A):
             Atype |= mattypes["symmetric"]
-            if np.isrealobj(A):
-                try:
-                    linalg.cholesky(A)
-                    Atype |= mattypes["posdef"]
-                except linalg.LinAlgError:
-                    pass
-        elif np.iscomplexobj(A) and np.allclose(A, A.T.conj()):
+            if np.isrealobj(A) and _cholesky_ok(A):
+                Atype |= mattypes["posdef"]
+        elif np.iscomplexobj(A) and _isclose_transpose(A, conj=True):
             Atype |= mattypes["hermitian"]
-            try:
-                linalg.cholesky(A)
+            if _cholesky_ok(A):
                 Atype |= mattypes["posdef"]
-            except linalg.LinAlgError:
-                pass
         if isdiag(A):
             Atype |= mattypes["diagonal"]
-            d = np.diag(A)
+            d = A.diagonal()
             if np.allclose(1, d):
                 Atype |= mattypes["identity"]
         return Atype, mattypes
@@ -832,29 +877,21 @@ def mattype(A, mtype=None):
         return False
 
     if mtype == "symmetric":
-        return np.allclose(A, A.T)
+        return _isclose_transpose(A)
 
     if mtype == "hermitian":
-        return np.allclose(A, A.T.conj())
+        return _isclose_transpose(A, conj=True)
 
     if mtype == "posdef":
-        if np.isrealobj(A):
-            if not np.allclose(A, A.T):
-                return False
-        else:
-            if not np.allclose(A, A.T.conj()):
-                return False
-        try:
-            linalg.cholesky(A)
-            return True
-        except linalg.LinAlgError:
+        if not _isclose_transpose(A, conj=np.iscomplexobj(A)):
             return False
+        return _cholesky_ok(A)
 
     if mtype in ("diagonal", "identity"):
         if isdiag(A):
             if mtype == "diagonal":
                 return True
-            d = np.diag(A)
+            d = A.diagonal()
             return np.allclose(1, d)
         else:
             return False
@@ -1333,6 +1370,112 @@ def _get_fopen(name, read=True):
     return name, fopen
 
 
+# ".pmm" files: 8-byte magic, 8-byte pickle length, pickle, then the
+# raw data of the arrays (each aligned to _PMM_ALIGN bytes). Arrays
+# of at least _PMM_MIN_BYTES are written out of the pickle:
+_PMM_MAGIC = b"\x93PYYETI1"
+_PMM_ALIGN = 64
+_PMM_MIN_BYTES = 1024
+
+
+def _pmm_start(npickle):
+    # offset of the array data in a ".pmm" file
+    return -(-(16 + npickle) // _PMM_ALIGN) * _PMM_ALIGN
+
+
+class _PmmPickler(pickle.Pickler):
+    """Pickler that sets large arrays aside for :func:`_save_pmm`"""
+
+    def __init__(self, f):
+        super().__init__(f, protocol=-1)
+        self.arrays = []
+        self.pids = {}
+        self.nbytes = 0
+
+    def persistent_id(self, obj):
+        if (
+            type(obj) not in (np.ndarray, np.memmap)
+            or obj.nbytes < _PMM_MIN_BYTES
+            or obj.dtype.hasobject
+        ):
+            return None
+        try:
+            return self.pids[id(obj)]
+        except KeyError:
+            pass
+        order = "F" if obj.flags.f_contiguous and not obj.flags.c_contiguous else "C"
+        pid = (self.nbytes, obj.shape, obj.dtype, order)
+        self.pids[id(obj)] = pid
+        self.arrays.append(obj)
+        self.nbytes += -(-obj.nbytes // _PMM_ALIGN) * _PMM_ALIGN
+        return pid
+
+
+class _PmmUnpickler(pickle.Unpickler):
+    """Unpickler that maps the arrays for :func:`_load_pmm`"""
+
+    def __init__(self, f, buffer):
+        super().__init__(f)
+        self.buffer = buffer
+        self.arrays = {}
+
+    def persistent_load(self, pid):
+        offset, shape, dtype, order = pid
+        try:
+            return self.arrays[offset]
+        except KeyError:
+            arr = self.arrays[offset] = np.ndarray(
+                shape, dtype, buffer=self.buffer, offset=offset, order=order
+            )
+            return arr
+
+
+def _save_pmm(name, obj):
+    # see :func:`save`
+    header = io.BytesIO()
+    pickler = _PmmPickler(header)
+    pickler.dump(obj)
+    header = header.getvalue()
+    start = _pmm_start(len(header))
+    # write to a temporary file first: the arrays in `obj` may be
+    # mapped from `name` itself (if it was loaded via :func:`load`)
+    tmpname = name + ".tmp"
+    with open(tmpname, "wb") as f:
+        f.write(_PMM_MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for arr in pickler.arrays:
+            f.write(bytes(start - f.tell()))
+            if arr.flags.f_contiguous and not arr.flags.c_contiguous:
+                arr = arr.T
+            f.write(np.ascontiguousarray(arr).data)
+            start += -(-arr.nbytes // _PMM_ALIGN) * _PMM_ALIGN
+    os.replace(tmpname, name)
+
+
+def _load_pmm(name):
+    # see :func:`load`
+    with open(name, "rb") as f:
+        f.seek(len(_PMM_MAGIC))
+        npickle = int.from_bytes(f.read(8), "little")
+        header = f.read(npickle)
+        start = _pmm_start(npickle)
+        size = f.seek(0, io.SEEK_END)
+    # map the arrays copy-on-write: they can be modified in memory
+    # but the file is never changed
+    if size > start:
+        buffer = np.memmap(name, np.uint8, "c", offset=start)
+    else:
+        buffer = None
+    return _PmmUnpickler(io.BytesIO(header), buffer).load()
+
+
+def _is_pmm(name):
+    # True if `name` is a ".pmm" file (by content, not extension)
+    with open(name, "rb") as f:
+        return f.read(len(_PMM_MAGIC)) == _PMM_MAGIC
+
+
 def save(name, obj):
     """
     Save an object to a file via pickling.
@@ -1341,9 +1484,10 @@ def save(name, obj):
     ----------
     name : string or None
         Name of file or directory or None. If file name, should end in
-        either '.p' for an uncompressed pickle file, or in '.pgz' or
-        '.pbz2' for a gzip or bz2 compressed pickle file. Note: only
-        '.pgz' and 'pbz2' are checked for; anything else is
+        either '.p' for an uncompressed pickle file, in '.pgz' or
+        '.pbz2' for a gzip or bz2 compressed pickle file, or in '.pmm'
+        for a "memory-mappable" pickle file (see Notes). Note: only
+        '.pgz', '.pbz2' and '.pmm' are checked for; anything else is
         uncompressed. If `name` is the name of a directory or None, a
         GUI is opened for file selection.
     obj : any
@@ -1352,8 +1496,21 @@ def save(name, obj):
     Notes
     -----
     See :mod:`pickle`
+
+    A '.pmm' file is a pickle file where the data of the larger
+    :class:`numpy.ndarray` instances in `obj` (at least 1 KB) is
+    written separately after the pickle, in raw form. :func:`load`
+    only reads and unpickles the small pickle; the array data is
+    memory-mapped (copy-on-write), so it is read from disk only as
+    it is used. For large objects like the :class:`pyyeti.cla`
+    results, this makes saving and loading much faster than with
+    the compressed formats, at the cost of file size (there is no
+    compression).
     """
     name, fopen = _get_fopen(name, read=False)
+    if name.endswith(".pmm"):
+        _save_pmm(name, obj)
+        return
     with fopen(name, "wb") as f:
         pickle.dump(obj, file=f, protocol=-1)
 
@@ -1368,7 +1525,9 @@ def load(name):
         Name of file. Should end in either '.p' for an uncompressed
         pickle file, or in '.pgz' or '.pbz2' for a gzip or bz2
         compressed pickle file. Note: only '.pgz' and 'pbz2' are
-        checked for; anything else is uncompressed.
+        checked for; anything else is uncompressed. Files written
+        in the '.pmm' format by :func:`save` are recognized by their
+        content regardless of the name.
 
     Returns
     -------
@@ -1378,8 +1537,14 @@ def load(name):
     Notes
     -----
     See :mod:`pickle`
+
+    For a '.pmm' file, the larger arrays in `obj` are
+    memory-mapped copy-on-write: they may be modified, but the
+    changes are never written back to the file.
     """
     name, fopen = _get_fopen(name, read=True)
+    if _is_pmm(name):
+        return _load_pmm(name)
     with fopen(name, "rb") as f:
         return pickle.load(f)
 
@@ -1,6 +1,7 @@
 import math
 import numpy as np
 import scipy.linalg as la
+import scipy.sparse as sp
 from io import StringIO
 import tempfile
 import os
@@ -58,6 +59,14 @@ def test_cbconvert_2():
     assert np.allclose(m1_2, m2_2)
     assert np.allclose(mass[n - nb, n - nb] * 0.005710147154735817, m1_2[0, 0])
 
+    # sparse:
+    m3_1 = cb.cbconvert(sp.csr_matrix(mass), b, "m2e")
+    assert sp.issparse(m3_1)
+    assert np.allclose(m3_1.toarray(), m1_1)
+    drm = np.random.randn(4, n)
+    drm3 = cb.cbconvert(sp.csc_matrix(drm), b, "m2e", drm=True)
+    assert np.allclose(drm3.toarray(), cb.cbconvert(drm, b, "m2e", drm=True))
+
 
 def test_cbtf():
     nas = op2.rdnas2cam("tests/nas2cam_csuper/nas2cam")
@@ -139,6 +148,71 @@ def test_cbtf():
     assert_raises(ValueError, cb.cbtf, maa, baa1, kaa, a2[:3, :], freq, b)
 
 
+def test_cbtf_chunks():
+    nas = op2.rdnas2cam("tests/nas2cam_csuper/nas2cam")
+    maa = nas["maa"][102]
+    kaa = nas["kaa"][102]
+    uset = nas["uset"][102]
+    b = n2p.mksetpv(uset, "a", "b")
+    pv = np.any(maa, axis=0)
+    b = np.nonzero(b[pv])[0]
+    pv = np.ix_(pv, pv)
+    maa = maa[pv]
+    kaa = kaa[pv]
+    baa = 0.1 * np.random.randn(*maa.shape)
+    baa = baa.dot(baa.T)
+
+    rb = n2p.rbgeom_uset(uset.iloc[b], 3)
+    freq = np.arange(0.0, 80.0, 0.5)
+    a = rb[:, 0]
+    tf = cb.cbtf(maa, baa, kaa, a, freq, b, chunk_size=len(freq))
+    rows = [0, 3, maa.shape[0] - 1]
+    for chunk_size, nthreads in [(None, 1), (7, 1), (13, 3)]:
+        tf2 = cb.cbtf(
+            maa, baa, kaa, a, freq, b, chunk_size=chunk_size, nthreads=nthreads
+        )
+        tf3 = cb.cbtf(maa, baa, kaa, a, freq, b, rows=rows, chunk_size=chunk_size)
+        assert np.allclose(tf.frc, tf2.frc)
+        assert np.allclose(tf.frc, tf3.frc)
+        for name in ("a", "d", "v"):
+            assert np.allclose(getattr(tf, name), getattr(tf2, name))
+            assert np.allclose(getattr(tf, name)[rows], getattr(tf3, name))
+
+    # the q-set solver is cached automatically and rebuilt if the
+    # model changes:
+    key = id(maa), id(baa), id(kaa)
+    solver = cb._CBTF_SOLVERS[key][-1]
+    cb.cbtf(maa, baa, kaa, a, freq, b)
+    assert cb._CBTF_SOLVERS[key][-1] is solver
+    baa *= 2.0
+    tf4 = cb.cbtf(maa, baa, kaa, a, freq, b)
+    assert cb._CBTF_SOLVERS[key][-1] is not solver
+    assert not np.allclose(tf.a, tf4.a)
+    del maa
+    assert key not in cb._CBTF_SOLVERS
+
+
+def test_fingerprint():
+    a = np.arange(12.0).reshape(3, 4)
+    fp = cb._fingerprint(a)
+    assert fp == cb._fingerprint(a.copy())
+    assert fp == cb._fingerprint(a.tolist())
+    assert cb._fingerprint(None) is None
+    # Fortran order is hashed in place; the order is part of the key:
+    f = np.asfortranarray(a)
+    assert cb._fingerprint(f)[0] == (3, 4)
+    assert cb._fingerprint(f)[2] == "F"
+    assert cb._fingerprint(f) != fp
+    # non-contiguous views are hashed by value:
+    assert cb._fingerprint(np.arange(24.0).reshape(3, 8)[:, ::2]) == cb._fingerprint(
+        np.arange(0.0, 24.0, 2.0).reshape(3, 4)
+    )
+    b = a.copy()
+    b[1, 2] = -1.0
+    assert cb._fingerprint(b) != fp
+    assert cb._fingerprint(a.astype(np.float32)) != fp
+
+
 def test_cbreorder_m():
     m = np.dot(np.arange(1, 9).reshape(-1, 1), np.arange(2, 10).reshape(1, -1))
     # array([[ 2,  3,  4,  5,  6,  7,  8,  9],
@@ -417,6 +491,61 @@ def test_cbcheck_indeterminate():
         )
 
 
+def test_cbcheck_sparse():
+    nas = op2.rdnas2cam("tests/nas2cam_csuper/nas2cam")
+    se = 101
+    maa = nas["maa"][se]
+    kaa = nas["kaa"][se]
+    pv = np.any(maa, axis=0)
+    pv = np.ix_(pv, pv)
+    maa = maa[pv]
+    kaa = kaa[pv]
+
+    uset = nas["uset"][se]
+    bset = n2p.mksetpv(uset, "p", "b")
+    usetb = nas["uset"][se].iloc[bset]
+    b = n2p.mksetpv(uset, "a", "b")
+    b = np.nonzero(b)[0]
+
+    with StringIO() as f:
+        out = cb.cbcheck(f, maa, kaa, b, b[:6], usetb, em_filt=2)
+        s = f.getvalue().splitlines()
+
+    for kwargs in (
+        dict(Mcb=sp.csr_matrix(maa), Kcb=sp.csc_matrix(kaa)),
+        dict(Mcb=maa, Kcb=kaa, low_memory=True),
+    ):
+        with StringIO() as f:
+            out2 = cb.cbcheck(
+                f, bseto=b, bref=b[:6], uset=usetb, em_filt=2, nmodes=20, **kwargs
+            )
+            s2 = f.getvalue().splitlines()
+        assert sp.issparse(out2.m) and sp.issparse(out2.k)
+        assert np.all(out2.m.toarray() == maa)
+        assert np.all(out2.k.toarray() == kaa)
+        assert s2[:3] == s[:3]
+        assert "Solving hermitian eigen problem for lowest 20 modes." in s2
+        for name in ("rbs", "rbg", "rbe"):
+            assert np.allclose(getattr(out2, name), getattr(out, name), atol=1e-6)
+
+        # compare elastic free-free frequencies:
+        j = s.index("FREE-FREE MODES:") + 4
+        j2 = s2.index("FREE-FREE MODES:") + 4
+        frq = np.array([float(i.split()[1]) for i in s[j + 6 : j + 20]])
+        frq2 = np.array([float(i.split()[1]) for i in s2[j2 + 6 : j2 + 20]])
+        assert np.allclose(frq, frq2)
+        assert s2[j2 + 20] == ""
+
+        # mass properties and effective mass checks are the same:
+        j = [15]
+        jy = [15]
+        for label in ["6x6 "] * 3 + ["Inertia ", "Principal "] * 3:
+            assert comptable(s2, s, j, jy, label=label, skip=2)
+        j = s.index("FIXED-BASE MODES w/ Percent Modal Effective Mass:")
+        j2 = s2.index(s[j])
+        assert s[j:] == s2[j2:]
+
+
 def test_cbcheck_determinate():
     nas = op2.rdnas2cam("tests/nas2cam_csuper/nas2cam")
     se = 101
@@ -739,6 +868,45 @@ def test_rbmultchk():
     assert comptable(s, sy, j, jy, label=" Row ", skip=2)
 
 
+def test_rbmultchk_sparse():
+    nas = op2.rdnas2cam("tests/nas2cam_csuper/nas2cam")
+    se = 101
+    uset = nas["uset"][se]
+    bset = n2p.mksetpv(uset, "p", "b")
+    usetb = nas["uset"][se].iloc[bset]
+    b = n2p.mksetpv(uset, "a", "b")
+    q = ~b
+    b = np.nonzero(b)[0]
+
+    grids = [[11, 123456], [45, 123456], [60, 123456]]
+    drm101, dof101 = n2p.formtran(nas, 101, grids)
+    drm101[15] = 0.0
+    rb = n2p.rbgeom_uset(usetb)
+    drm101_last = np.hstack((drm101[:, q], drm101[:, b]))
+    bsetpv = np.zeros(drm101.shape[1], bool)
+    bsetpv[-len(b) :] = True
+
+    with StringIO() as f:
+        cb.rbmultchk(f, drm101, "DRM101", rb, drm2=drm101)
+        s = f.getvalue()
+
+    for drm, bset in ((drm101, "first"), (drm101_last, "last"), (drm101_last, bsetpv)):
+        for kwargs in (
+            dict(drm=sp.csr_matrix(drm), drm2=sp.csc_matrix(drm)),
+            dict(drm=sp.csc_matrix(drm), drm2=drm),
+            dict(drm=drm, drm2=drm, low_memory=True),
+        ):
+            with StringIO() as f:
+                drmrb = cb.rbmultchk(f, name="DRM101", rb=rb, bset=bset, **kwargs)
+                assert f.getvalue() == s
+            assert isinstance(drmrb, np.ndarray)
+            assert np.allclose(drmrb, drm101[:, b] @ rb)
+
+    # low_memory splits the multiply by rows:
+    rows = cb._row_blocks(10, 4, blocksize=12)
+    assert [(r.start, r.stop) for r in rows] == [(0, 3), (3, 6), (6, 9), (9, 12)]
+
+
 def test_rbmultchk2():
     # write to a string:
     with StringIO() as f:
@@ -906,6 +1074,11 @@ def test_rbdispchk():
     f.close()
 
     coords_out, maxerr = cb.rbdispchk(name, rbtrimmed, grids=[100, 200, 300])
+    coords_sp, maxerr_sp = cb.rbdispchk(
+        name, sp.csr_matrix(rbtrimmed), grids=[100, 200, 300]
+    )
+    assert np.all(coords_sp == coords_out)
+    assert np.all(maxerr_sp == maxerr)
     with open(name) as f:
         s2 = f.read()
     os.remove(name)
@@ -960,6 +1133,12 @@ def test_cbcoordchk2():
     chk2 = cb.cbcoordchk(kaa, b, [25, 26, 27, 31, 32, 33], verbose=False)
     assert chk2.refpoint_chk == "fail"
 
+    # sparse stiffness:
+    chk3 = cb.cbcoordchk(sp.csr_matrix(kaa), b, bref, verbose=False)
+    assert np.allclose(chk3.coords, chk1.coords)
+    assert np.allclose(chk3.rbmodes, chk1.rbmodes)
+    assert chk3.refpoint_chk == "pass"
+
 
 def compare_nets(net, net2):
     for name in net.__dict__:
@@ -1,10 +1,16 @@
 import os
 import itertools
+import functools
+import tempfile
 import shutil
 import inspect
 import re
+import copy
+import pickle
 import warnings
+from collections import OrderedDict
 from types import SimpleNamespace
+from concurrent.futures import ProcessPoolExecutor
 from glob import glob
 from io import StringIO
 import numpy as np
@@ -16,6 +22,7 @@ import matplotlib.pyplot as plt
 from pyyeti import cla, cb, ode, stats, locate
 from pyyeti import nastran, srs
 from pyyeti.nastran import op2, n2p, op4
+from pyyeti.cla import dr_results
 
 
 def test_magpct():
@@ -339,6 +346,43 @@ def test_form_extreme():
     results.form_extreme(case_order=cases)
     assert results["extreme"]["ATM"].cases == cases
 
+    # threads give the same envelope:
+    results.form_extreme(doappend=1)
+    ext1 = results["FDLC"]["extreme"]
+    results.form_extreme(doappend=1, nthreads=3)
+    ext2 = results["FDLC"]["extreme"]
+    for name, res in ext1.items():
+        for attr in ("ext", "mx", "mn", "maxcase", "mincase", "cases", "domain"):
+            assert np.all(getattr(ext2[name], attr) == getattr(res, attr))
+
+
+def test_merge_files():
+    results = [
+        get_fake_cla_results("FLAC", _get_labels0, 0),
+        get_fake_cla_results("VLC", _get_labels1, 1),
+    ]
+    results[1]["Liftoff"]["ATM"].hist = np.ones((3, 34, 2000))
+    orig = cla.DR_Results()
+    orig.merge(results, {"FLAC": "FDLC"})
+    orig.form_extreme()
+    with tempfile.TemporaryDirectory() as dirname:
+        names = []
+        for i, res in enumerate(results):
+            names.append(os.path.join(dirname, f"results{i}.pmm"))
+            cla.save(names[-1], res)
+        merged = cla.DR_Results()
+        assert merged.merge(names, {"FLAC": "FDLC"}, strip_hists=True) == [
+            "FDLC",
+            "VLC",
+        ]
+        merged.form_extreme()
+        for name, res in orig["extreme"].items():
+            new = merged["extreme"][name]
+            assert new.maxcase == res.maxcase
+            assert np.all(new.ext == res.ext)
+        assert not hasattr(merged["VLC"]["Liftoff"]["ATM"], "hist")
+        del merged
+
 
 def test_rptpct1_align_by_label():
     results = cla.DR_Results()
@@ -1273,6 +1317,79 @@ def test_extrema_1():
     )
 
 
+def test_extrema_3():
+    # 2-column extrema with per-row case labels:
+    curext = SimpleNamespace(ext=None, ext_x=None, maxcase=None, mincase=None)
+    maxcase = ["a1", "a2", "a3"]
+    mincase = ["b1", "b2", "b3"]
+    mm = SimpleNamespace(ext=np.array([[1.0, -1.0], [2.0, -2.0], [3.0, -3.0]]))
+    mm.ext_x = None
+    cla.extrema(curext, mm, maxcase, mincase)
+    assert curext.maxcase == maxcase and curext.maxcase is not maxcase
+    assert curext.mincase == mincase and curext.mincase is not mincase
+
+    maxcase = ["c1", "c2", "c3"]
+    mm = SimpleNamespace(ext=np.array([[0.0, -4.0], [5.0, 0.0], [3.0, -3.0]]))
+    mm.ext_x = None
+    cla.extrema(curext, mm, maxcase)
+    assert np.all(curext.ext == [[1.0, -4.0], [5.0, -2.0], [3.0, -3.0]])
+    assert curext.maxcase == ["a1", "c2", "a3"]
+    assert curext.mincase == ["c1", "b2", "b3"]
+    assert maxcase == ["c1", "c2", "c3"]
+
+    # same with the case labels stored as indices:
+    curext = cla.ExtremaNamespace(ext=None, ext_x=None, maxcase=None, mincase=None)
+    mm = SimpleNamespace(ext=np.array([[1.0, -1.0], [2.0, -2.0], [3.0, -3.0]]))
+    mm.ext_x = None
+    cla.extrema(curext, mm, ["a1", "a2", "a3"], ["b1", "b2", "b3"])
+    mm = SimpleNamespace(ext=np.array([[0.0, -4.0], [5.0, 0.0], [3.0, -3.0]]))
+    mm.ext_x = None
+    cla.extrema(curext, mm, (["c1", "c2", "c3"], np.arange(3)))
+    assert np.all(curext.ext == [[1.0, -4.0], [5.0, -2.0], [3.0, -3.0]])
+    assert curext.maxcase == ["a1", "c2", "a3"]
+    assert curext.mincase == ["c1", "b2", "b3"]
+    assert curext.case_names == ["a1", "a2", "a3", "b1", "b2", "b3", "c1", "c2", "c3"]
+    assert curext.maxcase_index.dtype == np.uint8
+    assert "maxcase" not in curext.__dict__
+
+    cla.extrema(curext, mm, "d")
+    assert curext.maxcase == ["a1", "c2", "a3"]
+    mm.ext = mm.ext * 2
+    cla.extrema(curext, mm, "d")
+    assert curext.maxcase == ["a1", "d", "d"]
+    assert curext.mincase == ["d", "b2", "d"]
+
+    # the properties can be set:
+    curext.mincase = ["e", "f", "e"]
+    assert curext.mincase == ["e", "f", "e"]
+    assert curext.maxcase == ["a1", "d", "d"]
+    curext.maxcase = None
+    assert curext.maxcase is None and curext.maxcase_index is None
+
+
+def test_extremanamespace_pickle():
+    res = cla.DR_Results()
+    res["ATM"] = cla.ExtremaNamespace(
+        ext=np.ones((3, 2)), maxcase=["a", "b", "a"], mincase=["c", "c", "c"]
+    )
+    res2 = pickle.loads(pickle.dumps(res))
+    assert type(res2["ATM"]) is cla.ExtremaNamespace
+    assert res2["ATM"].maxcase == ["a", "b", "a"]
+    assert res2["ATM"].mincase == ["c", "c", "c"]
+    res3 = copy.deepcopy(res)
+    assert res3["ATM"].maxcase == ["a", "b", "a"]
+
+    # results pickled before ExtremaNamespace are converted on load:
+    old = SimpleNamespace(ext=np.ones((3, 2)), maxcase=["a", "b", "a"], mincase=None)
+    kwargs = OrderedDict(ATM=old)
+    kwargs["__pickle_version"] = 1
+    res4 = dr_results.unpickle_drresults(kwargs)
+    assert type(res4["ATM"]) is cla.ExtremaNamespace
+    assert res4["ATM"].maxcase == ["a", "b", "a"]
+    assert res4["ATM"].mincase is None
+    assert np.all(res4["ATM"].ext == 1.0)
+
+
 def test_extrema_2():
     rows = 5
     curext = SimpleNamespace(
@@ -1686,7 +1803,8 @@ def test_event_add():
     for k, d1 in SOL1.items():  # loop over uf_reds
         d2 = SOL2[k]
         d3 = SOL3[k]
-        for k, v1 in d1.__dict__.items():  # loop over a, v, d, ...
+        for k in ("a", "v", "d", "d_static", "d_dynamic", "pg"):
+            v1 = getattr(d1, k)
             v2 = getattr(d2, k)
             v3 = getattr(d3, k)
             assert np.all(v2 == v1)
@@ -1702,6 +1820,46 @@ def test_event_add():
     assert np.all(SOL[(2, 2, 2, 2)].pg == 2 * sol.pg)
 
 
+def test_apply_uf_lazy():
+    n, nrb = 8, 2
+    rfmodes = np.array([7])
+    sol = SimpleNamespace(
+        a=np.random.randn(n, 20),
+        v=np.random.randn(n, 20),
+        d=np.random.randn(n, 20),
+        t=np.arange(20.0),
+    )
+    k = np.arange(n) * 10.0
+    b = np.arange(n) * 0.1
+    DR = cla.DR_Event()
+    DR.UF_reds = [(1, 1, 1, 1), (1.1, 1.2, 1.3, 1.4)]
+    solout = DR.apply_uf(sol, None, b, k, nrb, rfmodes)
+    SOL = solout[(1.1, 1.2, 1.3, 1.4)]
+    assert SOL.t is sol.t
+    assert "a" not in vars(SOL) and "d" not in vars(SOL)
+
+    # fold does not form `a`:
+    drm = np.random.randn(3, n)
+    fac = np.array([1.54, 1.54, 1.56, 1.56, 1.56, 1.56, 1.56, 0.0])
+    assert np.allclose(SOL.fold(drm, "a"), drm @ (fac[:, None] * sol.a))
+    assert "a" not in vars(SOL)
+    assert np.allclose(SOL.a, fac[:, None] * sol.a)
+    assert np.allclose(SOL.v, fac[:, None] * sol.v)
+    assert np.allclose(SOL.fold(drm, "v"), drm @ SOL.v)
+
+    # mode-acceleration displacements:
+    genforce = sol.a + b[:, None] * sol.v + k[:, None] * sol.d
+    avterm = sol.a + b[:, None] * sol.v
+    avterm[rfmodes] = 0.0
+    d_static = 1.2 * 1.4 * genforce[nrb:] / k[nrb:, None]
+    d_dynamic = -1.2 * 1.3 * avterm[nrb:] / k[nrb:, None]
+    assert np.all(SOL.d_static[:nrb] == 0.0)
+    assert np.allclose(SOL.d_static[nrb:], d_static)
+    assert np.allclose(SOL.d_dynamic[nrb:], d_dynamic)
+    assert np.allclose(SOL.d, SOL.d_static + SOL.d_dynamic)
+    assert not hasattr(SOL, "pg")
+
+
 def test_event_add_uf_reds_update():
     _get_labels = _get_labels0
     rows = {"ATM": 34}
@@ -1964,6 +2122,296 @@ def test_case_defined():
     assert_raises(ValueError, results.time_data_recovery, sol, None, event, DR, 1, 0)
 
 
+def test_get_drfunc_cache():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, "drfuncs.py")
+        with open(filename, "w") as f:
+            f.write("def ATM(sol, nas, Vars, se):\n    return 1\n")
+        func = cla.get_drfunc(filename, "ATM")
+        assert func(None, None, None, None) == 1
+        assert cla.get_drfunc(filename, "ATM") is func
+        assert cla.get_drfunc(filename, "ATM", get_psd=True) == (func, None)
+
+        # changing the file causes it to be imported again:
+        with open(filename, "w") as f:
+            f.write("def ATM(sol, nas, Vars, se):\n    return 22\n")
+        func2 = cla.get_drfunc(filename, "ATM")
+        assert func2(None, None, None, None) == 22
+
+    func = cla.get_drfunc(None, "sol + 1")
+    assert func(1, None, None, None) == 2
+    assert cla.get_drfunc(None, "sol + 1") is func
+
+
+def test_fuse_drms():
+    (mass, damp, stiff, drms1, uf_reds, defaults, DR) = mass_spring_system()
+    drdefs = cla.DR_Def(defaults)
+
+    @cla.DR_Def.addcat
+    def _():
+        name = "springs"
+        desc = "Spring Forces"
+        units = "N"
+        labels = [f"Spring {i + 1}" for i in range(3)]
+        drfunc = "Vars[se]['springdrm'] @ sol.d"
+        histpv = "all"
+        drdefs.add(**locals())
+
+    @cla.DR_Def.addcat
+    def _():
+        name = "total"
+        desc = "Spring + Damper Forces"
+        units = "N"
+        labels = [f"Total {i + 1}" for i in range(3)]
+        drfunc = 'Vars[se]["springdrm"] @ sol.d + Vars[se]["damperdrm"] @ sol.v'
+        drdefs.add(**locals())
+
+    DR.add(None, drdefs)
+    assert DR.Fused is None
+    ts = ode.SolveUnc(mass, damp, stiff, 0.001, pre_eig=True)
+    f = np.zeros((3, 1000))
+    f[0, 20:250] = 10.0
+    sol = {uf_reds: ts.tsolve(f)}
+    freq = np.arange(1.0, 30.0)
+    fsol = {uf_reds: ts.fsolve(np.ones((3, len(freq))), freq)}
+
+    results = DR.prepare_results("Spring & Damper Forces", "Event")
+    results.time_data_recovery(sol, None, "Case 1", DR, 1, 0)
+    fresults = DR.prepare_results("Spring & Damper Forces", "Event")
+    fresults.frf_data_recovery(fsol, None, "Case 1", DR, 1, 0)
+
+    DR.fuse_drms()
+    # "kc_forces" uses np.vstack, so it is not fused:
+    assert set(DR.Fused.cats) == {"springs", "total"}
+    key = (uf_reds, 0, "d", 3, "<f8")
+    assert DR.Fused.drms[key].shape == (3, 3)
+    vkey = (uf_reds, 0, "v", 3, "<f8")
+    assert DR.Fused.cats["total"] == [(key, "springdrm"), (vkey, "damperdrm")]
+
+    results2 = DR.prepare_results("Spring & Damper Forces", "Event")
+    results2.time_data_recovery(sol, None, "Case 1", DR, 1, 0)
+    fresults2 = DR.prepare_results("Spring & Damper Forces", "Event")
+    fresults2.frf_data_recovery(fsol, None, "Case 1", DR, 1, 0)
+    for res, res2 in ((results, results2), (fresults, fresults2)):
+        for name in res:
+            assert np.allclose(res[name].ext, res2[name].ext)
+            assert np.allclose(res[name].mx, res2[name].mx)
+        assert np.allclose(res["springs"].ext, res["kc_forces"].ext[:3])
+
+    assert np.allclose(results["springs"].hist, results2["springs"].hist)
+    assert np.allclose(fresults["springs"].frf, fresults2["springs"].frf)
+
+
+def _spring_solver(mass, damp, stiff, h, uf_reds):
+    ts = ode.SolveUnc(mass, damp, stiff, h, pre_eig=True)
+
+    def solve(scale):
+        f = np.zeros((3, 1000))
+        f[0, 20:250] = scale
+        return {uf_reds: ts.tsolve(f)}
+
+    return solve
+
+
+def _spring_event():
+    (mass, damp, stiff, drms1, uf_reds, defaults, DR) = mass_spring_system()
+    drdefs = cla.DR_Def(dict(defaults, srsfrq=np.arange(1.0, 50.0), srsQs=(10, 33)))
+
+    @cla.DR_Def.addcat
+    def _():
+        name = "accels"
+        desc = "Accelerations"
+        units = "m/sec^2"
+        labels = [f"Accel {i}" for i in range(3)]
+        drfunc = "sol.a"
+        histpv = "all"
+        srspv = [0, 2]
+        srsopts = dict(eqsine=1)
+        drdefs.add(**locals())
+
+    DR.add(None, drdefs)
+    factory = functools.partial(_spring_solver, mass, damp, stiff, 0.001, uf_reds)
+    cases = [(f"Case {i}", scale) for i, scale in enumerate((10.0, -30.0, 20.0, 5.0))]
+    return DR, factory, cases
+
+
+def test_run_time_cases():
+    DR, factory, cases = _spring_event()
+
+    # the serial loop:
+    results = DR.prepare_results("Spring & Damper Forces", "Event")
+    solve = factory()
+    for j, (case, scale) in enumerate(cases):
+        results.time_data_recovery(solve(scale), None, case, DR, len(cases), j)
+
+    res1 = DR.prepare_results("Spring & Damper Forces", "Event")
+    res1.run_time_cases(DR, factory, iter(cases))
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        res2 = DR.prepare_results("Spring & Damper Forces", "Event")
+        res2.run_time_cases(DR, factory, cases, executor=executor)
+        res3 = DR.prepare_results("Spring & Damper Forces", "Event")
+        res3.run_time_cases(DR, factory, cases, executor=executor, batch_size=3)
+        res4 = DR.prepare_results("Spring & Damper Forces", "Event")
+        res4.run_time_cases(
+            DR, factory, cases, executor=executor, batch_size=1, nworkers=1
+        )
+
+    for res in (res1, res2, res3, res4):
+        for name in results:
+            r0, r1 = results[name], res[name]
+            assert r1.cases == r0.cases
+            assert r1.maxcase == r0.maxcase
+            assert r1.mincase == r0.mincase
+            for attr in ("ext", "ext_x", "mx", "mn", "mx_x", "mn_x", "hist", "time"):
+                assert np.all(getattr(r1, attr) == getattr(r0, attr))
+        r0, r1 = results["accels"].srs, res["accels"].srs
+        assert r1.type == r0.type == "eqsine"
+        for q in (10, 33):
+            assert np.all(r1.srs[q] == r0.srs[q])
+            assert np.all(r1.ext[q] == r0.ext[q])
+
+
+def test_open_store():
+    DR, factory, cases = _spring_event()
+
+    results = DR.prepare_results("Spring & Damper Forces", "Event")
+    results.run_time_cases(DR, factory, cases)
+
+    with tempfile.TemporaryDirectory() as dirname:
+        # "crash" after the first two cases:
+        res = DR.prepare_results("Spring & Damper Forces", "Event")
+        assert res.open_store(dirname) == 0
+        assert isinstance(res["accels"], SimpleNamespace)
+        bad = cases[:2] + [("Case 2", "crash"), cases[3]]
+        assert_raises(ValueError, res.run_time_cases, DR, factory, bad)
+        assert isinstance(res["accels"].hist, np.memmap)
+        assert isinstance(res["accels"].srs.srs[10], np.memmap)
+        for attr in ("mx", "mn", "mx_x", "mn_x"):
+            assert isinstance(getattr(res["accels"], attr), np.memmap)
+        del res
+
+        # the checkpoint is not used unless asked for:
+        res = DR.prepare_results("Spring & Damper Forces", "Event")
+        assert_raises(ValueError, res.open_store, dirname)
+
+        # categories must match:
+        res = DR.prepare_results("Spring & Damper Forces", "Event")
+        del res["accels"]
+        assert_raises(ValueError, res.open_store, dirname, resume=True)
+        assert "accels" not in res
+
+        # number of cases and case names must match:
+        res = DR.prepare_results("Spring & Damper Forces", "Event")
+        assert res.open_store(dirname, resume=True) == 2
+        assert_raises(ValueError, res.run_time_cases, DR, factory, cases[:3])
+        renamed = [("Case 9", cases[0][1])] + cases[1:]
+        assert_raises(ValueError, res.run_time_cases, DR, factory, renamed)
+        del res
+
+        # resume:
+        res = DR.prepare_results("Spring & Damper Forces", "Event")
+        assert res.open_store(dirname, resume=True) == 2
+        assert res["accels"].cases[:2] == ["Case 0", "Case 1"]
+        # a case already in the checkpoint cannot be redone:
+        solve = factory()
+        assert_raises(
+            ValueError,
+            res.time_data_recovery,
+            solve(cases[1][1]),
+            None,
+            cases[1][0],
+            DR,
+            len(cases),
+            1,
+        )
+        res.run_time_cases(DR, factory, cases)
+        del res
+
+        res = cla.DR_Results.load_store(dirname)
+        for name in results:
+            r0, r1 = results[name], res[name]
+            assert r1.cases == r0.cases
+            assert r1.maxcase == r0.maxcase
+            assert r1.mincase == r0.mincase
+            for attr in ("ext", "mx", "mn", "mx_x", "mn_x", "hist", "time"):
+                assert np.all(getattr(r1, attr) == getattr(r0, attr))
+        assert not res["accels"].hist.flags.writeable
+        assert not res["accels"].mx.flags.writeable
+        for q in (10, 33):
+            assert np.all(res["accels"].srs.srs[q] == results["accels"].srs.srs[q])
+            assert np.all(res["accels"].srs.ext[q] == results["accels"].srs.ext[q])
+        del res
+
+
+def test_reports_parallel():
+    DR, factory, cases = _spring_event()
+    results = DR.prepare_results("Spring & Damper Forces", "Event")
+    results.run_time_cases(DR, factory, cases)
+    with tempfile.TemporaryDirectory() as dirname:
+        d1 = os.path.join(dirname, "serial")
+        d2 = os.path.join(dirname, "parallel")
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results.rptext(direc=d1)
+            results.rptext(direc=d2, executor=executor)
+            results.rpttab(direc=d1)
+            results.rpttab(direc=d2, executor=executor)
+            results.rptpct(results, direc=d1)
+            results.rptpct(results, direc=d2, executor=executor)
+            results.srs_plots(direc=d1, fmt="png")
+            results.srs_plots(direc=d2, fmt="png", executor=executor)
+        files = sorted(os.listdir(d1))
+        assert files == sorted(os.listdir(d2))
+        assert "accels.ext" in files and "accels_eqsine.png" in files
+        for name in files:
+            if not name.endswith(".png"):
+                with open(os.path.join(d1, name)) as f1:
+                    with open(os.path.join(d2, name)) as f2:
+                        assert f1.read() == f2.read()
+
+        # skip unchanged reports:
+        filename = os.path.join(d1, "accels.ext")
+        results.rptext(direc=d1, skip_unchanged=True)
+        assert os.path.exists(os.path.join(d1, ".report_digests.pickle"))
+        with open(filename, "w") as f:
+            f.write("marker")
+        results.rptext(direc=d1, skip_unchanged=True)
+        with open(filename) as f:
+            assert f.read() == "marker"
+        results.rptext(direc=d1, skip_unchanged=True, numform="{:13.6e}")
+        with open(filename) as f:
+            assert f.read() != "marker"
+
+        # the histories do not affect the digests:
+        results["accels"].hist = results["accels"].hist + 1.0
+        with open(filename, "w") as f:
+            f.write("marker")
+        results.rptext(direc=d1, skip_unchanged=True, numform="{:13.6e}")
+        with open(filename) as f:
+            assert f.read() == "marker"
+
+        # digests are only computed with skip_unchanged, and the
+        # reports written without it are dropped from the record:
+        digest = dr_results._report_digest
+        dr_results._report_digest = None
+        try:
+            results.rptext(direc=d1)
+        finally:
+            dr_results._report_digest = digest
+        with open(filename) as f:
+            assert f.read() != "marker"
+        with open(filename, "w") as f:
+            f.write("marker")
+        results.rptext(direc=d1, skip_unchanged=True, numform="{:13.6e}")
+        with open(filename) as f:
+            assert f.read() != "marker"
+
+    # reports get the categories without histories or SRSs:
+    cat = dr_results._report_cat(results["accels"])
+    assert not hasattr(cat, "hist") and not hasattr(cat, "srs")
+    assert cat.ext is results["accels"].ext
+    assert hasattr(results["accels"], "hist")
+
+
 def test_PSD_consistent():
     # resp:
     #   0   0.
@@ -2169,6 +2617,50 @@ def test_get_numform():
     assert _get_numform(np.array([1e10, 1e5])) == "{:13.0f}"
 
 
+def test_rpttab_extremanamespace():
+    # the tables are the same for categories with indexed case labels
+    # and for plain SimpleNamespace categories with label lists:
+    DR, factory, cases = _spring_event()
+    results = DR.prepare_results("Spring & Damper Forces", "Event")
+    results.run_time_cases(DR, factory, cases)
+    plain = cla.DR_Results()
+    for name, res in results.items():
+        assert isinstance(res, cla.ExtremaNamespace)
+        dct = {k: v for k, v in vars(res).items() if not k.endswith("_index")}
+        dct.update(maxcase=res.maxcase, mincase=res.mincase)
+        del dct["case_names"]
+        plain[name] = SimpleNamespace(**dct)
+    with tempfile.TemporaryDirectory() as dirname:
+        d1 = os.path.join(dirname, "index")
+        d2 = os.path.join(dirname, "plain")
+        results.rpttab(direc=d1)
+        plain.rpttab(direc=d2)
+        for name in results:
+            with open(os.path.join(d1, name + ".tab")) as f1:
+                with open(os.path.join(d2, name + ".tab")) as f2:
+                    assert f1.read() == f2.read()
+
+    # a large category:
+    n = 20000
+    rng = np.random.RandomState(1)
+    mx = rng.rand(n, 3)
+    mn = -rng.rand(n, 3)
+    res = cla.ExtremaNamespace(
+        mx=mx,
+        mn=mn,
+        ext=np.column_stack((mx.max(axis=1), mn.min(axis=1))),
+        cases=["a", "b", "c"],
+    )
+    res.maxcase = ["a", "b", "c"] * (n // 3) + ["a"] * (n % 3)
+    res.mincase = ["c", "b", "a"] * (n // 3) + ["c"] * (n % 3)
+    plain = SimpleNamespace(**vars(res))
+    plain.maxcase = res.maxcase
+    plain.mincase = res.mincase
+    get_absmax = cla._rpttab1._get_absmax
+    for r1, r2 in zip(get_absmax(res), get_absmax(plain)):
+        assert np.all(r1 == r2) if isinstance(r1, np.ndarray) else r1 == r2
+
+
 def test_rpttab1():
     (mass, damp, stiff, drms1, uf_reds, defaults, DR) = mass_spring_system()
 
@@ -30,6 +30,19 @@ def test_calcAM():
     AM2 = frclim.calcAM((maa, baa, kaa, bdrm), freq)
     assert np.allclose(AM1, AM2)
 
+    # results are memoized:
+    AM1b = frclim.calcAM((maa, baa, kaa, b), freq)
+    assert AM1b is not AM1
+    assert np.all(AM1b == AM1)
+    AM1b[:] = 0.0
+    assert np.all(frclim.calcAM((maa, baa, kaa, b), freq) == AM1)
+    AM3 = frclim.calcAM((maa, baa, kaa, b), freq, cache=False)
+    assert AM3 is not AM1
+    assert np.all(AM3 == AM1)
+    baa[q, q] *= 2.0
+    AM4 = frclim.calcAM((maa, baa, kaa, b), freq)
+    assert not np.allclose(AM4, AM1)
+
 
 def test_ntfl():
     freq = np.arange(0.0, 25.1, 0.1)
@@ -108,6 +121,13 @@ def test_ntfl():
     assert np.allclose(r.A, r2.A)
     assert np.allclose(r.F, r2.F)
 
+    r3 = frclim.ntfl(source, load, As, freq, chunk_size=7)
+    assert np.all(r3.SAM == r.SAM)
+    assert np.all(r3.LAM == r.LAM)
+    assert np.allclose(r.R, r3.R)
+    assert np.allclose(r.A, r3.A)
+    assert np.allclose(r.F, r3.F)
+
 
 def test_sefl():
     assert np.allclose(1.5, frclim.sefl(1.5, 40, 80))
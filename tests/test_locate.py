@@ -90,3 +90,92 @@ def test_locate_misc():
     pv = np.array([0, 3, 5])
     tf = locate.index2bool(pv, 8)
     assert np.all(np.array([True, False, False, True, False, True, False, False]) == tf)
+
+
+def test_locator():
+    mat1 = np.array([[7, 3], [6, 8], [4, 0], [9, 2], [1, 5]])
+    mat2 = np.array([[9, 2], [1, 5], [7, 3], [1, 1]])
+    loc1 = locate.Locator(mat1)
+    loc2 = locate.Locator(mat2)
+    for keep in (1, 2):
+        pv1, pv2 = locate.mat_intersect(mat1, mat2, keep)
+        for D1, D2 in ((loc1, mat2), (mat1, loc2)):
+            pv1_, pv2_ = locate.mat_intersect(D1, D2, keep)
+            assert np.all(pv1_ == pv1)
+            assert np.all(pv2_ == pv2)
+
+    # floats and ints, -0.0 and 0.0:
+    loc = locate.Locator([0.0, 1.0, 2.0])
+    pv1, pv2 = loc.find([2, -0.0, 5])
+    assert np.all(pv1 == [0, 1])
+    assert np.all(pv2 == [2, 0])
+    assert np.all(loc.isin(np.array([5, 1])) == [False, True])
+    assert loc.find(np.ones((2, 2)))[0].size == 0
+
+    # strings of different lengths:
+    loc = locate.Locator(np.array(["ab", "c"]))
+    pv1, pv2 = loc.find(np.array(["c", "abc", "ab"]))
+    assert np.all(pv1 == [0, 2])
+    assert np.all(pv2 == [1, 0])
+
+    # objects and mixed types are compared via a hash table:
+    loc = locate.Locator(np.array(["a", 1], dtype=object))
+    pv1, pv2 = loc.find(np.array([1, "b", "a"], dtype=object))
+    assert np.all(pv1 == [0, 2])
+    assert np.all(pv2 == [1, 0])
+    assert locate.Locator(["1", "2"]).find([1, 2])[0].size == 0
+
+    # first occurrence is found:
+    pv1, pv2 = locate.Locator([3, 1, 3]).find([3])
+    assert np.all(pv2 == [0])
+
+    # empty haystack:
+    pv1, pv2 = locate.mat_intersect(np.zeros((0, 2)), np.ones((3, 2)))
+    assert pv1.size == pv2.size == 0
+
+    # the haystack is not modified:
+    a = np.array([-0.0, 1.0])
+    locate.Locator(a).find([0.0])
+    assert np.signbit(a[0])
+
+    m = np.array([[10, 20], [30, 20]])
+    assert np.all(locate.find_vals(m, locate.Locator([20])) == locate.find_vals(m, 20))
+
+
+def test_list_intersect_merge_lists():
+    # compare to a straightforward implementation:
+    def merge_lists(list1, list2):
+        merged = list1[:]
+        elements = []
+        for e in list2:
+            if e in merged:
+                i = merged.index(e)
+                merged[i:i] = elements
+                del elements[:]
+            else:
+                elements.append(e)
+        merged.extend(elements)
+        pv1 = [0] * len(list1)
+        prev = 0
+        for i, e in enumerate(list1):
+            prev = pv1[i] = merged.index(e, prev)
+        return merged, pv1, [merged.index(e) for e in list2]
+
+    rng = np.random.RandomState(1)
+    for i in range(500):
+        pool = [f"s{j}" for j in range(rng.randint(1, 12))]
+        l1 = list(rng.choice(pool, rng.randint(0, 10)))
+        l2 = list(rng.choice(pool, rng.randint(0, 10)))
+        assert locate.merge_lists(l1, l2) == merge_lists(l1, l2)
+
+        pv1, pv2 = locate.list_intersect(l1, l2)
+        assert [l1[j] for j in pv1] == [l2[j] for j in pv2]
+        common = [e for j, e in enumerate(l1) if e in l2 and e not in l1[:j]]
+        assert [l1[j] for j in pv1] == common
+        assert all(pv2 == [l2.index(e) for e in common])
+
+    # unhashable items:
+    l3, i, j = locate.merge_lists([[1], [2]], [[0], [2], [3]])
+    assert l3 == [[1], [0], [2], [3]]
+    assert i == [0, 2]
+    assert j == [1, 2, 3]
@@ -2,9 +2,11 @@ import inspect
 import numpy as np
 import math
 import scipy.linalg as la
+import scipy.sparse as sp
 from scipy.io import matlab
 import io
 import os
+import warnings
 from pyyeti import nastran, cb
 from pyyeti.nastran import n2p, op2, op4
 from nose.tools import *
@@ -421,6 +423,30 @@ def test_rbgeom_uset_spherical():
     assert err < 2.0e-3
 
 
+def test_rbgeom_uset_many_grids():
+    # mix of rectangular, cylindrical and spherical grids (some on
+    # the z-axis of their coordinate system); all grids at once
+    # should match one grid at a time:
+    cyl = np.array([[1, 2, 0], [10, 20, 30], [1, 0, 0], [0, 1, 0]])
+    sph = np.array([[2, 3, 0], [-5, 4, 2], [0, 1, 0], [1, 1, 0]])
+    rect = np.array([[3, 1, 0], [1, 2, 3], [1, 1, 1], [0, 1, 0]])
+    coords = [0, cyl, sph, rect] * 6
+    locs = np.arange(72.0).reshape(24, 3) / 7 - 5
+    locs[[1, 2, 5, 6], :2] = 0
+    ids = np.arange(1, 25)
+    uset = nastran.addgrid(None, ids, "b", coords, locs, coords[::-1])
+    for ref in (np.array([[0, 0, 0]]), 7, [1.0, -2.0, 3.0]):
+        if np.size(ref) == 1:
+            refpt = uset.loc[(ref, 1), "x":"z"].values
+        else:
+            refpt = ref
+        rb = n2p.rbgeom_uset(uset, ref)
+        for j, gid in enumerate(ids):
+            usetj = uset.iloc[6 * j : 6 * j + 6]
+            rbj = n2p.rbgeom_uset(usetj, refpt)
+            assert np.allclose(rb[6 * j : 6 * j + 6], rbj)
+
+
 def test_rbmove():
     grids = np.array([[0.0, 0.0, 0.0], [30.0, 10.0, 20.0]])
     rb0 = n2p.rbgeom(grids)
@@ -810,10 +836,59 @@ def test_getcoordinates():
     assert np.allclose(n2p.getcoordinates(uset, 100, 1), [R, th, phi])
 
 
+def test_coords_to_basic():
+    cylcoord = np.array([[1, 2, 0], [0, 0, 0], [1, 0, 0], [0, 1, 0]])
+    sphcoord = np.array([[2, 3, 1], [2, 2, 2], [2, 7, 3], [-5, 19, 24]])
+    uset = n2p.addgrid(None, [1, 2], "b", 0, [0, 0, 0], [cylcoord, sphcoord])
+    coordref = {}
+    n = 50
+    rng = np.random.RandomState(3)
+    xyz = rng.rand(n, 3) * [10, 180, 360] - [0, 0, 180]
+    cids = rng.randint(0, 3, n)
+
+    # mix of ids and 4x3 matrices:
+    csys = [c if c != 1 or i % 2 else cylcoord for i, c in enumerate(cids)]
+    xyz_basic = n2p.coords_to_basic(xyz, csys, uset, coordref)
+    assert xyz_basic.shape == (n, 3)
+    assert np.allclose(n2p.basic_to_coords(xyz_basic, cids, uset, coordref), xyz)
+    for j in range(n):
+        assert np.allclose(
+            n2p.getcoordinates(uset, xyz_basic[j], int(cids[j]), coordref), xyz[j]
+        )
+
+    # batched addgrid matches one-grid-at-a-time addgrid:
+    uset1 = None
+    for j in range(n):
+        uset1 = n2p.addgrid(uset1, j + 1, "b", int(cids[j]), xyz[j], 0, coordref)
+    uset2 = n2p.addgrid(None, np.arange(1, n + 1), "b", cids, xyz, 0, coordref)
+    assert np.allclose(uset1.values, uset2.values)
+    assert (uset1.index == uset2.index).all()
+
+    # single system for all points:
+    assert np.allclose(
+        n2p.coords_to_basic(xyz[:3], 2, uset, coordref),
+        n2p.coords_to_basic(xyz[:3], [2, 2, 2], uset, coordref),
+    )
+    assert_raises(ValueError, n2p.coords_to_basic, xyz, [0, 1], uset, coordref)
+    assert_raises(ValueError, n2p.addgrid, None, [1, 2], "b", 0, np.zeros((3, 3)), 0)
+
+
 def test_rbcoords():
     assert_raises(ValueError, n2p.rbcoords, np.random.randn(3, 4))
     assert_raises(ValueError, n2p.rbcoords, np.random.randn(13, 6))
 
+    nodes = np.random.randn(100, 3) * 10.0
+    rb = n2p.rbgeom(nodes)
+    coords, maxdev, maxerr = n2p.rbcoords(rb, verbose=0)
+    assert np.allclose(coords, nodes)
+    assert maxdev < 1e-12 and maxerr < 1e-9
+
+    # spoil node 10:
+    rb[61, 3] += 1.0
+    coords, maxdev, maxerr = n2p.rbcoords(rb, verbose=0)
+    assert np.allclose(np.delete(coords, 10, axis=0), np.delete(nodes, 10, axis=0))
+    assert maxdev > 0.1
+
 
 def gettestuset():
     # z = x-basic; r = y-basic
@@ -859,6 +934,29 @@ def test_mksetpv_mkdofpv():
     assert np.all(np.array([[100, 3], [200, 5], [300, 1], [300, 4]]) == dof)
 
 
+def test_uset_index_invalidation():
+    uset = n2p.addgrid(None, [1, 2, 3], "b", 0, np.zeros(3), 0)
+    assert n2p.mksetpv(uset, "p", "b").all()
+    assert n2p.mkdofpv(uset, "b", [2])[0].tolist() == list(range(6, 12))
+
+    # change set membership in place:
+    uset.loc[2, "nasset"] = n2p.mkusetmask("m")
+    b = n2p.mksetpv(uset, "p", "b")
+    assert b.sum() == 12 and not b[6:12].any()
+    assert_raises(ValueError, n2p.mkdofpv, uset, "b", [2])
+    assert n2p.mkdofpv(uset, "b", [3])[0].tolist() == list(range(6, 12))
+
+    # replace the index:
+    uset.index = uset.index.set_levels(uset.index.levels[0] * 10, level="id")
+    assert n2p.mkdofpv(uset, "p", [30])[0].tolist() == list(range(12, 18))
+    assert_raises(ValueError, n2p.mkdofpv, uset, "p", [3])
+
+    # cache entries go away with the DataFrame:
+    n = len(n2p._USET_INDEXES)
+    del uset, b
+    assert len(n2p._USET_INDEXES) == n - 1
+
+
 def test_mkcordcardinfo():
     uset = n2p.addgrid(None, 1, "b", 0, [0, 0, 0], 0)
     ci = n2p.mkcordcardinfo(uset)
@@ -1273,6 +1371,84 @@ def test_formrbe3_UM_6():
     assert np.allclose(gmmod, pygm)
 
 
+def test_formrbe3_batch():
+    # same RBE3s as in test_formrbe3_1 and test_formrbe3_UM_6:
+    rbe3_1 = (
+        124,
+        123456,
+        [
+            [123, 2.3],
+            100,
+            [123, 2.5],
+            200,
+            [23, 12.0],
+            300,
+            [34, 0.5],
+            400,
+            [456, 0.4],
+            [1, 2, 3],
+            [136, 5.5],
+            [101, 102, 103],
+            [123456, 4.2],
+            [111, 112, 113],
+            [25, 0.05],
+            [121, 122, 123],
+        ],
+    )
+    rbe3_um_6 = (
+        124,
+        1346,
+        [[123, 2.6], 100, [456, 1.8], 200],
+        [100, 12, 200, 5, 124, 6],
+    )
+    for name, rbe3 in (("rbe3_1", rbe3_1), ("rbe3_um_6", rbe3_um_6)):
+        nasdata = matlab.loadmat(f"tests/nastran_gm_data/make_gm_nx9_{name}.mat")
+        gm = nasdata["gm"][0][0][0]
+        pyuset = nastran.bulk2uset(f"tests/nastran_gm_data/make_gm_nx9_{name}.dat")[0]
+        pygm, depdof = n2p.formrbe3_batch(pyuset, [rbe3])
+        pygm = pygm.toarray()
+        assert pygm.shape[1] == pyuset.shape[0]
+        assert np.allclose(gm[:, np.any(gm, 0)], pygm[:, np.any(pygm, 0)])
+        assert depdof.shape == (gm.shape[0], 2)
+
+    # many rbe3s, compared to formrbe3 one at a time:
+    rng = np.random.RandomState(5)
+    cylcoord = np.array([[1, 2, 0], [1, 2, 3], [1, 2, 4], [2, 3, 3]])
+    sphcoord = np.array([[2, 3, 0], [-1, 0, 2], [0, 1, 2], [3, 1, 2]])
+    coords = [0, cylcoord, sphcoord]
+    ng = 40
+    uset = n2p.addgrid(
+        None,
+        np.arange(1, ng + 1),
+        "b",
+        [coords[i] for i in rng.randint(0, 3, ng)],
+        rng.rand(ng, 3) * [5, 90, 90],
+        [coords[i] for i in rng.randint(0, 3, ng)],
+    )
+    rbe3s = []
+    for k in range(30):
+        grids = rng.permutation(np.arange(1, ng + 1))[: rng.randint(4, 8)]
+        ind = [[123, 1.5], grids[1:4], [123456, 0.5], grids[4:]]
+        rbe3s.append((grids[0], [123456, 123, 3, 456][k % 4], ind))
+    rbe3s.append((2, 123456, [123, [3, 4, 5, 6]], [3, 123, 4, 3, 5, 3, 2, 4]))
+    rbe3, depdof = n2p.formrbe3_batch(uset, rbe3s)
+    rbe3 = rbe3.toarray()
+    row = 0
+    for item in rbe3s[:-1]:
+        m = n2p.formrbe3(uset, *item)
+        idof = n2p.expanddof(
+            [[g, 123] for g in item[2][1]] + [[g, 123456] for g in item[2][3]]
+        )
+        cols = np.sort(n2p.mkdofpv(uset, "p", idof)[0])
+        assert np.allclose(rbe3[row : row + len(m), cols], m)
+        assert np.all(depdof[row : row + len(m)] == n2p.expanddof([item[:2]]))
+        row += len(m)
+    m = n2p.formrbe3(uset, *rbe3s[-1])
+    assert np.allclose(rbe3[row:][:, np.any(rbe3[row:], axis=0)], m)
+    assert np.all(depdof[row:] == [[2, 4], [3, 1], [3, 2], [3, 3], [4, 3], [5, 3]])
+    assert_raises(ValueError, n2p.formrbe3_batch, uset, [(1, 123, [123, [99]])])
+
+
 def test_upasetpv():
     nas = op2.rdnas2cam("tests/nas2cam_csuper/nas2cam")
     pv = n2p.upasetpv(nas, 102)
@@ -1613,6 +1789,37 @@ def test_formulvs_multilevel():
     assert u300_100.shape[1] < nas["ulvs"][100].shape[0]
 
 
+def test_formulvs_cache():
+    nas = op2.rdnas2cam("tests/nas2cam/with_se_nas2cam")
+    cache = {}
+    u300 = n2p.formulvs(nas, 300, shortcut=False, cache=cache)
+    assert np.allclose(u300, nas["ulvs"][300])
+    for key in ((300, 0), (300, 100), (100, 0)):
+        assert key + (False, True) in cache
+    u100 = n2p.formulvs(nas, 100, shortcut=False, cache=cache)
+    assert u100 is cache[(100, 0, False, True)]
+    assert np.allclose(u100, nas["ulvs"][100])
+    drm, dof = n2p.formdrm(nas, 300, 36, cache=cache)
+    assert np.allclose(drm, n2p.formdrm(nas, 300, 36)[0])
+    assert_raises(ValueError, n2p.formulvs, nas, 300, 200)
+
+
+def test_formtran_sparse_gm():
+    for name, se in (("nas2cam_csuper", 101), ("nas2cam_extseout", 0)):
+        nas = op2.rdnas2cam(f"tests/{name}/nas2cam")
+        if se == 0:
+            del nas["phg"][0]
+        uset = nas["uset"][se]
+        dof = np.array(uset.index.tolist())[n2p.mksetpv(uset, "p", "g")]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            t1 = n2p.formtran(nas, se, dof)[0]
+            nas["gm"][se] = sp.coo_matrix(nas["gm"][se])
+            t2 = n2p.formtran(nas, se, dof)[0]
+        assert isinstance(t2, np.ndarray)
+        assert np.allclose(t1, t2)
+
+
 def test_formdrm_1():
     grids = [[11, 123456], [45, 123456], [60, 123456], [1995002, 0]]
     nas = op2.rdnas2cam("tests/nas2cam_csuper/nas2cam")
@@ -1994,3 +2201,43 @@ def test_find_xyz_triples1():
         assert np.allclose(t1, t2)
     for name in ("pv", "coords", "scales"):
         assert np.allclose(getattr(trips, name), getattr(trips2, name), equal_nan=True)
+
+
+def test_find_xyz_triples2():
+    # many triples, each scaled & rotated, separated by other rows:
+    rng = np.random.RandomState(7)
+    nodes = rng.randn(200, 3) * 10.0
+    rbs = n2p.rbgeom(nodes).reshape(-1, 6, 6)[:, :3]
+    scales = rng.uniform(0.1, 10.0, 200)
+    rows = []
+    pv = []
+    Ts = []
+    for j in range(200):
+        # random rotation via QR:
+        T = scales[j] * la.qr(rng.randn(3, 3))[0]
+        nother = j % 3
+        rows.append(rng.randn(nother, 6))
+        pv.extend([False] * nother + [True] * 3)
+        rows.append(T @ rbs[j])
+        Ts.append(la.inv(T))
+    # a 4th row repeating the last triple start is not a triple:
+    rows.append(rows[-1][:1])
+    pv.append(False)
+    drm = np.vstack(rows)
+    pv = np.array(pv)
+
+    mat = rng.randn(drm.shape[0], 4)
+    mats = {"drm": drm.copy(), "mat": mat.copy()}
+    trips = n2p.find_xyz_triples(drm, get_trans=True, mats=mats, inplace=True)
+    assert trips.outmats is mats
+    assert np.all(trips.pv == pv)
+    assert np.allclose(trips.coords[pv], np.repeat(nodes, 3, axis=0))
+    assert np.allclose(trips.scales[pv], np.repeat(scales, 3))
+    assert np.all(np.isnan(trips.scales[~pv]))
+    assert len(trips.Ts) == 200
+    assert np.allclose(trips.Ts, Ts)
+    assert np.allclose(mats["drm"][pv], rbs.reshape(-1, 6))
+    assert np.all(mats["drm"][~pv] == drm[~pv])
+    Tbig = la.block_diag(*Ts)
+    assert np.allclose(mats["mat"][pv], Tbig @ mat[pv])
+    assert np.all(mats["mat"][~pv] == mat[~pv])
@@ -1,5 +1,6 @@
 import numpy as np
 import os
+import tempfile
 from io import StringIO
 import matplotlib.pyplot as plt
 from pyyeti import nastran
@@ -107,6 +108,170 @@ $ ending comment
     assert sbe == lst
 
 
+def test_rdcards_fixed():
+    fs = StringIO(
+        """
+GRID    1       0       1.5-3   2.d4    -3.+2   7
+GRID    2               1.5e-3  2.D+4   -3.E2   $ comment
+GRID*                  3               0    1.23456789+3             2.5
+*       .5-12           1               abc             1.2.3
+GRID,4,,1.,2.,3.
+GRID    5       0       1 2     --5     +7      1_0     5-      00012
++       1e      .       -       +.5
+GRID    6       0       1.      2.      3.      7               3.3
++       5
+"""
+    )
+    a = nastran.rdcards(fs, "grid")
+    sbe = np.zeros((6, 12))
+    sbe[0, :6] = [1, 0, 1.5e-3, 2e4, -3e2, 7]
+    sbe[1, :5] = [2, 0, 1.5e-3, 2e4, -3e2]
+    sbe[2, :6] = [3, 0, 1234.56789, 2.5, 0.5e-12, 1]
+    sbe[3, :5] = [4, 0, 1, 2, 3]
+    sbe[4, :12] = [5, 0, 0, 0, 7, 10, 0, 12, 0, 0, 0, 0.5]
+    sbe[5, :9] = [6, 0, 1, 2, 3, 7, 0, 3.3, 5]
+    assert np.all(a == sbe)
+
+    # compare to the values read one card at a time:
+    lst = nastran.rdcards(fs, "grid", return_var="list", blank=-1)
+    a = nastran.rdcards(fs, "grid", blank=-1, dtype=int)
+    dct = nastran.rdcards(fs, "grid", return_var="dict", blank=-1)
+    assert list(dct.keys()) == [1, 2, 3, 4, 5, 6]
+    for row, vals, key in zip(a, lst, dct):
+        vals = [-1 if isinstance(v, str) else v for v in vals]
+        assert np.all(dct[key] == vals)
+        assert dct[key].dtype == float
+        assert np.all(row[: len(vals)] == np.array(vals).astype(int))
+        assert np.all(row[len(vals) :] == -1)
+
+
+def test_bulkindex():
+    fs = StringIO(
+        """
+$ starting comment
+DTI     SELOAD         1       2
+dti     seload         3       4
+$ a comment for testing
+dti,seload,5,6
+DTI, SELOAD, , 8.0, 'a'
+GRID*                  1               0      0.00000000      0.00000000
+*           300.00000000               0
+DTI,SETREE,100,0
+SUBCASE 1
+$ comment within a card
+        1.
+$ ending comment
+    """
+    )
+    index = nastran.BulkIndex(fs)
+    assert index.names() == ["dti", "grid", "subcase"]
+    assert len(index) == 7
+    for name, regex in (
+        (r"DTI(,\s*|\s+)SELOAD", True),
+        ("dti", False),
+        ("DTI     SELOAD", False),
+        ("$", False),
+        (r"[a-z]+[*]*", True),
+        ("subcase", False),
+    ):
+        for return_var in ("array", "list", "dict"):
+            for keep in (False, True):
+                kwargs = dict(
+                    regex=regex,
+                    return_var=return_var,
+                    keep_name=keep,
+                    keep_comments=keep,
+                )
+                a = nastran.rdcards(fs, name, **kwargs)
+                b = nastran.rdcards(index, name, **kwargs)
+                if return_var == "array":
+                    assert np.all(a == b)
+                elif return_var == "dict":
+                    assert a.keys() == b.keys()
+                    for k in a:
+                        assert np.all(a[k] == b[k])
+                else:
+                    assert a == b
+
+    assert nastran.rdcards(index, "ccc", no_data_return="no CCC") == "no CCC"
+    assert_raises(ValueError, nastran.BulkIndex, fs, index_file=True)
+    assert_raises(ValueError, index.save)
+
+    bulkfile = "tests/nas2cam_csuper/inboard.blk"
+    name = "_test_bulkindex_.npz"
+    try:
+        index = nastran.BulkIndex(bulkfile, index_file=name)
+        assert os.path.exists(name)
+        index2 = nastran.BulkIndex(bulkfile, index_file=name)
+        assert index2.names() == index.names()
+        assert np.all(index2._starts == index._starts)
+        for idx in (index, index2):
+            assert np.all(nastran.rdgrids(idx) == nastran.rdgrids(bulkfile))
+            c1 = nastran.rdcord2cards(idx)
+            c2 = nastran.rdcord2cards(bulkfile)
+            assert c1.keys() == c2.keys()
+            for k in c1:
+                assert np.all(c1[k] == c2[k])
+    finally:
+        if os.path.exists(name):
+            os.remove(name)
+
+
+def test_rdcards_deck():
+    inboard = "tests/nas2cam_csuper/inboard.blk"
+    with open(inboard) as f:
+        inboard_text = f.read()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.mkdir(os.path.join(tmp, "sub"))
+        with open(os.path.join(tmp, "sub", "grids.blk"), "w") as f:
+            f.write("$ grid 2\nGRID,2,0,1.,2.,3.\nINCLUDE '../grid3.blk'\n")
+        with open(os.path.join(tmp, "grid3.blk"), "w") as f:
+            f.write("GRID    3       0       4.      5.      6.\n")
+        main = os.path.join(tmp, "main.blk")
+        with open(main, "w") as f:
+            f.write(
+                "GRID,1,0,0.,0.,0.\n"
+                "INCLUDE 'sub/\n"
+                "         grids.blk'\n"
+                f"include '{os.path.abspath(inboard)}'\n"
+                "GRID*                  4               0      7.00000000\n"
+                "*             8.00000000      9.00000000\n"
+            )
+        expanded = StringIO(
+            "GRID,1,0,0.,0.,0.\n"
+            "$ grid 2\nGRID,2,0,1.,2.,3.\n"
+            "GRID    3       0       4.      5.      6.\n"
+            + inboard_text
+            + "GRID*                  4               0      7.00000000\n"
+            "*             8.00000000      9.00000000\n"
+        )
+        for name in ("grid", "cord2", "cbar"):
+            for return_var in ("array", "list", "dict"):
+                kwargs = dict(return_var=return_var, keep_comments=True)
+                a = nastran.rdcards(expanded, name, **kwargs)
+                for parallel, chunk_size in (("no", 2 ** 24), ("yes", 1000)):
+                    b = nastran.rdcards_deck(
+                        main, name, parallel=parallel, chunk_size=chunk_size, **kwargs
+                    )
+                    if return_var == "array":
+                        assert np.all(a == b)
+                    elif return_var == "dict":
+                        assert list(a.keys()) == list(b.keys())
+                        for k in a:
+                            assert np.all(a[k] == b[k])
+                    else:
+                        assert a == b
+
+        grids = nastran.rdcards_deck(main, "grid", parallel="no")
+        assert np.all(grids[[0, 1, 2, -1], 0] == [1, 2, 3, 4])
+        assert nastran.rdcards_deck(main, "ccc", no_data_return="none") == "none"
+        assert_raises(ValueError, nastran.rdcards_deck, main, "grid", parallel=1)
+
+        with open(os.path.join(tmp, "grid3.blk"), "a") as f:
+            f.write("INCLUDE 'sub/grids.blk'\n")
+        assert_raises(ValueError, nastran.rdcards_deck, main, "grid")
+
+
 def test_wtgrids():
     xyz = np.array([[0.1, 0.2, 0.3], [1.1, 1.2, 1.3]])
     with StringIO() as f:
@@ -2,6 +2,7 @@ import numpy as np
 from pyyeti import ytools, nastran, locate
 from pyyeti.nastran import op4, op2
 from scipy.io import matlab
+import scipy.sparse as sp
 from nose.tools import *
 
 
@@ -328,6 +329,33 @@ def test_rdop2mats():
     assert sorted(d.keys()) == ["CASECC", "ZUZR01", "ZUZR02", "ZUZR03"]
 
 
+def test_rdop2mats_sparse():
+    dr = "tests/nastran_op2_data/"
+    for cut in (0, 30000):
+        for name in (
+            "double_le.op2",
+            "double_be.op2",
+            "single_le.op2",
+            "single_be.op2",
+        ):
+            with op2.OP2(dr + name) as o2:
+                o2._rowsCutoff = cut
+                dct = o2.rdop2mats()
+                dcts = o2.rdop2mats(sparse=True)
+            assert sorted(dct.keys()) == sorted(dcts.keys())
+            for k in dct:
+                assert sp.isspmatrix_csc(dcts[k])
+                assert dcts[k].dtype == dct[k].dtype
+                assert np.all(dcts[k].toarray() == dct[k])
+
+    dct = op2.rdmats(
+        dr + "double_le.op2", ["zuzr03"], sparse=(True, sp.csc_matrix.tocsr)
+    )
+    dct2 = op4.load("tests/nastran_op4_data/r_c_rc.op4")
+    assert sp.isspmatrix_csr(dct["ZUZR03"])
+    assert np.allclose(dct2["rcmat"][0], dct["ZUZR03"].toarray())
+
+
 def test_rdop2tload():
     sbe = np.zeros((5, 30), dtype=np.int64)
     sbe[0] = range(1001, 1031)
@@ -393,6 +421,28 @@ def test_rdpostop2():
     assert np.all(oug["lambda"] == lam)
 
 
+def test_stack_records():
+    with op2.OP2("tests/nas2cam_extseout/inboard.op2") as o2:
+        o2.set_position("OUGV1")
+        name, trailer, dbtype = o2.rdop2nt()
+        recs = o2._scan_records()
+        mm = o2._memmap()
+        data = o2._stack_records(mm, recs[1::2], "f4")
+        # split each record into two physical records to force the
+        # non-strided path:
+        split = [
+            [(pos, n // 2), (pos + n // 2, n - n // 2)]
+            for ((pos, n),) in recs[1::2]
+        ]
+        data2 = o2._stack_records(mm, split, "f4")
+        assert np.all(data == data2)
+        data3 = o2._stack_records(mm, split, "f4", offset=8, count=5)
+        assert np.all(data[:, 2:7] == data3)
+
+        # file is positioned at end of OUGV1:
+        assert o2._fileh.tell() == o2.dbnames["OUGV1"][0][0][1]
+
+
 def test_rdpostop2_assemble():
     post = op2.rdpostop2("tests/nas2cam_extseout/assemble.op2", 1, 1)
     assert np.all(post["selist"] == [[101, 0], [102, 0], [0, 0]])
@@ -119,6 +119,71 @@ def test_vecwrite_slice():
     assert txt == sbe
 
 
+def test_vecwrite_types():
+    # the columns are formatted in bulk; check against formatting
+    # each row:
+    x = np.array([1.5, np.nan, np.inf, -2.0, 0.0])
+    args = (
+        np.arange(5),
+        x,
+        x.astype(np.float32),
+        x > 0,
+        np.array(list("abcde")),
+        np.column_stack((x, x)),
+        [[1, "a"]] * 5,
+        np.array([None, 1, "a", 2.0, 3], dtype=object),
+        "scalar",
+    )
+    frm = "{} {:8.3f} {} {} {:>3} {:e} {} {} {} {} {}\n"
+    f = StringIO()
+    writer.vecwrite(f, frm, *args)
+    sbe = "".join(
+        frm.format(a, b, c, d, e, *g, *h, i, args[-1])
+        for a, b, c, d, e, g, h, i in zip(*args[:-1])
+    )
+    assert f.getvalue() == sbe
+
+    # conversions and lookups are applied to the numpy scalars:
+    x = np.array([0.1, 1.0 / 3, np.nan, -2.5])
+    args = (
+        x,
+        x.astype(np.float32),
+        x.astype(np.float16),
+        np.arange(4, dtype=np.int8),
+        np.column_stack((x, x.astype(np.float32))),
+    )
+    for frm in (
+        "{!r} {!s} {!r} {!r} {!r} {:.3f}\n",
+        "{0!r} {1} {1!s} {2} {3!r} {4:8.3f} {5!s}\n",
+        "{} {.real} {!s:>12} {:3d} {.imag} {!r:>25}\n",
+    ):
+        f = StringIO()
+        writer.vecwrite(f, frm, *args)
+        sbe = "".join(frm.format(a, b, c, d, *e) for a, b, c, d, e in zip(*args))
+        assert f.getvalue() == sbe
+    # nested fields:
+    f = StringIO()
+    widths = np.arange(4, dtype=np.int8) + 12
+    writer.vecwrite(f, "{!s:>{}} {:.2f}\n", args[1], widths, x)
+    sbe = "".join(
+        "{!s:>{}} {:.2f}\n".format(a, b, c) for a, b, c in zip(args[1], widths, x)
+    )
+    assert f.getvalue() == sbe
+    with np.printoptions(legacy="1.13"):
+        f = StringIO()
+        writer.vecwrite(f, "{!r} {!r}\n", x, x.astype(np.float32))
+        sbe = "".join(
+            "{!r} {!r}\n".format(a, b) for a, b in zip(x, x.astype(np.float32))
+        )
+        assert f.getvalue() == sbe
+
+    # a postfunc and a 1-row matrix:
+    f = StringIO()
+    writer.vecwrite(f, "{} {}\n", np.ones((1, 2)), postfunc=str.upper)
+    assert f.getvalue() == "1.0 1.0\n"
+    assert_raises(IndexError, writer.vecwrite, f, "{} {}\n", np.ones((1, 2)), x)
+
+
 def test_formheader():
     descs = ["Item 1", "A different item"]
     mx = np.array([[1.2, 2.3], [3.4, 4.5]]) * 1000
@@ -4,6 +4,7 @@ import os
 from pyyeti import ytools
 from nose.tools import *
 import scipy.linalg as linalg
+import scipy.sparse as sp
 
 
 # def test_fit_circle_2d():
@@ -129,6 +130,24 @@ def test_mattype():
     assert_raises(ValueError, ytools.mattype, c, "badtype")
 
 
+def test_mattype_sparse():
+    a = np.random.randn(6, 6)
+    a = a.dot(a.T)
+    c = np.random.randn(6, 6) + 1j * np.random.randn(6, 6)
+    c = c.dot(np.conj(c.T))
+    mats = [a, c, np.eye(5), np.eye(5) * 2.0, np.random.randn(5, 5)]
+    a2 = a.copy()
+    a2[1, 1] = 0.0
+    c2 = c.copy()
+    c2[1, 1] = 0.0
+    mats.extend([a2, c2, np.diag([1.0, 2.0, 0.0])])
+    for mat in mats:
+        for fmt in (sp.csr_matrix, sp.csc_matrix):
+            assert ytools.mattype(fmt(mat))[0] == ytools.mattype(mat)[0]
+            for mtype in ytools.mattype(None):
+                assert ytools.mattype(fmt(mat), mtype) == ytools.mattype(mat, mtype)
+
+
 def test_save_load():
     a = np.arange(18).reshape(2, 3, 3)
     b = np.arange(3)
@@ -140,7 +159,7 @@ def test_save_load():
         name = f.name
         f.close()
         obj = dict(a=a, b=b, c=a, d=d, e=d)
-        for ext in ("", ".pgz", ".pbz2"):
+        for ext in ("", ".pgz", ".pbz2", ".pmm"):
             fname = name + ext
             names.append(fname)
             ytools.save(fname, obj)
@@ -153,3 +172,51 @@ def test_save_load():
     finally:
         for name in names:
             os.remove(name)
+
+
+def test_save_load_pmm():
+    a = np.random.randn(30, 40)
+    obj = dict(
+        a=a,
+        b=a,
+        c=np.asfortranarray(a),
+        d=a[:, ::3],
+        e=np.arange(300, dtype=np.int32) + 1j,
+        f=np.arange(3),
+        g=np.arange(300, dtype=object),
+    )
+    with tempfile.TemporaryDirectory() as dirname:
+        fname = os.path.join(dirname, "obj.pmm")
+        ytools.save(fname, obj)
+        # recognized by content, not name:
+        os.rename(fname, fname[:-4])
+        obj_in = ytools.load(fname[:-4])
+        for key, value in obj.items():
+            assert np.all(obj_in[key] == value)
+            assert obj_in[key].dtype == value.dtype
+        assert obj_in["b"] is obj_in["a"]
+        assert obj_in["c"].flags.f_contiguous
+        assert isinstance(obj_in["a"].base, np.memmap)
+        assert not isinstance(obj_in["f"].base, np.memmap)
+        # copy-on-write:
+        obj_in["a"][:] = 0.0
+        assert np.all(ytools.load(fname[:-4])["a"] == a)
+        del obj_in
+
+
+def test_save_load_pmm_same_name():
+    # load, then save back to the same file while the arrays are
+    # still mapped from it:
+    a = np.arange(4.0e5)
+    with tempfile.TemporaryDirectory() as dirname:
+        fname = os.path.join(dirname, "obj.pmm")
+        ytools.save(fname, {"a": a})
+        obj = ytools.load(fname)
+        obj["b"] = 2
+        ytools.save(fname, obj)
+        assert np.all(obj["a"] == a)
+        obj_in = ytools.load(fname)
+        assert obj_in["b"] == 2
+        assert np.all(obj_in["a"] == a)
+        assert os.listdir(dirname) == ["obj.pmm"]
+        del obj, obj_in